@@ -0,0 +1,289 @@
+# =========================================
+# Cohort Store - Agregados Incrementais de Coorte
+# =========================================
+# Mantém por (ano, mês) de contratação os agregados usados por
+# sp_analise_coorte_clientes e vw_tendencias_temporais, aplicando
+# inserções, cancelamentos e mudanças de status como deltas em vez de
+# reprocessar a tabela clientes_seguros a cada consulta.
+
+import calendar
+from typing import List, Dict, Any, Optional, Tuple
+from collections import Counter
+from datetime import date, datetime
+
+Cohort = Tuple[int, int]
+
+
+def _to_date(value: Any) -> Optional[date]:
+    """Converte valor ISO/date/datetime para date."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(str(value)[:10]).date()
+
+
+def _years_before(day: date, years: int) -> date:
+    """DATEADD(YEAR, -years, day): 29/02 vira 28/02 em ano não bissexto."""
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        return day.replace(year=day.year - years, day=28)
+
+
+def _to_cents(value: Any) -> Optional[int]:
+    """Converte um valor DECIMAL(10,2) para centavos inteiros (sem erro de soma)."""
+    if value is None:
+        return None
+    return int(round(float(value) * 100))
+
+
+class CohortStore:
+    """Agregados de coorte mantidos incrementalmente por (ano, mês)."""
+
+    def __init__(self):
+        """Inicializa o store vazio."""
+        self.cohorts: Dict[Cohort, Dict[str, Any]] = {}
+        self._contratos: Dict[Any, Dict[str, Any]] = {}
+        self._membros: Dict[Cohort, set] = {}
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]]) -> 'CohortStore':
+        """
+        Constrói o store a partir de uma carga inicial de clientes_seguros.
+
+        Args:
+            rows: Linhas com id_cliente, data_contratacao, status_contrato,
+                  valor_premio e tipo_seguro
+
+        Returns:
+            CohortStore populado
+        """
+        store = cls()
+        for row in rows:
+            store.insert(row)
+        return store
+
+    @staticmethod
+    def _new_aggregate() -> Dict[str, Any]:
+        """Cria o agregado vazio de uma coorte."""
+        return {
+            'clientes': set(),
+            'status_clientes': {},
+            'contratos': 0,
+            'contratos_por_status': Counter(),
+            'soma_premio_cents': 0,
+            'n_premio': 0,
+            'receita_ativa_cents': 0,
+            'tipos': Counter()
+        }
+
+    def _apply(self, contrato: Dict[str, Any], sinal: int):
+        """Soma (sinal=1) ou subtrai (sinal=-1) um contrato dos agregados."""
+        cohort = contrato['cohort']
+        agg = self.cohorts.get(cohort)
+        if agg is None:
+            agg = self.cohorts[cohort] = self._new_aggregate()
+            self._membros[cohort] = set()
+
+        if sinal > 0:
+            self._membros[cohort].add(contrato['id_cliente'])
+        else:
+            self._membros[cohort].discard(contrato['id_cliente'])
+        self._accumulate(agg, contrato, sinal)
+
+        if agg['contratos'] == 0:
+            del self.cohorts[cohort]
+            del self._membros[cohort]
+
+    @staticmethod
+    def _accumulate(agg: Dict[str, Any], contrato: Dict[str, Any], sinal: int):
+        """Aplica um contrato a um agregado de coorte."""
+        id_cliente = contrato['id_cliente']
+        status = contrato['status_contrato']
+        premio = contrato['premio_cents']
+
+        if sinal > 0:
+            agg['clientes'].add(id_cliente)
+            agg['status_clientes'].setdefault(status, set()).add(id_cliente)
+        else:
+            agg['clientes'].discard(id_cliente)
+            agg['status_clientes'].get(status, set()).discard(id_cliente)
+
+        agg['contratos'] += sinal
+        agg['contratos_por_status'][status] += sinal
+        if premio is not None:
+            agg['soma_premio_cents'] += sinal * premio
+            agg['n_premio'] += sinal
+            if status == 'ATIVO':
+                agg['receita_ativa_cents'] += sinal * premio
+        if contrato['tipo_seguro'] is not None:
+            agg['tipos'][contrato['tipo_seguro']] += sinal
+            if agg['tipos'][contrato['tipo_seguro']] == 0:
+                del agg['tipos'][contrato['tipo_seguro']]
+
+    def insert(self, row: Dict[str, Any]):
+        """
+        Registra um novo contrato.
+
+        Args:
+            row: Linha de clientes_seguros
+        """
+        id_cliente = row['id_cliente']
+        if id_cliente in self._contratos:
+            raise ValueError(f"Contrato do cliente {id_cliente} já registrado")
+
+        data_contratacao = _to_date(row.get('data_contratacao'))
+        if data_contratacao is None:
+            raise ValueError(f"Contrato do cliente {id_cliente} sem data_contratacao")
+
+        contrato = {
+            'id_cliente': id_cliente,
+            'cohort': (data_contratacao.year, data_contratacao.month),
+            'data_contratacao': data_contratacao,
+            'status_contrato': row.get('status_contrato'),
+            'premio_cents': _to_cents(row.get('valor_premio')),
+            'tipo_seguro': row.get('tipo_seguro')
+        }
+        self._contratos[id_cliente] = contrato
+        self._apply(contrato, 1)
+
+    def update_status(self, id_cliente: Any, novo_status: str):
+        """
+        Aplica uma mudança de status como delta (remove o estado antigo, soma o novo).
+
+        Args:
+            id_cliente: Identificador do contrato
+            novo_status: Novo valor de status_contrato
+        """
+        contrato = self._get(id_cliente)
+        if contrato['status_contrato'] == novo_status:
+            return
+        self._apply(contrato, -1)
+        contrato['status_contrato'] = novo_status
+        self._apply(contrato, 1)
+
+    def cancel(self, id_cliente: Any):
+        """Registra o cancelamento de um contrato."""
+        self.update_status(id_cliente, 'CANCELADO')
+
+    def delete(self, id_cliente: Any):
+        """Remove um contrato dos agregados."""
+        contrato = self._get(id_cliente)
+        self._apply(contrato, -1)
+        del self._contratos[id_cliente]
+
+    def _get(self, id_cliente: Any) -> Dict[str, Any]:
+        """Retorna o estado atual de um contrato."""
+        contrato = self._contratos.get(id_cliente)
+        if contrato is None:
+            raise KeyError(f"Contrato do cliente {id_cliente} não encontrado")
+        return contrato
+
+    def analise_coorte(self, data_inicio: Optional[date] = None,
+                       data_fim: Optional[date] = None) -> List[Dict[str, Any]]:
+        """
+        Relatório de retenção equivalente a sp_analise_coorte_clientes.
+
+        O filtro é o BETWEEN por dia da procedure: meses inteiramente dentro
+        do período usam os agregados mantidos; nos meses das extremidades
+        que o período cobre só em parte, o agregado é recalculado apenas com
+        os contratos do mês dentro das datas.
+
+        Args:
+            data_inicio: Início do período, inclusive (padrão: 5 anos atrás)
+            data_fim: Fim do período, inclusive (padrão: hoje)
+
+        Returns:
+            Lista de coortes ordenada por ano e mês decrescentes
+        """
+        hoje = date.today()
+        inicio = _to_date(data_inicio) or _years_before(hoje, 5)
+        fim = _to_date(data_fim) or hoje
+        primeiro, ultimo = (inicio.year, inicio.month), (fim.year, fim.month)
+
+        report = []
+        for cohort in sorted(self.cohorts, reverse=True):
+            if not primeiro <= cohort <= ultimo:
+                continue
+            parcial = (
+                (cohort == primeiro and inicio.day > 1)
+                or (cohort == ultimo and fim.day < calendar.monthrange(*ultimo)[1])
+            )
+            agg = self._partial_aggregate(cohort, inicio, fim) if parcial else self.cohorts[cohort]
+            if agg['contratos'] == 0:
+                continue
+            adquiridos = len(agg['clientes'])
+            ativos = len(agg['status_clientes'].get('ATIVO', ()))
+            report.append({
+                'ano_coorte': cohort[0],
+                'mes_coorte': cohort[1],
+                'clientes_adquiridos': adquiridos,
+                'clientes_ativos': ativos,
+                'clientes_cancelados': len(agg['status_clientes'].get('CANCELADO', ())),
+                'taxa_retencao_pct': round(100.0 * ativos / adquiridos, 2) if adquiridos else 0,
+                'premio_medio_coorte': (
+                    round(agg['soma_premio_cents'] / agg['n_premio'] / 100, 2)
+                    if agg['n_premio'] else None
+                ),
+                'revenue_coorte_ativa': agg['receita_ativa_cents'] / 100
+            })
+        return report
+
+    def _partial_aggregate(self, cohort: Cohort, inicio: date, fim: date) -> Dict[str, Any]:
+        """Agregado de uma coorte restrito aos contratos entre inicio e fim."""
+        agg = self._new_aggregate()
+        for id_cliente in self._membros[cohort]:
+            contrato = self._contratos[id_cliente]
+            if inicio <= contrato['data_contratacao'] <= fim:
+                self._accumulate(agg, contrato, 1)
+        return agg
+
+    def tendencias_temporais(self) -> List[Dict[str, Any]]:
+        """
+        Série mensal equivalente a vw_tendencias_temporais.
+
+        Returns:
+            Lista de meses ordenada por ano e mês
+        """
+        report = []
+        for cohort in sorted(self.cohorts):
+            agg = self.cohorts[cohort]
+            report.append({
+                'ano': cohort[0],
+                'mes': cohort[1],
+                'novos_clientes': len(agg['clientes']),
+                'receita_mes': agg['soma_premio_cents'] / 100 if agg['n_premio'] else None,
+                'premio_medio_mes': (
+                    round(agg['soma_premio_cents'] / agg['n_premio'] / 100, 2)
+                    if agg['n_premio'] else None
+                ),
+                'tipos_contratados': len(agg['tipos']),
+                'taxa_cancelamento_pct': round(
+                    100.0 * agg['contratos_por_status']['CANCELADO'] / agg['contratos'], 2
+                )
+            })
+        return report
+
+
+if __name__ == '__main__':
+    import json
+
+    store = CohortStore.from_rows([
+        {'id_cliente': 1, 'data_contratacao': '2024-01-10', 'status_contrato': 'ATIVO',
+         'valor_premio': 250.00, 'tipo_seguro': 'Auto'},
+        {'id_cliente': 2, 'data_contratacao': '2024-01-15', 'status_contrato': 'ATIVO',
+         'valor_premio': 150.00, 'tipo_seguro': 'Residencial'},
+        {'id_cliente': 3, 'data_contratacao': '2024-02-05', 'status_contrato': 'ATIVO',
+         'valor_premio': 580.00, 'tipo_seguro': 'Saúde'}
+    ])
+    store.cancel(2)
+    store.insert({'id_cliente': 4, 'data_contratacao': '2024-02-20', 'status_contrato': 'ATIVO',
+                  'valor_premio': 290.00, 'tipo_seguro': 'Auto'})
+
+    print("=== ANÁLISE DE COORTE ===")
+    print(json.dumps(store.analise_coorte(data_inicio='2024-01-01'), indent=2, ensure_ascii=False))
+    print("\n=== TENDÊNCIAS TEMPORAIS ===")
+    print(json.dumps(store.tendencias_temporais(), indent=2, ensure_ascii=False))
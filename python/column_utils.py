@@ -0,0 +1,46 @@
+# =========================================
+# Column Utils - Conversões e Agrupamentos de Colunas NumPy
+# =========================================
+# Funções compartilhadas pelos engines vetorizados (scoring, segmentação,
+# sobrevivência) para converter colunas vindas do banco ou do ColumnarStore,
+# arredondar como o T-SQL e trabalhar com grupos em arrays ordenados.
+#
+# Convenção de nulos: valores NULL do SQL são representados como NaN
+# (numéricos) ou NaT (datas).
+
+from typing import Any, Sequence
+
+import numpy as np
+
+
+def as_float(values: Sequence[Any]) -> np.ndarray:
+    """Converte uma coluna para float64, mapeando None para NaN."""
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        return values.astype(np.float64)
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def as_dates(values: Sequence[Any]) -> np.ndarray:
+    """Converte uma coluna de datas (ISO, date ou datetime64) para datetime64[D]."""
+    if isinstance(values, np.ndarray) and np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[D]')
+    return np.array(
+        ['NaT' if v is None else str(v)[:10] for v in values],
+        dtype='datetime64[D]'
+    )
+
+
+def round_half_away(values: np.ndarray, decimals: int = 2) -> np.ndarray:
+    """Arredonda como a conversão para DECIMAL do T-SQL (meio para longe do zero)."""
+    factor = 10.0 ** decimals
+    # O T-SQL calcula em decimal exato: 15.005 não pode virar 15.00499... em
+    # binário, por isso o erro de representação é descartado antes do floor
+    scaled = np.round(np.abs(values) * factor, 6)
+    return np.sign(values) * np.floor(scaled + 0.5) / factor
+
+
+def group_starts(sorted_codes: np.ndarray) -> np.ndarray:
+    """Posições onde começa cada grupo em um array de códigos ordenado."""
+    if len(sorted_codes) == 0:
+        return np.array([], dtype=np.int64)
+    return np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
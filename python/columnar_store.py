@@ -0,0 +1,356 @@
+# =========================================
+# Columnar Store - Armazenamento Colunar Mapeado em Memória
+# =========================================
+# Converte os tipos do dicionário de dados em um layout colunar de largura
+# fixa, persistido em um arquivo por coluna que pode ser aberto com
+# numpy.memmap. Validadores e engines analíticos leem as colunas direto
+# do disco, sem copiar nem reinterpretar texto de extrações CSV.
+#
+# Layout por tabela (<base_dir>/<tabela>/):
+#   _schema.json        número de linhas e especificação de cada coluna
+#   <coluna>.data       valores de largura fixa (ou bytes UTF-8 de VARCHAR)
+#   <coluna>.offsets    offsets int64 (n + 1) das colunas VARCHAR
+#   <coluna>.nulls      bitmap de validade (1 = preenchido), np.packbits
+
+import os
+import re
+import json
+from datetime import date, datetime
+from typing import List, Dict, Any, Optional, Union
+
+import numpy as np
+
+_TYPE_PATTERN = re.compile(r'^\s*(\w+)\s*(?:\(\s*(\d+)\s*(?:,\s*(\d+)\s*)?\))?\s*$')
+
+ColumnData = Union[List[Dict[str, Any]], Dict[str, List[Any]]]
+
+
+def parse_column_type(tipo: str) -> Dict[str, Any]:
+    """
+    Converte um tipo SQL do dicionário na especificação de armazenamento.
+
+    Args:
+        tipo: Tipo declarado (ex.: 'CHAR(11)', 'DECIMAL(10,2)')
+
+    Returns:
+        Dicionário com kind, dtype e parâmetros do tipo
+    """
+    match = _TYPE_PATTERN.match(tipo or '')
+    if not match:
+        raise ValueError(f"Tipo não suportado: {tipo!r}")
+
+    base = match.group(1).upper()
+    size = int(match.group(2)) if match.group(2) else None
+    scale = int(match.group(3)) if match.group(3) else 0
+
+    if base in ('INT', 'INTEGER'):
+        return {'tipo': tipo, 'kind': 'int', 'dtype': '<i4'}
+    if base == 'BIGINT':
+        return {'tipo': tipo, 'kind': 'int', 'dtype': '<i8'}
+    if base == 'CHAR':
+        return {'tipo': tipo, 'kind': 'char', 'dtype': f'S{size or 1}', 'length': size or 1}
+    if base in ('DECIMAL', 'NUMERIC'):
+        return {'tipo': tipo, 'kind': 'decimal', 'dtype': '<i8', 'scale': scale}
+    if base in ('FLOAT', 'REAL', 'DOUBLE'):
+        return {'tipo': tipo, 'kind': 'float', 'dtype': '<f8'}
+    if base == 'DATE':
+        return {'tipo': tipo, 'kind': 'date', 'dtype': '<i4'}
+    if base in ('TIMESTAMP', 'DATETIME'):
+        return {'tipo': tipo, 'kind': 'timestamp', 'dtype': '<i8'}
+    if base in ('VARCHAR', 'NVARCHAR', 'TEXT'):
+        return {'tipo': tipo, 'kind': 'varchar', 'dtype': 'u1', 'length': size}
+
+    raise ValueError(f"Tipo não suportado: {tipo!r}")
+
+
+def _to_columns(rows: ColumnData, names: List[str]) -> Dict[str, List[Any]]:
+    """Aceita lista de linhas ou dicionário de colunas."""
+    if isinstance(rows, dict):
+        return {name: list(rows.get(name, [])) for name in names}
+    return {name: [row.get(name) for row in rows] for name in names}
+
+
+def _encode_text(spec: Dict[str, Any], values: List[Any]) -> List[bytes]:
+    """Codifica textos em UTF-8, rejeitando valores acima do tamanho declarado."""
+    length = spec.get('length')
+    encoded = []
+    for v in values:
+        text = '' if v is None else str(v)
+        if length is not None and len(text) > length:
+            raise ValueError(f"Valor com {len(text)} caracteres excede {spec['tipo']}: {text!r}")
+        encoded.append(text.encode('utf-8'))
+    return encoded
+
+
+def _int_array(spec: Dict[str, Any], values: List[Any], ints: List[int]) -> np.ndarray:
+    """Array inteiro do dtype da coluna, rejeitando valores fora da faixa."""
+    info = np.iinfo(spec['dtype'])
+    for value, stored in zip(values, ints):
+        if not info.min <= stored <= info.max:
+            raise ValueError(f"Valor fora da faixa de {spec['tipo']}: {value!r}")
+    return np.array(ints, dtype=spec['dtype'])
+
+
+def _encode_column(spec: Dict[str, Any], values: List[Any]) -> Dict[str, np.ndarray]:
+    """
+    Codifica uma coluna em arrays de largura fixa + bitmap de nulos.
+
+    Em CHAR(n) o limite é de n caracteres; como em UTF-8 um caractere ocupa
+    até 4 bytes, a largura física (spec['dtype']) é ampliada para o maior
+    valor gravado.
+    """
+    n = len(values)
+    valid = np.fromiter((v is not None for v in values), dtype=bool, count=n)
+    if not spec.get('aceita_nulos', True) and not valid.all():
+        raise ValueError(f"{n - int(valid.sum())} valores nulos em coluna NOT NULL")
+    kind = spec['kind']
+    arrays = {'nulls': np.packbits(valid, bitorder='little')}
+
+    if kind == 'varchar':
+        encoded = _encode_text(spec, values)
+        lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=n)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        arrays['offsets'] = offsets
+        arrays['data'] = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        return arrays
+
+    if kind == 'char':
+        encoded = _encode_text(spec, values)
+        width = max([spec['length']] + [len(b) for b in encoded])
+        spec['dtype'] = f'S{width}'
+        data = np.array(encoded, dtype=spec['dtype'])
+    elif kind == 'decimal':
+        factor = 10 ** spec['scale']
+        data = _int_array(spec, values,
+                          [0 if v is None else int(round(float(v) * factor)) for v in values])
+    elif kind == 'date':
+        data = _int_array(spec, values, [0 if v is None else _date_days(v) for v in values])
+    elif kind == 'timestamp':
+        data = _int_array(spec, values, [0 if v is None else _timestamp_micros(v) for v in values])
+    elif kind == 'int':
+        data = _int_array(spec, values, [0 if v is None else int(v) for v in values])
+    else:
+        data = np.array([0 if v is None else v for v in values], dtype=spec['dtype'])
+
+    arrays['data'] = data
+    return arrays
+
+
+def _date_days(value: Any) -> int:
+    """Dias desde 1970-01-01."""
+    if isinstance(value, datetime):
+        value = value.date()
+    if not isinstance(value, date):
+        value = date.fromisoformat(str(value)[:10])
+    return (value - date(1970, 1, 1)).days
+
+
+def _timestamp_micros(value: Any) -> int:
+    """Microssegundos desde 1970-01-01 00:00:00."""
+    if isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    return int(np.datetime64(value.replace(tzinfo=None), 'us').astype(np.int64))
+
+
+class ColumnarStore:
+    """Persiste e abre tabelas no layout colunar de largura fixa."""
+
+    def __init__(self, base_dir: str = './columnar'):
+        """
+        Inicializa o store.
+
+        Args:
+            base_dir: Diretório raiz das tabelas
+        """
+        self.base_dir = base_dir
+        if not os.path.exists(base_dir):
+            os.makedirs(base_dir)
+
+    @staticmethod
+    def build_schema(data_dictionary: List[Dict[str, Any]], table_name: str) -> Dict[str, Any]:
+        """
+        Deriva o layout colunar de uma tabela a partir do dicionário.
+
+        Args:
+            data_dictionary: Lista com definições de colunas
+            table_name: Nome da tabela
+
+        Returns:
+            Dicionário com colunas na ordem do dicionário e suas especificações
+        """
+        columns = {}
+        for col in data_dictionary:
+            if col.get('tabela') != table_name:
+                continue
+            spec = parse_column_type(col.get('tipo', ''))
+            spec['aceita_nulos'] = col.get('aceita_nulos', True)
+            columns[col['coluna']] = spec
+
+        if not columns:
+            raise ValueError(f"Tabela '{table_name}' não encontrada no dicionário")
+        return {'table': table_name, 'columns': columns}
+
+    def write_table(self, table_name: str, rows: ColumnData,
+                    data_dictionary: List[Dict[str, Any]]) -> str:
+        """
+        Grava uma tabela em arquivos por coluna.
+
+        Args:
+            table_name: Nome da tabela
+            rows: Lista de linhas (dicts) ou dicionário de colunas
+            data_dictionary: Dicionário de dados com os tipos
+
+        Returns:
+            Diretório da tabela gravada
+
+        Raises:
+            ValueError: Colunas de tamanhos diferentes, nulos em coluna
+                        NOT NULL ou valores incompatíveis com o tipo
+        """
+        schema = self.build_schema(data_dictionary, table_name)
+        columns = _to_columns(rows, list(schema['columns']))
+        lengths = {name: len(values) for name, values in columns.items()}
+        num_rows = max(lengths.values())
+        if len(set(lengths.values())) > 1:
+            raise ValueError(f"Colunas com quantidades diferentes de valores: {lengths}")
+
+        # Todas as colunas são validadas antes de gravar qualquer arquivo
+        encoded = {}
+        for name, spec in schema['columns'].items():
+            try:
+                encoded[name] = _encode_column(spec, columns[name])
+            except ValueError as e:
+                raise ValueError(f"Coluna '{name}': {e}") from e
+
+        table_dir = os.path.join(self.base_dir, table_name)
+        if not os.path.exists(table_dir):
+            os.makedirs(table_dir)
+
+        for name, arrays in encoded.items():
+            for suffix, array in arrays.items():
+                array.tofile(os.path.join(table_dir, f"{name}.{suffix}"))
+
+        schema['num_rows'] = num_rows
+        with open(os.path.join(table_dir, '_schema.json'), 'w', encoding='utf-8') as f:
+            json.dump(schema, f, indent=2, ensure_ascii=False)
+
+        return table_dir
+
+    def open_table(self, table_name: str) -> 'ColumnarTable':
+        """Abre uma tabela gravada para leitura mapeada em memória."""
+        return ColumnarTable(os.path.join(self.base_dir, table_name))
+
+
+class ColumnarTable:
+    """Acesso somente leitura às colunas de uma tabela via numpy.memmap."""
+
+    def __init__(self, table_dir: str):
+        """
+        Abre o schema da tabela.
+
+        Args:
+            table_dir: Diretório da tabela
+        """
+        self.table_dir = table_dir
+        with open(os.path.join(table_dir, '_schema.json'), encoding='utf-8') as f:
+            self.schema = json.load(f)
+        self.num_rows = self.schema['num_rows']
+        self.columns = self.schema['columns']
+
+    def _map(self, filename: str, dtype: str, count: int) -> np.ndarray:
+        """Mapeia um arquivo de coluna (arquivos vazios não podem ser mapeados)."""
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(self.table_dir, filename), dtype=dtype, mode='r', shape=(count,))
+
+    def raw(self, name: str) -> np.ndarray:
+        """
+        Retorna o array físico de uma coluna, sem cópia.
+
+        Para VARCHAR retorna os bytes concatenados; use offsets() para fatiar.
+        """
+        spec = self._spec(name)
+        if spec['kind'] == 'varchar':
+            count = int(self.offsets(name)[-1]) if self.num_rows else 0
+            return self._map(f"{name}.data", 'u1', count)
+        return self._map(f"{name}.data", spec['dtype'], self.num_rows)
+
+    def offsets(self, name: str) -> np.ndarray:
+        """Offsets (n + 1) de uma coluna VARCHAR."""
+        if self._spec(name)['kind'] != 'varchar':
+            raise ValueError(f"Coluna '{name}' não é VARCHAR")
+        return self._map(f"{name}.offsets", '<i8', self.num_rows + 1)
+
+    def valid_mask(self, name: str) -> np.ndarray:
+        """Máscara booleana de valores preenchidos (False = NULL)."""
+        self._spec(name)
+        packed = self._map(f"{name}.nulls", 'u1', (self.num_rows + 7) // 8)
+        return np.unpackbits(packed, count=self.num_rows, bitorder='little').astype(bool)
+
+    def values(self, name: str) -> np.ndarray:
+        """
+        Decodifica uma coluna para o formato usado pelos engines vetorizados.
+
+        Numéricos viram float64 com NaN para nulos, datas viram datetime64
+        com NaT e textos viram arrays de objetos com None.
+        """
+        spec = self._spec(name)
+        valid = self.valid_mask(name)
+        kind = spec['kind']
+
+        if kind == 'varchar':
+            offsets = np.asarray(self.offsets(name))
+            data = self.raw(name).tobytes()
+            return np.array([
+                data[offsets[i]:offsets[i + 1]].decode('utf-8') if valid[i] else None
+                for i in range(self.num_rows)
+            ], dtype=object)
+
+        raw = self.raw(name)
+        if kind == 'char':
+            decoded = np.char.decode(raw, 'utf-8').astype(object)
+            decoded[~valid] = None
+            return decoded
+        if kind == 'date':
+            return np.where(valid, raw.astype('datetime64[D]'), np.datetime64('NaT'))
+        if kind == 'timestamp':
+            return np.where(valid, raw.astype('datetime64[us]'), np.datetime64('NaT'))
+        if kind == 'decimal':
+            return np.where(valid, raw / 10.0 ** spec['scale'], np.nan)
+        return np.where(valid, raw.astype(np.float64), np.nan)
+
+    def to_columns(self, names: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """Decodifica várias colunas de uma vez."""
+        return {name: self.values(name) for name in (names or list(self.columns))}
+
+    def _spec(self, name: str) -> Dict[str, Any]:
+        """Especificação de armazenamento da coluna."""
+        spec = self.columns.get(name)
+        if spec is None:
+            raise KeyError(f"Coluna '{name}' não encontrada em {self.schema['table']}")
+        return spec
+
+
+if __name__ == '__main__':
+    import tempfile
+    from dictionary_simulator import data_dictionary
+
+    rows = [
+        {'id_cliente': 1, 'nome_cliente': 'Carlos Silva', 'cpf': '12345678901',
+         'valor_premio': 250.00, 'score_risco': 28.5},
+        {'id_cliente': 2, 'nome_cliente': 'Maria Oliveira', 'cpf': '23456789012',
+         'valor_premio': None, 'score_risco': 32.1},
+        {'id_cliente': 3, 'nome_cliente': 'José Pereira', 'cpf': '34567890123',
+         'valor_premio': 320.00, 'score_risco': None}
+    ]
+
+    store = ColumnarStore(tempfile.mkdtemp())
+    store.write_table('clientes_seguros', rows, data_dictionary)
+    table = store.open_table('clientes_seguros')
+
+    print("Linhas:", table.num_rows)
+    for name in table.columns:
+        print(f"  {name}: {table.values(name).tolist()}")
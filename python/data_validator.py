@@ -5,11 +5,37 @@
 # Implementa regras de negócio e verificações de qualidade
 
 import json
+import math
+import random
 from datetime import datetime
-from typing import List, Dict, Tuple, Any
+from statistics import NormalDist
+from typing import List, Dict, Tuple, Any, Optional, Sequence, NamedTuple
+
+
+class ValidationResult(NamedTuple):
+    """Resultado imutável da validação de uma linha."""
+    valid: bool
+    errors: Tuple[str, ...]
+    warnings: Tuple[str, ...]
+    timestamp: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Representação em dicionário (formato de validate_row)."""
+        return {
+            'valid': self.valid,
+            'errors': list(self.errors),
+            'warnings': list(self.warnings),
+            'timestamp': self.timestamp
+        }
+
 
 class DataValidator:
-    """Valida dados contra regras definidas no dicionário de dados."""
+    """
+    Valida dados contra regras definidas no dicionário de dados.
+    
+    O validador não guarda estado entre chamadas: uma mesma instância
+    pode ser compartilhada entre threads e tarefas asyncio.
+    """
     
     def __init__(self, data_dictionary: List[Dict[str, Any]]):
         """
@@ -19,8 +45,10 @@ class DataValidator:
             data_dictionary: Lista com definições de colunas
         """
         self.data_dictionary = data_dictionary
-        self.validation_errors = []
-        self.validation_warnings = []
+        # Índice somente leitura (primeira definição de cada coluna)
+        self._definitions: Dict[str, Dict[str, Any]] = {}
+        for col_def in data_dictionary:
+            self._definitions.setdefault(col_def.get('coluna'), col_def)
         
     def validate_data_type(self, column_name: str, value: Any) -> Tuple[bool, str]:
         """
@@ -33,7 +61,7 @@ class DataValidator:
         Returns:
             Tupla (bool, mensagem_erro)
         """
-        col_def = self._find_column_definition(column_name)
+        col_def = self.find_column_definition(column_name)
         if not col_def:
             return False, f"Coluna '{column_name}' não encontrada no dicionário"
         
@@ -65,7 +93,7 @@ class DataValidator:
         Returns:
             Tupla (bool, mensagem_erro)
         """
-        col_def = self._find_column_definition(column_name)
+        col_def = self.find_column_definition(column_name)
         if not col_def:
             return False, f"Coluna '{column_name}' não encontrada"
         
@@ -85,7 +113,7 @@ class DataValidator:
         Returns:
             Tupla (bool, mensagem_erro)
         """
-        col_def = self._find_column_definition(column_name)
+        col_def = self.find_column_definition(column_name)
         if not col_def:
             return False, f"Coluna '{column_name}' não encontrada"
         
@@ -103,66 +131,86 @@ class DataValidator:
             row_data: Dicionário com dados da linha
             
         Returns:
-            Dicionário com resultados da validação
+            Dicionário com resultados da validação (novo a cada chamada)
         """
-        self.validation_errors.clear()
-        self.validation_warnings.clear()
+        return self.check_row(table_name, row_data).to_dict()
+    
+    def check_row(self, table_name: str, row_data: Dict[str, Any]) -> ValidationResult:
+        """
+        Valida uma linha sem alterar o estado do validador.
         
-        for column_name, value in row_data.items():
-            col_def = self._find_column_definition(column_name)
-            if not col_def or col_def.get('tabela') != table_name:
-                self.validation_warnings.append(f"Coluna '{column_name}' não pertence à tabela '{table_name}'")
-                continue
-            
-            # Validações sequenciais
-            is_valid, msg = self.validate_primary_key(column_name, value)
-            if not is_valid:
-                self.validation_errors.append(msg)
-                continue
-            
-            is_valid, msg = self.validate_nullability(column_name, value)
-            if not is_valid:
-                self.validation_errors.append(msg)
-                continue
+        Args:
+            table_name: Nome da tabela
+            row_data: Dicionário com dados da linha
             
-            is_valid, msg = self.validate_data_type(column_name, value)
-            if not is_valid:
-                self.validation_errors.append(msg)
-                continue
-        
-        return {
-            'valid': len(self.validation_errors) == 0,
-            'errors': self.validation_errors,
-            'warnings': self.validation_warnings,
-            'timestamp': datetime.now().isoformat()
-        }
+        Returns:
+            ValidationResult imutável
+        """
+        issues, warnings = self._collect_issues(table_name, row_data)
+        return ValidationResult(
+            valid=not issues,
+            errors=tuple(msg for _, _, msg in issues),
+            warnings=tuple(warnings),
+            timestamp=datetime.now().isoformat()
+        )
     
-    def generate_validation_report(self, data_rows: List[Dict[str, Any]], 
-                                  table_name: str) -> Dict[str, Any]:
+    def generate_validation_report(self, data_rows: Sequence[Dict[str, Any]], 
+                                  table_name: str,
+                                  sample_size: Optional[int] = None,
+                                  stratify_by: Optional[str] = None,
+                                  confidence: float = 0.95,
+                                  max_margin: Optional[float] = None,
+                                  batch_size: int = 1000,
+                                  seed: Optional[int] = None) -> Dict[str, Any]:
         """
         Gera relatório de validação para múltiplas linhas.
         
+        Sem sample_size e sem max_margin todas as linhas são validadas.
+        Com qualquer um dos dois o relatório é aproximado: valida uma
+        amostra (uniforme ou estratificada) e estima as taxas de erro
+        com intervalos de confiança. A amostra uniforme sorteia índices
+        sem percorrer a fonte; a estratificada lê apenas a coluna de
+        estratos uma vez.
+        
         Args:
-            data_rows: Lista de linhas a validar
+            data_rows: Linhas a validar (sequência com acesso por índice)
             table_name: Nome da tabela
+            sample_size: Máximo de linhas amostradas no modo aproximado
+            stratify_by: Coluna usada para estratificar a amostra (ex.: tipo_seguro)
+            confidence: Nível de confiança dos intervalos
+            max_margin: Encerra a amostragem quando a maior semiamplitude
+                dos intervalos ficar abaixo deste valor
+            batch_size: Linhas validadas entre duas verificações de parada
+            seed: Semente da amostragem
             
         Returns:
             Dicionário com estatísticas de validação
+            
+        Raises:
+            ValueError: confidence fora do intervalo (0, 1) no modo aproximado
         """
+        if sample_size is not None or max_margin is not None:
+            return self._generate_sampled_report(
+                data_rows, table_name, sample_size, stratify_by,
+                confidence, max_margin, batch_size, seed
+            )
+        
         total_rows = len(data_rows)
         valid_rows = 0
         invalid_rows = 0
         all_errors = []
         
         for idx, row in enumerate(data_rows, 1):
-            result = self.validate_row(table_name, row)
-            if result['valid']:
+            issues, _ = self._collect_issues(table_name, row)
+            if not issues:
                 valid_rows += 1
             else:
                 invalid_rows += 1
-                for error in result['errors']:
+                for column, error_type, error in issues:
                     all_errors.append({
                         'row_number': idx,
+                        'column': column,
+                        'error_type': error_type,
                         'error': error
                     })
         
@@ -176,12 +224,212 @@ class DataValidator:
             'generated_at': datetime.now().isoformat()
         }
     
-    def _find_column_definition(self, column_name: str) -> Dict[str, Any]:
-        """Encontra definição da coluna no dicionário."""
-        for col_def in self.data_dictionary:
-            if col_def.get('coluna') == column_name:
-                return col_def
-        return None
+    def _generate_sampled_report(self, data_rows: Sequence[Dict[str, Any]],
+                                 table_name: str,
+                                 sample_size: Optional[int],
+                                 stratify_by: Optional[str],
+                                 confidence: float,
+                                 max_margin: Optional[float],
+                                 batch_size: int,
+                                 seed: Optional[int]) -> Dict[str, Any]:
+        """Relatório aproximado por amostragem com parada adaptativa."""
+        if not 0 < confidence < 1:
+            raise ValueError(f"confidence deve estar entre 0 e 1 (exclusivo), recebido {confidence}")
+        
+        total_rows = len(data_rows)
+        limit = min(sample_size or total_rows, total_rows)
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        rng = random.Random(seed)
+        
+        # Estratos: {valor: índices}. Sem estratificação há um único estrato
+        # e os índices são sorteados sem percorrer a fonte.
+        if stratify_by:
+            strata: Dict[Any, Any] = {}
+            for idx, row in enumerate(data_rows):
+                strata.setdefault(str(row.get(stratify_by)), []).append(idx)
+        else:
+            strata = {'*': range(total_rows)}
+        
+        populations = {h: len(idx) for h, idx in strata.items()}
+        allocation = self._allocate_sample(populations, limit)
+        queues = {h: rng.sample(idx, allocation[h]) for h, idx in strata.items()}
+        
+        sampled = {h: 0 for h in strata}
+        invalid = {h: 0 for h in strata}
+        category_counts: Dict[Tuple[str, str], Dict[str, int]] = {}
+        all_errors = []
+        stopped_early = False
+        planned = sum(len(q) for q in queues.values())
+        
+        while sum(sampled.values()) < planned:
+            # Uma rodada retira de cada estrato a sua fração do lote
+            taken = sum(sampled.values())
+            for h, queue in queues.items():
+                share = max(1, int(round(batch_size * len(queue) / planned)))
+                for idx in queue[sampled[h]:sampled[h] + share]:
+                    issues, _ = self._collect_issues(table_name, data_rows[idx])
+                    if issues:
+                        invalid[h] += 1
+                    for column, error_type in {(c, t) for c, t, _ in issues}:
+                        counts = category_counts.setdefault((column, error_type), {})
+                        counts[h] = counts.get(h, 0) + 1
+                    for column, error_type, msg in issues:
+                        all_errors.append({'row_number': idx + 1, 'column': column,
+                                           'error_type': error_type, 'error': msg})
+                sampled[h] = min(sampled[h] + share, len(queue))
+            if sum(sampled.values()) == taken:
+                break
+            
+            if max_margin is not None and sum(sampled.values()) < planned:
+                margins = [self._stratified_interval(invalid, sampled, populations, z)]
+                margins.extend(
+                    self._stratified_interval(c, sampled, populations, z)
+                    for c in category_counts.values()
+                )
+                if max((hi - lo) / 2 for _, lo, hi in margins) <= max_margin:
+                    stopped_early = True
+                    break
+        
+        rate, lower, upper = self._stratified_interval(invalid, sampled, populations, z)
+        error_rates = []
+        for (column, error_type), counts in sorted(category_counts.items()):
+            c_rate, c_lower, c_upper = self._stratified_interval(counts, sampled, populations, z)
+            error_rates.append({
+                'column': column,
+                'error_type': error_type,
+                'sampled_errors': sum(counts.values()),
+                'estimated_rate': round(c_rate, 6),
+                'ci_lower': round(c_lower, 6),
+                'ci_upper': round(c_upper, 6)
+            })
+        
+        total_sampled = sum(sampled.values())
+        total_invalid = sum(invalid.values())
+        return {
+            'table': table_name,
+            'mode': 'amostral',
+            'total_rows': total_rows,
+            'sampled_rows': total_sampled,
+            'valid_rows': total_sampled - total_invalid,
+            'invalid_rows': total_invalid,
+            'success_rate': f"{(1 - rate) * 100:.2f}%" if total_sampled > 0 else "0%",
+            'estimated_error_rate': {
+                'rate': round(rate, 6),
+                'ci_lower': round(lower, 6),
+                'ci_upper': round(upper, 6),
+                'confidence': confidence,
+                'estimated_invalid_rows': int(round(rate * total_rows))
+            },
+            'error_rates': error_rates,
+            'strata': {
+                h: {'population': populations[h], 'sampled': sampled[h]}
+                for h in strata
+            } if stratify_by else None,
+            'stopped_early': stopped_early,
+            'errors': sorted(all_errors, key=lambda e: e['row_number']),
+            'generated_at': datetime.now().isoformat()
+        }
+    
+    @staticmethod
+    def _allocate_sample(populations: Dict[Any, int], limit: int) -> Dict[Any, int]:
+        """
+        Alocação proporcional da amostra entre os estratos, somando no máximo limit.
+        
+        Cada estrato recebe uma linha (os maiores primeiro, se houver mais
+        estratos do que linhas) e o restante é dividido proporcionalmente
+        pelo método dos maiores restos.
+        """
+        allocation = {h: 0 for h in populations}
+        for h in sorted(populations, key=lambda h: -populations[h])[:max(limit, 0)]:
+            allocation[h] = min(1, populations[h])
+        
+        remaining = limit - sum(allocation.values())
+        spare = {h: populations[h] - allocation[h] for h in populations}
+        spare_total = sum(spare.values())
+        if remaining <= 0 or not spare_total:
+            return allocation
+        
+        quotas = {h: remaining * spare[h] / spare_total for h in populations}
+        for h, quota in quotas.items():
+            allocation[h] += int(quota)
+        leftover = remaining - sum(int(q) for q in quotas.values())
+        by_remainder = sorted(populations, key=lambda h: int(quotas[h]) - quotas[h])
+        for h in by_remainder[:leftover]:
+            allocation[h] += 1
+        return allocation
+    
+    @staticmethod
+    def _stratified_interval(successes: Dict[Any, int], sampled: Dict[Any, int],
+                             populations: Dict[Any, int], z: float) -> Tuple[float, float, float]:
+        """
+        Estimativa estratificada de uma proporção com intervalo de Wilson.
+        
+        A variância do estimador estratificado (com correção de população
+        finita) define o tamanho efetivo de amostra usado no intervalo.
+        """
+        total = sum(populations[h] for h in sampled if sampled[h])
+        if not total:
+            return 0.0, 0.0, 1.0
+        
+        rate = variance = 0.0
+        for h, n_h in sampled.items():
+            if not n_h:
+                continue
+            weight = populations[h] / total
+            p_h = successes.get(h, 0) / n_h
+            fpc = 1 - n_h / populations[h]
+            rate += weight * p_h
+            if n_h > 1:
+                variance += weight * weight * fpc * p_h * (1 - p_h) / (n_h - 1)
+        
+        n = sum(sampled.values())
+        if n >= total:
+            return rate, rate, rate
+        n_eff = rate * (1 - rate) / variance if variance > 0 else n
+        denominator = 1 + z * z / n_eff
+        centre = rate + z * z / (2 * n_eff)
+        margin = z * math.sqrt(rate * (1 - rate) / n_eff + z * z / (4 * n_eff * n_eff))
+        return rate, max(0.0, (centre - margin) / denominator), min(1.0, (centre + margin) / denominator)
+    
+    def _collect_issues(self, table_name: str,
+                        row_data: Dict[str, Any]) -> Tuple[List[Tuple[str, str, str]], List[str]]:
+        """
+        Aplica as validações de coluna a uma linha.
+        
+        Returns:
+            Tupla (erros como (coluna, tipo_erro, mensagem), avisos)
+        """
+        errors = []
+        warnings = []
+        
+        for column_name, value in row_data.items():
+            col_def = self.find_column_definition(column_name)
+            if not col_def or col_def.get('tabela') != table_name:
+                warnings.append(f"Coluna '{column_name}' não pertence à tabela '{table_name}'")
+                continue
+            
+            # Validações sequenciais
+            for error_type, check in (('CHAVE_PRIMARIA', self.validate_primary_key),
+                                      ('NULO', self.validate_nullability),
+                                      ('TIPO', self.validate_data_type)):
+                is_valid, msg = check(column_name, value)
+                if not is_valid:
+                    errors.append((column_name, error_type, msg))
+                    break
+        
+        return errors, warnings
+    
+    def find_column_definition(self, column_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Encontra a definição da coluna no dicionário.
+
+        Args:
+            column_name: Nome da coluna
+
+        Returns:
+            Definição da coluna ou None se ela não estiver no dicionário
+        """
+        return self._definitions.get(column_name)
     
     @staticmethod
     def _is_valid_date(date_value: str) -> bool:
@@ -254,6 +502,19 @@ if __name__ == '__main__':
     result = validator.validate_row('clientes_seguros', test_row)
     print("Resultado da validação:", json.dumps(result, indent=2, ensure_ascii=False))
     
+    # Relatório aproximado por amostragem estratificada
+    sample_rows = [
+        dict(test_row, id_cliente=i if i % 50 else None,
+             tipo_seguro=('AUTOMOVEL', 'VIDA', 'RESIDENCIAL')[i % 3])
+        for i in range(100000)
+    ]
+    approximate = validator.generate_validation_report(
+        sample_rows, 'clientes_seguros', stratify_by='tipo_seguro',
+        max_margin=0.01, seed=42
+    )
+    approximate.pop('errors')
+    print("\nValidação por Amostragem:", json.dumps(approximate, indent=2, ensure_ascii=False))
+    
     # Relatório de sensibilidade
     sensitivity = classifier.classify_sensitivity(data_dictionary)
     print("\nClassificação por Sensibilidade:", json.dumps(sensitivity, indent=2, ensure_ascii=False))
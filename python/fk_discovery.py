@@ -0,0 +1,285 @@
+# =========================================
+# Foreign Key Discovery - Dependências de Inclusão
+# =========================================
+# Descobre chaves estrangeiras candidatas entre tabelas do catálogo.
+# Cada coluna recebe, em uma passada sobre os dados, uma assinatura
+# MinHash (similaridade de Jaccard) e um HyperLogLog (cardinalidade).
+# Os pares são podados por compatibilidade de tipo segundo o dicionário,
+# a inclusão A ⊆ B é estimada pelas assinaturas e apenas os melhores
+# candidatos são confirmados com comparação exata.
+#
+# Chaves substitutas sequenciais estão contidas em qualquer outra sequência
+# que comece em 1, por isso a origem também é filtrada: colunas que são
+# chave (PK no dicionário ou valores únicos) só referenciam uma chave de
+# mesmo nome, e colunas com poucos valores distintos são descartadas.
+
+import hashlib
+from datetime import date
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from columnar_store import parse_column_type
+
+_MERSENNE_PRIME = np.uint64(4294967311)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+TableData = Dict[str, Dict[str, Sequence[Any]]]
+
+
+def _normalize(value: Any) -> str:
+    """Representação canônica para comparar valores de tipos compatíveis."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return str(value).strip()
+
+
+def _hash64(values: Sequence[Any]) -> np.ndarray:
+    """Hash de 64 bits de cada valor não nulo."""
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(_normalize(v).encode('utf-8'), digest_size=8).digest(), 'big')
+         for v in values if v is not None and not (isinstance(v, float) and v != v)),
+        dtype=np.uint64
+    )
+
+
+def _type_class(tipo: Optional[str]) -> Optional[str]:
+    """Classe de compatibilidade de um tipo do dicionário (None = desconhecido)."""
+    if not tipo:
+        return None
+    try:
+        spec = parse_column_type(tipo)
+    except ValueError:
+        return None
+    kind = spec['kind']
+    if kind == 'int' or (kind == 'decimal' and spec['scale'] == 0):
+        return 'integer'
+    if kind in ('char', 'varchar'):
+        return 'text'
+    if kind in ('date', 'timestamp'):
+        return 'temporal'
+    return 'decimal'
+
+
+def _infer_type_class(values: Sequence[Any], sample: int = 1000) -> Optional[str]:
+    """Classe de tipo inferida dos valores de uma coluna ausente do dicionário."""
+    classes = set()
+    for value in values:
+        if value is None or (isinstance(value, float) and value != value):
+            continue
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, (int, np.integer)) or (isinstance(value, float) and value.is_integer()):
+            classes.add('integer')
+        elif isinstance(value, (float, np.floating)):
+            classes.add('decimal')
+        elif isinstance(value, (str, bytes)):
+            classes.add('text')
+        elif isinstance(value, date):
+            classes.add('temporal')
+        else:
+            return None
+        sample -= 1
+        if not sample:
+            break
+    if classes == {'integer', 'decimal'}:
+        return 'decimal'
+    return classes.pop() if len(classes) == 1 else None
+
+
+class ColumnSignature:
+    """Assinatura MinHash + HyperLogLog de uma coluna."""
+
+    def __init__(self, num_perm: int = 128, hll_precision: int = 12, seed: int = 1):
+        """
+        Inicializa a assinatura vazia.
+
+        Args:
+            num_perm: Quantidade de permutações do MinHash
+            hll_precision: Bits de índice do HyperLogLog (2^p registradores)
+            seed: Semente das permutações (deve ser igual entre colunas comparadas)
+        """
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 31, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2 ** 31, num_perm, dtype=np.uint64)
+        self.minhash = np.full(num_perm, _MERSENNE_PRIME, dtype=np.uint64)
+        self.precision = hll_precision
+        self.registers = np.zeros(2 ** hll_precision, dtype=np.uint8)
+        self.count = 0
+
+    def update(self, values: Sequence[Any], chunk_size: int = 4096):
+        """Acrescenta valores à assinatura."""
+        hashes = _hash64(values)
+        self.count += len(hashes)
+
+        for start in range(0, len(hashes), chunk_size):
+            chunk = hashes[start:start + chunk_size]
+            low = chunk & _MAX_HASH
+            permuted = (self._a[:, None] * low[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+            np.minimum(self.minhash, permuted.min(axis=1), out=self.minhash)
+
+            p = np.uint64(self.precision)
+            index = (chunk >> (np.uint64(64) - p)).astype(np.int64)
+            rest = (chunk << p) | (np.uint64(1) << (p - np.uint64(1)))
+            # Posição do primeiro bit 1 nos bits restantes (1-based)
+            rank = (64 - np.floor(np.log2(rest.astype(np.float64)))).astype(np.uint8)
+            np.maximum.at(self.registers, index, rank)
+
+    def cardinality(self) -> float:
+        """Estimativa HyperLogLog de valores distintos."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(2.0 ** -self.registers.astype(np.float64))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return float(estimate)
+
+    def jaccard(self, other: 'ColumnSignature') -> float:
+        """Similaridade de Jaccard estimada com outra assinatura."""
+        return float(np.mean(self.minhash == other.minhash))
+
+    def containment_in(self, other: 'ColumnSignature') -> float:
+        """Estimativa de |A ∩ B| / |A| para A = self e B = other."""
+        card_a = self.cardinality()
+        card_b = other.cardinality()
+        if card_a == 0:
+            return 0.0
+        j = self.jaccard(other)
+        intersection = j * (card_a + card_b) / (1 + j)
+        return min(1.0, intersection / card_a)
+
+
+class ForeignKeyDiscovery:
+    """Descobre dependências de inclusão entre colunas de tabelas diferentes."""
+
+    def __init__(self, data_dictionary: List[Dict[str, Any]],
+                 min_containment: float = 0.9,
+                 confirm_top: int = 20,
+                 num_perm: int = 128,
+                 min_source_distinct: int = 10):
+        """
+        Inicializa a descoberta.
+
+        Args:
+            data_dictionary: Dicionário de dados (tipos e chaves primárias)
+            min_containment: Inclusão estimada mínima para um candidato
+            confirm_top: Quantidade máxima de candidatos confirmados exatamente
+            num_perm: Permutações do MinHash
+            min_source_distinct: Valores distintos mínimos da coluna de origem
+        """
+        self.data_dictionary = data_dictionary
+        self.min_containment = min_containment
+        self.min_source_distinct = min_source_distinct
+        self.confirm_top = confirm_top
+        self.num_perm = num_perm
+        self._definitions = {
+            (col.get('tabela'), col.get('coluna')): col for col in data_dictionary
+        }
+
+    def build_signatures(self, tables: TableData) -> Dict[Tuple[str, str], ColumnSignature]:
+        """Calcula a assinatura de cada coluna em uma passada sobre os dados."""
+        signatures = {}
+        for table, columns in tables.items():
+            for column, values in columns.items():
+                signature = ColumnSignature(num_perm=self.num_perm)
+                signature.update(values)
+                if signature.count:
+                    signatures[(table, column)] = signature
+        return signatures
+
+    def _type_classes(self, tables: TableData) -> Dict[Tuple[str, str], Optional[str]]:
+        """
+        Classe de tipo de cada coluna: a do dicionário quando declarada,
+        senão a inferida dos valores. Tipos declarados desconhecidos
+        (ex.: BIT) ficam None.
+        """
+        classes = {}
+        for table, columns in tables.items():
+            for column, values in columns.items():
+                definition = self._definitions.get((table, column))
+                if definition is not None and definition.get('tipo'):
+                    classes[(table, column)] = _type_class(definition['tipo'])
+                else:
+                    classes[(table, column)] = _infer_type_class(values)
+        return classes
+
+    @staticmethod
+    def _compatible(source_type: Optional[str], target_type: Optional[str]) -> bool:
+        """Tipos desconhecidos só são compatíveis entre si."""
+        return source_type == target_type
+
+    def _is_key_like(self, column: Tuple[str, str], signature: ColumnSignature) -> bool:
+        """Colunas referenciadas devem ser PK ou ter valores (quase) únicos."""
+        if self._definitions.get(column, {}).get('chave_primaria'):
+            return True
+        return signature.cardinality() >= 0.95 * signature.count
+
+    def discover(self, tables: TableData) -> List[Dict[str, Any]]:
+        """
+        Descobre chaves estrangeiras entre as tabelas informadas.
+
+        Args:
+            tables: Dados por tabela no formato {tabela: {coluna: valores}}
+
+        Returns:
+            Lista de chaves estrangeiras confirmadas
+        """
+        signatures = self.build_signatures(tables)
+        type_classes = self._type_classes(tables)
+        targets = [key for key, sig in signatures.items() if self._is_key_like(key, sig)]
+
+        candidates = []
+        for source, source_sig in signatures.items():
+            if source_sig.cardinality() < self.min_source_distinct:
+                continue
+            # Chave da própria tabela só referencia chave de mesmo nome (1:1)
+            source_is_key = source in targets
+            for target in targets:
+                if source[0] == target[0]:
+                    continue
+                if source_is_key and source[1] != target[1]:
+                    continue
+                if not self._compatible(type_classes[source], type_classes[target]):
+                    continue
+                estimate = source_sig.containment_in(signatures[target])
+                if estimate >= self.min_containment:
+                    candidates.append((source[1] == target[1], estimate, source, target))
+
+        # Colunas com o mesmo nome têm prioridade na confirmação exata
+        candidates.sort(key=lambda c: (c[0], c[1]), reverse=True)
+
+        foreign_keys = []
+        for _, estimate, source, target in candidates[:self.confirm_top]:
+            source_values = {_normalize(v) for v in tables[source[0]][source[1]] if v is not None}
+            target_values = {_normalize(v) for v in tables[target[0]][target[1]] if v is not None}
+            if source_values and source_values <= target_values:
+                foreign_keys.append({
+                    'table': source[0],
+                    'column': source[1],
+                    'references_table': target[0],
+                    'references_column': target[1],
+                    'estimated_containment': round(estimate, 4)
+                })
+        return foreign_keys
+
+
+if __name__ == '__main__':
+    import json
+    from dictionary_simulator import data_dictionary
+
+    tables = {
+        'clientes_seguros': {
+            'id_cliente': list(range(1, 501)),
+            'cpf': [f"{i:011d}" for i in range(1, 501)]
+        },
+        'tb_erros_validacao': {
+            'id_erro': list(range(1, 201)),
+            'id_cliente': [(i * 7) % 500 + 1 for i in range(200)]
+        }
+    }
+
+    discovery = ForeignKeyDiscovery(data_dictionary)
+    print(json.dumps(discovery.discover(tables), indent=2, ensure_ascii=False))
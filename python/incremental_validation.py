@@ -0,0 +1,324 @@
+# =========================================
+# Incremental Validation - Revalidação Após Mudanças no Dicionário
+# =========================================
+# Compara duas versões do dicionário de dados, identifica quais colunas e
+# quais verificações do DataValidator foram afetadas e reexecuta apenas
+# essas verificações sobre os dados armazenados (SQLite ou ColumnarStore),
+# atualizando o relatório anterior de generate_validation_report.
+#
+# Para cada coluna o DataValidator aplica, em ordem, CHAVE_PRIMARIA, NULO e
+# TIPO, parando no primeiro erro. Disso resulta que:
+#   - em linhas nulas o erro depende só de (chave_primaria, aceita_nulos,
+#     tipo) e é recalculado apenas com a máscara de nulos da coluna;
+#   - em linhas preenchidas o erro depende só da categoria de tipo testada
+#     por validate_data_type (INT, VARCHAR, número, DATE); a varredura dos
+#     valores só é necessária quando essa categoria muda. Alargar um
+#     VARCHAR(100) para VARCHAR(200), por exemplo, não relê nenhum valor.
+
+import sqlite3
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+import numpy as np
+
+from data_validator import DataValidator
+from columnar_store import ColumnarTable
+
+CHECKED_ATTRIBUTES = ('tipo', 'aceita_nulos', 'chave_primaria')
+
+
+def type_category(tipo: str) -> Optional[str]:
+    """Categoria de tipo testada por DataValidator.validate_data_type (None = sem teste)."""
+    tipo = (tipo or '').upper()
+    if 'INT' in tipo:
+        return 'INT'
+    if 'VARCHAR' in tipo:
+        return 'VARCHAR'
+    if 'DECIMAL' in tipo or 'FLOAT' in tipo:
+        return 'NUMERICO'
+    if 'DATE' in tipo:
+        return 'DATE'
+    return None
+
+
+def _table_definitions(data_dictionary: List[Dict[str, Any]],
+                       table_name: str, columns: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Definição efetiva de cada coluna, com a mesma busca do DataValidator."""
+    validator = DataValidator(data_dictionary)
+    definitions = {}
+    for column in columns:
+        col_def = validator.find_column_definition(column)
+        if col_def and col_def.get('tabela') == table_name:
+            definitions[column] = col_def
+    return definitions
+
+
+def diff_dictionaries(old_dictionary: List[Dict[str, Any]],
+                      new_dictionary: List[Dict[str, Any]],
+                      table_name: str,
+                      columns: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Determina as colunas e verificações afetadas entre duas versões do dicionário.
+
+    Args:
+        old_dictionary: Versão usada no relatório anterior
+        new_dictionary: Nova versão do dicionário
+        table_name: Tabela validada
+        columns: Colunas presentes nos dados
+
+    Returns:
+        Dicionário {coluna: {'changes', 'recheck_nulls', 'recheck_values', 'removed'}}
+        apenas para as colunas afetadas
+    """
+    old_defs = _table_definitions(old_dictionary, table_name, columns)
+    new_defs = _table_definitions(new_dictionary, table_name, columns)
+
+    affected = {}
+    for column in columns:
+        old, new = old_defs.get(column), new_defs.get(column)
+        if old is None and new is None:
+            continue
+        if old is None or new is None:
+            changes = ['adicionada' if old is None else 'removida']
+        else:
+            changes = [
+                attribute for attribute in CHECKED_ATTRIBUTES
+                if old.get(attribute) != new.get(attribute)
+            ]
+            if not changes:
+                continue
+
+        removed = new is None
+        old_category = type_category(old.get('tipo')) if old else None
+        new_category = type_category(new.get('tipo')) if new else None
+        affected[column] = {
+            'changes': changes,
+            'removed': removed,
+            'recheck_nulls': not removed,
+            'recheck_values': not removed and (old is None or old_category != new_category)
+        }
+    return affected
+
+
+class SQLiteColumnSource:
+    """Leitura coluna a coluna de uma tabela SQLite (linhas na ordem do rowid)."""
+
+    def __init__(self, conn: sqlite3.Connection, table_name: str):
+        """
+        Args:
+            conn: Conexão sqlite3
+            table_name: Tabela com os dados validados
+        """
+        self.conn = conn
+        self.table_name = table_name
+        self.num_rows = conn.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0]
+
+    def columns(self) -> List[str]:
+        return [row[1] for row in self.conn.execute(f'PRAGMA table_info("{self.table_name}")')]
+
+    def null_mask(self, column: str) -> np.ndarray:
+        """Máscara de nulos calculada pelo próprio SQLite."""
+        cursor = self.conn.execute(
+            f'SELECT "{column}" IS NULL FROM "{self.table_name}" ORDER BY rowid'
+        )
+        return np.fromiter((row[0] for row in cursor), dtype=bool, count=self.num_rows)
+
+    def non_null_values(self, column: str) -> Iterator[Tuple[int, Any]]:
+        """Pares (índice da linha, valor) dos valores preenchidos."""
+        cursor = self.conn.execute(f'SELECT "{column}" FROM "{self.table_name}" ORDER BY rowid')
+        for index, (value,) in enumerate(cursor):
+            if value is not None:
+                yield index, value
+
+
+class ColumnarColumnSource:
+    """Leitura coluna a coluna de uma tabela do ColumnarStore."""
+
+    def __init__(self, table: ColumnarTable):
+        """
+        Args:
+            table: Tabela aberta com ColumnarStore.open_table
+        """
+        self.table = table
+        self.table_name = table.schema['table']
+        self.num_rows = table.num_rows
+
+    def columns(self) -> List[str]:
+        return list(self.table.columns)
+
+    def null_mask(self, column: str) -> np.ndarray:
+        """Máscara de nulos lida direto do bitmap, sem decodificar valores."""
+        return ~self.table.valid_mask(column)
+
+    def non_null_values(self, column: str) -> Iterator[Tuple[int, Any]]:
+        """Valores preenchidos convertidos para os tipos Python da ingestão."""
+        kind = self.table.columns[column]['kind']
+        valid = self.table.valid_mask(column)
+        if kind == 'int':
+            values = self.table.raw(column)
+            convert = int
+        elif kind in ('date', 'timestamp'):
+            values = self.table.values(column)
+            convert = lambda v: str(v)
+        else:
+            values = self.table.values(column)
+            convert = float if kind in ('decimal', 'float') else str
+        for index in np.flatnonzero(valid):
+            yield int(index), convert(values[index])
+
+
+class IncrementalRevalidator:
+    """Atualiza relatórios de validação após mudanças no dicionário."""
+
+    def __init__(self, old_dictionary: List[Dict[str, Any]],
+                 new_dictionary: List[Dict[str, Any]]):
+        """
+        Args:
+            old_dictionary: Versão do dicionário usada no relatório anterior
+            new_dictionary: Nova versão do dicionário
+        """
+        self.old_dictionary = old_dictionary
+        self.new_dictionary = new_dictionary
+        self.validator = DataValidator(new_dictionary)
+
+    def update_report(self, report: Dict[str, Any], source: Any) -> Dict[str, Any]:
+        """
+        Reexecuta as verificações afetadas e atualiza o relatório anterior.
+
+        O relatório recebido (de generate_validation_report, em modo completo)
+        é alterado no próprio objeto: os erros das colunas e linhas afetadas
+        são substituídos e as contagens recalculadas.
+
+        Args:
+            report: Relatório anterior
+            source: SQLiteColumnSource ou ColumnarColumnSource com os dados
+
+        Returns:
+            O mesmo relatório, atualizado
+        """
+        table_name = report['table']
+        affected = diff_dictionaries(
+            self.old_dictionary, self.new_dictionary, table_name, source.columns()
+        )
+
+        removed_errors = added_errors = values_scanned = 0
+        replacement: Dict[str, List[Dict[str, Any]]] = {}
+        scopes: Dict[str, Optional[np.ndarray]] = {}
+
+        for column, change in affected.items():
+            if change['removed']:
+                scopes[column] = None
+                replacement[column] = []
+                continue
+
+            nulls = source.null_mask(column)
+            scope = np.zeros(source.num_rows, dtype=bool)
+            new_errors: Dict[int, Tuple[str, str]] = {}
+
+            if change['recheck_nulls']:
+                scope |= nulls
+                error = self._null_row_error(column)
+                if error:
+                    for index in np.flatnonzero(nulls):
+                        new_errors[int(index)] = error
+
+            if change['recheck_values']:
+                scope |= ~nulls
+                cache: Dict[Any, Tuple[bool, str]] = {}
+                col_def = self.validator.find_column_definition(column)
+                by_value = col_def is not None and type_category(col_def.get('tipo')) == 'DATE'
+                for index, value in source.non_null_values(column):
+                    values_scanned += 1
+                    key = (type(value), value if by_value else None)
+                    if key not in cache:
+                        cache[key] = self.validator.validate_data_type(column, value)
+                    is_valid, msg = cache[key]
+                    if not is_valid:
+                        new_errors[index] = ('TIPO', msg)
+
+            scopes[column] = scope
+            replacement[column] = [
+                {'row_number': index + 1, 'column': column, 'error_type': error_type, 'error': msg}
+                for index, (error_type, msg) in sorted(new_errors.items())
+            ]
+
+        kept = []
+        for error in report['errors']:
+            column = error.get('column')
+            if column in scopes:
+                scope = scopes[column]
+                if scope is None or scope[error['row_number'] - 1]:
+                    removed_errors += 1
+                    continue
+            kept.append(error)
+        for errors in replacement.values():
+            kept.extend(errors)
+            added_errors += len(errors)
+
+        # Mesma ordem do relatório completo: linha e, dentro dela, ordem das colunas
+        column_order = {name: position for position, name in enumerate(source.columns())}
+        kept.sort(key=lambda e: (e['row_number'], column_order.get(e.get('column'), -1)))
+
+        invalid_rows = len({error['row_number'] for error in kept})
+        total_rows = report['total_rows']
+        valid_rows = total_rows - invalid_rows
+        report.update({
+            'valid_rows': valid_rows,
+            'invalid_rows': invalid_rows,
+            'success_rate': f"{(valid_rows / total_rows * 100):.2f}%" if total_rows > 0 else "0%",
+            'errors': kept,
+            'generated_at': datetime.now().isoformat()
+        })
+        report.setdefault('revalidations', []).append({
+            'affected_columns': affected,
+            'values_scanned': values_scanned,
+            'errors_removed': removed_errors,
+            'errors_added': added_errors,
+            'revalidated_at': report['generated_at']
+        })
+        return report
+
+    def _null_row_error(self, column: str) -> Optional[Tuple[str, str]]:
+        """Erro de uma linha nula na coluna segundo a nova definição (ou None)."""
+        for error_type, check in (('CHAVE_PRIMARIA', self.validator.validate_primary_key),
+                                  ('NULO', self.validator.validate_nullability),
+                                  ('TIPO', self.validator.validate_data_type)):
+            is_valid, msg = check(column, None)
+            if not is_valid:
+                return error_type, msg
+        return None
+
+
+if __name__ == '__main__':
+    import copy
+    import json
+    import tempfile
+    from dictionary_simulator import data_dictionary
+    from columnar_store import ColumnarStore
+
+    rows = [
+        {'id_cliente': i, 'nome_cliente': f'Cliente {i}', 'cpf': f'{i:011d}',
+         'valor_premio': 100.0 + i if i % 7 else None,
+         'score_risco': float(i % 100) if i % 5 else None}
+        for i in range(1, 1001)
+    ]
+
+    # Nova versão: score_risco passa a NOT NULL e nome_cliente é alargado
+    new_dictionary = copy.deepcopy(data_dictionary)
+    for col in new_dictionary:
+        if col['coluna'] == 'score_risco':
+            col['aceita_nulos'] = False
+        if col['coluna'] == 'nome_cliente':
+            col['tipo'] = 'VARCHAR(200)'
+
+    report = DataValidator(data_dictionary).generate_validation_report(rows, 'clientes_seguros')
+    store = ColumnarStore(tempfile.mkdtemp())
+    store.write_table('clientes_seguros', rows, data_dictionary)
+    source = ColumnarColumnSource(store.open_table('clientes_seguros'))
+
+    updated = IncrementalRevalidator(data_dictionary, new_dictionary).update_report(report, source)
+    full = DataValidator(new_dictionary).generate_validation_report(rows, 'clientes_seguros')
+
+    print(json.dumps(updated['revalidations'], indent=2, ensure_ascii=False))
+    print("Linhas inválidas:", updated['invalid_rows'],
+          "| igual à revalidação completa:", updated['errors'] == full['errors'])
@@ -0,0 +1,320 @@
+# =========================================
+# Ingestion Service - Validação Assíncrona na Ingestão
+# =========================================
+# Serviço asyncio que recebe lotes de linhas (por uma fila em processo ou
+# por um socket local com JSON delimitado por linha), valida cada lote com
+# um único DataValidator compartilhado e devolve os resultados em fluxo,
+# na ordem em que ficam prontos.
+#
+# Concorrência e backpressure:
+#   - max_concurrency limita os lotes validados ao mesmo tempo;
+#   - max_pending limita os lotes aceitos e ainda não entregues. Quando o
+#     limite é atingido o serviço para de ler a entrada; no socket isso
+#     enche o buffer TCP e bloqueia o cliente.
+#
+# Protocolo do socket (uma mensagem JSON por linha):
+#   entrada: {"batch_id": 1, "table": "clientes_seguros", "rows": [{...}, ...]}
+#   saída:   {"batch_id": 1, "table": ..., "total_rows": ..., "invalid_rows": ...,
+#             "results": [{"row_number": 1, "valid": ..., "errors": [...], ...}]}
+
+import json
+import asyncio
+from concurrent.futures import Executor
+from typing import List, Dict, Any, Optional, AsyncIterable, AsyncIterator, Tuple
+
+from data_validator import DataValidator
+
+Batch = Tuple[Any, str, List[Dict[str, Any]]]
+
+# Fim de fluxo na fila de entrada
+END_OF_STREAM = None
+
+
+class IngestionService:
+    """Valida lotes recebidos na ingestão com concorrência limitada."""
+
+    def __init__(self, validator: DataValidator,
+                 max_concurrency: int = 4,
+                 max_pending: int = 16,
+                 executor: Optional[Executor] = None):
+        """
+        Inicializa o serviço.
+
+        Args:
+            validator: Validador compartilhado por todas as requisições
+            max_concurrency: Lotes validados simultaneamente
+            max_pending: Lotes aceitos e ainda não entregues (por fluxo)
+            executor: Executor da validação (padrão: threads do loop)
+        """
+        self.validator = validator
+        self.max_concurrency = max_concurrency
+        self.max_pending = max(max_pending, 1)
+        self.executor = executor
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _validate_rows(self, batch_id: Any, table_name: str,
+                       rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Valida um lote de forma síncrona (executado fora do loop)."""
+        results = []
+        invalid_rows = 0
+        for row_number, row in enumerate(rows, 1):
+            result = self.validator.check_row(table_name, row)
+            invalid_rows += not result.valid
+            results.append(dict(result.to_dict(), row_number=row_number))
+        return {
+            'batch_id': batch_id,
+            'table': table_name,
+            'total_rows': len(rows),
+            'invalid_rows': invalid_rows,
+            'results': results
+        }
+
+    async def validate_batch(self, batch_id: Any, table_name: str,
+                             rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Valida um lote respeitando o limite de concorrência do serviço.
+
+        Args:
+            batch_id: Identificador do lote (devolvido no resultado)
+            table_name: Nome da tabela
+            rows: Linhas do lote
+
+        Returns:
+            Resultado do lote
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, self._validate_rows, batch_id, table_name, rows
+            )
+
+    async def stream(self, batches: AsyncIterable[Batch]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Valida um fluxo de lotes e entrega os resultados conforme ficam prontos.
+
+        O próximo lote só é lido da entrada quando há vaga entre os
+        max_pending lotes pendentes; a vaga é liberada quando o consumidor
+        recebe o resultado.
+
+        Args:
+            batches: Iterável assíncrono de (batch_id, tabela, linhas)
+
+        Yields:
+            Resultado de cada lote (com 'error' se o lote falhar)
+        """
+        pending = asyncio.Semaphore(self.max_pending)
+        completed: asyncio.Queue = asyncio.Queue()
+        tasks = set()
+
+        async def run(batch_id: Any, table_name: str, rows: List[Dict[str, Any]]):
+            try:
+                if isinstance(rows, Exception):
+                    raise rows
+                if not isinstance(rows, list) or not table_name:
+                    raise ValueError("Lote deve conter 'table' e uma lista 'rows'")
+                result = await self.validate_batch(batch_id, table_name, rows)
+            except Exception as e:
+                result = {'batch_id': batch_id, 'table': table_name, 'error': str(e)}
+            await completed.put(result)
+
+        async def produce():
+            submitted = 0
+            iterator = batches.__aiter__()
+            try:
+                while True:
+                    await pending.acquire()
+                    try:
+                        batch_id, table_name, rows = await iterator.__anext__()
+                    except StopAsyncIteration:
+                        break
+                    task = asyncio.create_task(run(batch_id, table_name, rows))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                    submitted += 1
+            finally:
+                await completed.put(('fim', submitted))
+
+        producer = asyncio.create_task(produce())
+        delivered = 0
+        expected = None
+        try:
+            while expected is None or delivered < expected:
+                item = await completed.get()
+                if isinstance(item, tuple):
+                    expected = item[1]
+                    continue
+                delivered += 1
+                pending.release()
+                yield item
+            await producer
+        finally:
+            producer.cancel()
+            for task in list(tasks):
+                task.cancel()
+
+    async def process_queue(self, inbox: asyncio.Queue, outbox: asyncio.Queue):
+        """
+        Consome lotes de uma fila e publica os resultados em outra.
+
+        A fila de entrada deve ser limitada (maxsize) para que os produtores
+        sintam a backpressure; END_OF_STREAM encerra o processamento e é
+        repassado à fila de saída.
+
+        Args:
+            inbox: Fila de (batch_id, tabela, linhas)
+            outbox: Fila de resultados
+        """
+        async def batches():
+            while True:
+                batch = await inbox.get()
+                if batch is END_OF_STREAM:
+                    return
+                yield batch
+
+        async for result in self.stream(batches()):
+            await outbox.put(result)
+        await outbox.put(END_OF_STREAM)
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter):
+        """Atende uma conexão do socket (JSON delimitado por linha)."""
+        async def batches():
+            while True:
+                try:
+                    line = await reader.readuntil(b'\n')
+                except asyncio.IncompleteReadError as e:
+                    line = e.partial
+                except asyncio.LimitOverrunError:
+                    await _discard_line(reader)
+                    yield None, None, ValueError("Mensagem excede o tamanho máximo de linha")
+                    continue
+                if not line:
+                    return
+                if not line.strip():
+                    continue
+                try:
+                    message = json.loads(line)
+                except ValueError as e:
+                    yield None, None, ValueError(f"JSON inválido: {e}")
+                    continue
+                if not isinstance(message, dict):
+                    yield None, None, ValueError("Mensagem deve ser um objeto JSON")
+                    continue
+                yield message.get('batch_id'), message.get('table'), message.get('rows')
+
+        try:
+            async for result in self.stream(batches()):
+                writer.write((json.dumps(result, ensure_ascii=False) + '\n').encode('utf-8'))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8765,
+                    limit: int = 16 * 1024 * 1024) -> asyncio.AbstractServer:
+        """
+        Inicia o servidor TCP local.
+
+        Args:
+            host: Endereço de escuta (local por padrão)
+            port: Porta TCP (0 escolhe uma porta livre)
+            limit: Tamanho máximo de uma mensagem (bytes)
+
+        Returns:
+            Servidor asyncio em execução
+        """
+        return await asyncio.start_server(self.handle_connection, host, port, limit=limit)
+
+
+async def _discard_line(reader: asyncio.StreamReader):
+    """Descarta o restante de uma linha acima do limite, até o fim de linha."""
+    while True:
+        try:
+            await reader.readuntil(b'\n')
+            return
+        except asyncio.LimitOverrunError as e:
+            await reader.readexactly(e.consumed)
+        except asyncio.IncompleteReadError:
+            return
+
+
+async def send_batches(host: str, port: int,
+                       batches: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Cliente de exemplo: envia lotes ao serviço e lê os resultados em fluxo.
+
+    Args:
+        host: Endereço do serviço
+        port: Porta do serviço
+        batches: Mensagens no formato do protocolo
+
+    Yields:
+        Resultado de cada lote
+    """
+    reader, writer = await asyncio.open_connection(host, port, limit=16 * 1024 * 1024)
+
+    async def write_all():
+        for message in batches:
+            writer.write((json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8'))
+            await writer.drain()
+        writer.write_eof()
+
+    sender = asyncio.create_task(write_all())
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            yield json.loads(line)
+        await sender
+    finally:
+        sender.cancel()
+        writer.close()
+
+
+if __name__ == '__main__':
+    from dictionary_simulator import data_dictionary
+
+    async def main():
+        service = IngestionService(DataValidator(data_dictionary), max_concurrency=2, max_pending=4)
+        messages = [
+            {
+                'batch_id': batch_id,
+                'table': 'clientes_seguros',
+                'rows': [
+                    {'id_cliente': batch_id * 100 + i if i % 10 else None,
+                     'nome_cliente': 'Maria Silva', 'cpf': '12345678901',
+                     'valor_premio': 250.75}
+                    for i in range(100)
+                ]
+            }
+            for batch_id in range(1, 11)
+        ]
+
+        # Via socket local
+        server = await service.serve(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            summary = [
+                {k: result[k] for k in ('batch_id', 'total_rows', 'invalid_rows')}
+                async for result in send_batches('127.0.0.1', port, messages)
+            ]
+        print("Socket:", json.dumps(summary, ensure_ascii=False))
+
+        # Via filas em processo (a fila de entrada limitada aplica backpressure)
+        inbox: asyncio.Queue = asyncio.Queue(maxsize=2)
+        outbox: asyncio.Queue = asyncio.Queue()
+        worker = asyncio.create_task(service.process_queue(inbox, outbox))
+        for message in messages:
+            await inbox.put((message['batch_id'], message['table'], message['rows']))
+        await inbox.put(END_OF_STREAM)
+        invalid = 0
+        while (result := await outbox.get()) is not END_OF_STREAM:
+            invalid += result['invalid_rows']
+        await worker
+        print("Fila: linhas inválidas =", invalid)
+
+    asyncio.run(main())
@@ -0,0 +1,288 @@
+# =========================================
+# LGPD Masking - Pseudonimização de Extrações
+# =========================================
+# Estágio de mascaramento em streaming guiado pela classificação do
+# SensitivityClassifier. Cada coluna recebe uma política (tokenização HMAC,
+# mascaramento de CPF com preservação de formato, faixas de valor ou
+# manter), aplicada a lotes de linhas, opcionalmente em um pool de processos.
+
+import hmac
+import hashlib
+import math
+from collections import deque
+from functools import lru_cache, partial
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Callable
+
+from data_validator import SensitivityClassifier
+
+POLICIES = ('tokenize', 'cpf_mask', 'bucket', 'keep')
+
+# Políticas padrão por coluna, sobrepondo a política derivada do nível
+DEFAULT_COLUMN_POLICIES = {
+    'cpf': 'cpf_mask',
+    'valor_premio': 'bucket'
+}
+
+# Largura das faixas da política 'bucket' por coluna
+DEFAULT_BUCKET_WIDTHS = {
+    'valor_premio': 100.0,
+    'score_risco': 10.0
+}
+
+
+def cpf_check_digits(base: str) -> str:
+    """Calcula os dois dígitos verificadores de um CPF a partir dos 9 primeiros."""
+    digits = [int(d) for d in base]
+    for weight_start in (10, 11):
+        total = sum(d * w for d, w in zip(digits, range(weight_start, 1, -1)))
+        remainder = total % 11
+        digits.append(0 if remainder < 2 else 11 - remainder)
+    return ''.join(str(d) for d in digits[9:])
+
+
+FEISTEL_ROUNDS = 10
+
+
+def _feistel_digits(key: bytes, digits: str) -> str:
+    """
+    Permutação determinística de uma cadeia de dígitos (Feistel em base 10).
+
+    Mesmo esquema do FF1 (NIST SP 800-38G): metades de tamanho u e v,
+    FEISTEL_ROUNDS rodadas com soma módulo 10^m e função de rodada HMAC.
+    Cada rodada é inversível, portanto a função é uma bijeção sobre as
+    cadeias de mesmo tamanho: valores distintos nunca colidem.
+    """
+    u = len(digits) // 2
+    a, b = digits[:u], digits[u:]
+    for i in range(FEISTEL_ROUNDS):
+        m = u if i % 2 == 0 else len(digits) - u
+        mac = hmac.new(key, bytes([i]) + b.encode('ascii'), hashlib.sha256).digest()
+        c = (int(a) + int.from_bytes(mac[:16], 'big')) % 10 ** m
+        a, b = b, f"{c:0{m}d}"
+    return a + b
+
+
+class LGPDMasker:
+    """Aplica políticas de mascaramento por coluna a lotes de linhas."""
+
+    def __init__(self, data_dictionary: List[Dict[str, Any]], key: bytes,
+                 column_policies: Optional[Dict[str, str]] = None,
+                 bucket_widths: Optional[Dict[str, float]] = None,
+                 token_length: int = 16,
+                 cache_size: int = 65536):
+        """
+        Inicializa o mascarador a partir da classificação de sensibilidade.
+
+        Args:
+            data_dictionary: Dicionário de dados
+            key: Chave secreta do HMAC
+            column_policies: Políticas explícitas por coluna
+            bucket_widths: Largura das faixas da política 'bucket' por coluna
+            token_length: Quantidade de caracteres hexadecimais do token
+            cache_size: Tamanho do cache LRU de tokens
+        """
+        if not key:
+            raise ValueError("Chave de mascaramento não pode ser vazia")
+
+        self.key = key
+        # Chave da permutação de CPF separada da chave dos tokens
+        self._cpf_key = hmac.new(key, b'cpf_mask', hashlib.sha256).digest()
+        self.bucket_widths = {**DEFAULT_BUCKET_WIDTHS, **(bucket_widths or {})}
+        self.token_length = token_length
+        self.cache_size = cache_size
+        self.policies = self.build_policies(data_dictionary, column_policies)
+
+        self._tokenize = lru_cache(maxsize=cache_size)(self._tokenize_uncached)
+        self._mask_cpf = lru_cache(maxsize=cache_size)(self._mask_cpf_uncached)
+        self._plan = [
+            (column, self._handler(column, policy))
+            for column, policy in self.policies.items()
+            if policy != 'keep'
+        ]
+
+    @staticmethod
+    def build_policies(data_dictionary: List[Dict[str, Any]],
+                       column_policies: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """
+        Deriva a política de cada coluna a partir do nível de sensibilidade.
+
+        Alta vira tokenização, Média vira faixa de valor para colunas
+        numéricas (tokenização para as demais) e Baixa é mantida.
+
+        Args:
+            data_dictionary: Dicionário de dados
+            column_policies: Políticas explícitas que prevalecem
+
+        Returns:
+            Dicionário coluna -> política
+        """
+        classified = SensitivityClassifier.classify_sensitivity(data_dictionary)
+        tipos = {col.get('coluna'): col.get('tipo', '').upper() for col in data_dictionary}
+
+        policies = {}
+        for column in classified['Alta']:
+            policies[column] = DEFAULT_COLUMN_POLICIES.get(column, 'tokenize')
+        for column in classified['Média']:
+            numeric = any(t in tipos.get(column, '') for t in ('DECIMAL', 'INT', 'FLOAT'))
+            policies[column] = DEFAULT_COLUMN_POLICIES.get(
+                column, 'bucket' if numeric else 'tokenize'
+            )
+        for column in classified['Baixa']:
+            policies[column] = 'keep'
+
+        for column, policy in (column_policies or {}).items():
+            if policy not in POLICIES:
+                raise ValueError(f"Política '{policy}' inválida para '{column}'")
+            policies[column] = policy
+        return policies
+
+    def _handler(self, column: str, policy: str) -> Callable[[Any], Any]:
+        """Função de mascaramento de uma coluna."""
+        if policy == 'tokenize':
+            return self._tokenize_value
+        if policy == 'cpf_mask':
+            return self._cpf_value
+        return partial(self._bucket_value, width=self.bucket_widths.get(column, 100.0))
+
+    def mask_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Mascara uma linha (colunas sem política são mantidas)."""
+        masked = dict(row)
+        for column, handler in self._plan:
+            if column in masked:
+                masked[column] = handler(masked[column])
+        return masked
+
+    def mask_batch(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Mascara um lote de linhas."""
+        mask_row = self.mask_row
+        return [mask_row(row) for row in rows]
+
+    def cache_info(self) -> Dict[str, Any]:
+        """Estatísticas dos caches de tokens."""
+        return {
+            'tokenize': self._tokenize.cache_info()._asdict(),
+            'cpf_mask': self._mask_cpf.cache_info()._asdict()
+        }
+
+    def _tokenize_uncached(self, value: str) -> str:
+        """Token HMAC-SHA256 determinístico do valor."""
+        digest = hmac.new(self.key, value.encode('utf-8'), hashlib.sha256).hexdigest()
+        return digest[:self.token_length]
+
+    def _tokenize_value(self, value: Any) -> Any:
+        return None if value is None else self._tokenize(str(value))
+
+    def _mask_cpf_uncached(self, cpf: str) -> str:
+        """
+        Pseudonimiza um CPF preservando o formato.
+
+        Os 9 dígitos base passam por uma permutação Feistel com a chave do
+        mascarador e os verificadores são recalculados, de modo que o
+        resultado continua sendo um CPF válido e CPFs válidos distintos
+        nunca recebem o mesmo pseudônimo (joins pela chave mascarada não
+        fundem pessoas). Limitação: CPFs com verificadores inválidos
+        compartilham o pseudônimo do CPF válido de mesma base. Valores que
+        não têm 11 dígitos são tokenizados.
+        """
+        digits = ''.join(c for c in cpf if c.isdigit())
+        if len(digits) != 11:
+            return self._tokenize(cpf)
+        base = _feistel_digits(self._cpf_key, digits[:9])
+        masked = base + cpf_check_digits(base)
+        if len(cpf) == 14 and cpf[3] == '.' and cpf[11] == '-':
+            return f"{masked[:3]}.{masked[3:6]}.{masked[6:9]}-{masked[9:]}"
+        return masked
+
+    def _cpf_value(self, value: Any) -> Any:
+        return None if value is None else self._mask_cpf(str(value))
+
+    @staticmethod
+    def _bucket_value(value: Any, width: float) -> Any:
+        """Substitui o valor pela faixa que o contém (ex.: '200-300')."""
+        if value is None:
+            return None
+        lower = math.floor(float(value) / width) * width
+        upper = lower + width
+        if float(lower).is_integer() and float(upper).is_integer():
+            return f"{int(lower)}-{int(upper)}"
+        return f"{lower:.2f}-{upper:.2f}"
+
+
+# Instância por processo do pool, criada uma única vez pelo initializer
+_worker_masker: Optional[LGPDMasker] = None
+
+
+def _init_worker(data_dictionary: List[Dict[str, Any]], key: bytes,
+                 options: Dict[str, Any]):
+    global _worker_masker
+    _worker_masker = LGPDMasker(data_dictionary, key, **options)
+
+
+def _mask_in_worker(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return _worker_masker.mask_batch(rows)
+
+
+def mask_stream(batches: Iterable[List[Dict[str, Any]]],
+                data_dictionary: List[Dict[str, Any]], key: bytes,
+                workers: int = 1, max_in_flight: Optional[int] = None,
+                **options) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Mascara um fluxo de lotes, preservando a ordem.
+
+    Com vários processos, no máximo max_in_flight lotes ficam submetidos ao
+    pool ao mesmo tempo; o próximo lote só é lido da entrada quando o mais
+    antigo é entregue, de modo que o fluxo nunca é materializado em memória.
+
+    Args:
+        batches: Iterável de lotes de linhas
+        data_dictionary: Dicionário de dados
+        key: Chave secreta do HMAC
+        workers: Quantidade de processos (1 executa no processo atual)
+        max_in_flight: Lotes em processamento simultâneo (padrão: 2 x workers)
+        **options: Parâmetros adicionais de LGPDMasker
+
+    Yields:
+        Lotes mascarados
+    """
+    if workers <= 1:
+        masker = LGPDMasker(data_dictionary, key, **options)
+        for batch in batches:
+            yield masker.mask_batch(batch)
+        return
+
+    window = max(max_in_flight or 2 * workers, 1)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(data_dictionary, key, options)) as pool:
+        pending: deque = deque()
+        try:
+            for batch in batches:
+                pending.append(pool.submit(_mask_in_worker, batch))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+if __name__ == '__main__':
+    import json
+    from dictionary_simulator import data_dictionary
+
+    extract = [
+        {'id_cliente': 1, 'nome_cliente': 'Carlos Silva', 'cpf': '12345678901',
+         'valor_premio': 250.00, 'score_risco': 28.5},
+        {'id_cliente': 2, 'nome_cliente': 'Maria Oliveira', 'cpf': '234.567.890-12',
+         'valor_premio': 280.00, 'score_risco': 32.1},
+        {'id_cliente': 3, 'nome_cliente': 'Carlos Silva', 'cpf': '12345678901',
+         'valor_premio': None, 'score_risco': 35.7}
+    ]
+
+    masker = LGPDMasker(data_dictionary, key=b'chave-de-exemplo')
+    print("Políticas:", json.dumps(masker.policies, indent=2, ensure_ascii=False))
+
+    for batch in mask_stream([extract[:2], extract[2:]], data_dictionary,
+                             key=b'chave-de-exemplo', workers=2):
+        print(json.dumps(batch, indent=2, ensure_ascii=False))
@@ -0,0 +1,493 @@
+# =========================================
+# Lineage Parser - Linhagem a partir dos Scripts SQL/SAS
+# =========================================
+# Tokeniza os arquivos sql/*.sql e sas/*.sas e extrai arestas de linhagem:
+# tabela -> view/procedure (leitura), procedure -> tabela (escrita),
+# procedure -> procedure (EXEC) e dataset -> dataset nos passos SAS.
+# O resultado de cada arquivo fica em cache por mtime/tamanho/hash, de modo
+# que reconstruir a linhagem só reprocessa os scripts alterados.
+
+import os
+import re
+import glob
+import json
+import hashlib
+from typing import List, Dict, Any, Optional, Iterable, Set, Tuple
+
+_TOKEN_PATTERN = re.compile(r"""
+    (?P<comment>--[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:[^']|'')*'|"[^"]*")
+  | (?P<name>[\[\]\w#@&.$]+)
+  | (?P<symbol>[();,=])
+  | (?P<other>\S)
+""", re.VERBOSE | re.DOTALL)
+
+SQL_KEYWORDS = {
+    'SELECT', 'FROM', 'WHERE', 'GROUP', 'ORDER', 'BY', 'HAVING', 'JOIN', 'INNER',
+    'LEFT', 'RIGHT', 'FULL', 'OUTER', 'CROSS', 'ON', 'AND', 'OR', 'NOT', 'AS',
+    'INTO', 'VALUES', 'INSERT', 'UPDATE', 'DELETE', 'SET', 'CASE', 'WHEN', 'THEN',
+    'ELSE', 'END', 'BEGIN', 'DECLARE', 'EXEC', 'EXECUTE', 'WITH', 'UNION', 'ALL',
+    'DISTINCT', 'TOP', 'NULL', 'IS', 'IN', 'EXISTS', 'BETWEEN', 'LIKE', 'CREATE',
+    'TABLE', 'VIEW', 'PROCEDURE', 'PROC', 'FUNCTION', 'TRIGGER', 'INDEX', 'RETURN',
+    'RETURNS', 'TRUNCATE', 'MERGE', 'USING', 'AFTER', 'BEFORE', 'FOR', 'OVER',
+    'PARTITION', 'WITHIN', 'LATERAL', 'PRINT', 'THROW', 'COMMIT', 'ROLLBACK'
+}
+
+# FROM precedido destes termos pertence a EXTRACT/TRIM, não a uma tabela
+_FROM_FUNCTION_PREFIXES = {
+    'YEAR', 'MONTH', 'DAY', 'HOUR', 'MINUTE', 'SECOND', 'LEADING', 'TRAILING', 'BOTH'
+}
+_SQL_OBJECT_KINDS = {
+    'VIEW': 'view', 'PROCEDURE': 'procedure', 'PROC': 'procedure',
+    'FUNCTION': 'function', 'TRIGGER': 'trigger'
+}
+_NON_BLOCK_BEGIN = {'TRAN', 'TRANSACTION', 'DISTRIBUTED'}
+_PSEUDO_TABLES = {'inserted', 'deleted'}
+
+_SAS_OUTPUT_OPTIONS = {'out', 'outstat', 'outsurv', 'outest', 'outp', 'outfit', 'outmodel'}
+
+
+def tokenize_script(text: str) -> List[Tuple[str, str]]:
+    """Tokeniza o texto em pares (tipo, valor), descartando comentários."""
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind == 'comment':
+            continue
+        tokens.append((kind, match.group(kind)))
+    return tokens
+
+
+def _normalize_name(raw: str) -> str:
+    """Remove colchetes, schema/libref e normaliza para minúsculas."""
+    name = raw.replace('[', '').replace(']', '').strip('"').lower()
+    return name.split('.')[-1]
+
+
+def _is_object_name(token: Optional[Tuple[str, str]]) -> bool:
+    """Verifica se o token pode ser o nome de uma tabela/objeto."""
+    if token is None or token[0] != 'name':
+        return False
+    value = token[1]
+    return (value.upper() not in SQL_KEYWORDS
+            and not value.startswith(('@', '#', '&'))
+            and not value[0].isdigit())
+
+
+def extract_sql_references(tokens: List[Tuple[str, str]]) -> Dict[str, Set[str]]:
+    """
+    Extrai tabelas lidas, escritas e procedures chamadas de uma lista de tokens.
+
+    Args:
+        tokens: Tokens de um objeto SQL
+
+    Returns:
+        Dicionário com os conjuntos reads, writes e calls
+    """
+    reads, writes, calls, ctes = set(), set(), set(), set()
+    upper = [value.upper() if kind == 'name' else value for kind, value in tokens]
+
+    def _at(index):
+        return tokens[index] if 0 <= index < len(tokens) else None
+
+    skip_from = set()
+    for i, word in enumerate(upper):
+        following = _at(i + 1)
+        if word == 'AS' and following == ('symbol', '(') and _is_object_name(_at(i - 1)):
+            ctes.add(_normalize_name(tokens[i - 1][1]))
+        elif word in ('FROM', 'JOIN') and i not in skip_from:
+            if word == 'FROM' and upper[i - 1] in _FROM_FUNCTION_PREFIXES:
+                continue
+            if _is_object_name(following):
+                reads.add(_normalize_name(following[1]))
+        elif word == 'INTO' and _is_object_name(following):
+            writes.add(_normalize_name(following[1]))
+        elif word == 'UPDATE' and _is_object_name(following):
+            writes.add(_normalize_name(following[1]))
+        elif word == 'DELETE':
+            target = i + 1
+            if upper[target:target + 1] == ['FROM']:
+                skip_from.add(target)
+                target += 1
+            if _is_object_name(_at(target)):
+                writes.add(_normalize_name(tokens[target][1]))
+        elif word == 'TRUNCATE' and upper[i + 1:i + 2] == ['TABLE'] and _is_object_name(_at(i + 2)):
+            writes.add(_normalize_name(tokens[i + 2][1]))
+        elif word in ('EXEC', 'EXECUTE') and _is_object_name(following):
+            calls.add(_normalize_name(following[1]))
+
+    excluded = ctes | _PSEUDO_TABLES
+    return {
+        'reads': reads - excluded,
+        'writes': writes - excluded,
+        'calls': calls
+    }
+
+
+def parse_sql(text: str, script_name: str) -> Dict[str, Any]:
+    """
+    Extrai nós e arestas de linhagem de um script T-SQL.
+
+    Comandos fora de CREATE VIEW/PROCEDURE/FUNCTION/TRIGGER são atribuídos
+    ao próprio script.
+
+    Args:
+        text: Conteúdo do arquivo
+        script_name: Nome do arquivo (nó dos comandos soltos)
+
+    Returns:
+        Dicionário com nodes e edges
+    """
+    tokens = tokenize_script(text)
+    nodes: Dict[str, str] = {}
+    scopes: List[Tuple[str, str, List[Tuple[str, str]]]] = []
+    current = (script_name, 'script', [])
+    scopes.append(current)
+    depth = 0
+
+    i = 0
+    while i < len(tokens):
+        kind, value = tokens[i]
+        word = value.upper() if kind == 'name' else value
+
+        if word == 'CREATE' and depth == 0:
+            j = i + 1
+            if tokens[j:j + 2] and [t[1].upper() for t in tokens[j:j + 2]] == ['OR', 'ALTER']:
+                j += 2
+            object_kind = tokens[j][1].upper() if j < len(tokens) else ''
+            name_token = tokens[j + 1] if j + 1 < len(tokens) else None
+
+            if object_kind in _SQL_OBJECT_KINDS and name_token:
+                name = _normalize_name(name_token[1])
+                nodes[name] = _SQL_OBJECT_KINDS[object_kind]
+                current = (name, nodes[name], [])
+                scopes.append(current)
+                i = j + 2
+                continue
+            if object_kind == 'TABLE' and name_token and _is_object_name(name_token):
+                nodes.setdefault(_normalize_name(name_token[1]), 'table')
+                # Definição de colunas não gera linhagem: pula até o ';'
+                while i < len(tokens) and tokens[i][1] != ';':
+                    i += 1
+                continue
+            if object_kind in ('INDEX', 'UNIQUE', 'CLUSTERED', 'NONCLUSTERED'):
+                while i < len(tokens) and tokens[i][1] != ';':
+                    i += 1
+                continue
+
+        if word == 'BEGIN':
+            following = tokens[i + 1][1].upper() if i + 1 < len(tokens) else ''
+            if following not in _NON_BLOCK_BEGIN:
+                depth += 1
+        elif word == 'CASE':
+            depth += 1
+        elif word == 'END':
+            depth = max(0, depth - 1)
+
+        current[2].append((kind, value))
+
+        if (word == ';' or word == 'GO') and depth == 0 and current[1] != 'script':
+            current = (script_name, 'script', [])
+            scopes.append(current)
+        i += 1
+
+    edges = []
+    for name, object_kind, scope_tokens in scopes:
+        refs = extract_sql_references(scope_tokens)
+        if object_kind == 'trigger':
+            upper = [t[1].upper() for t in scope_tokens]
+            if 'ON' in upper:
+                position = upper.index('ON') + 1
+                if position < len(scope_tokens):
+                    refs['reads'].add(_normalize_name(scope_tokens[position][1]))
+
+        if object_kind == 'script' and any(refs.values()):
+            nodes.setdefault(name, 'script')
+        for table in refs['reads']:
+            nodes.setdefault(table, 'table')
+            edges.append({'source': table, 'target': name, 'kind': 'read'})
+        for table in refs['writes']:
+            nodes.setdefault(table, 'table')
+            edges.append({'source': name, 'target': table, 'kind': 'write'})
+        for procedure in refs['calls']:
+            nodes.setdefault(procedure, 'procedure')
+            edges.append({'source': name, 'target': procedure, 'kind': 'call'})
+
+    return {'nodes': nodes, 'edges': _dedupe(edges)}
+
+
+def _sas_dataset_names(statement: List[Tuple[str, str]]) -> List[str]:
+    """Nomes de datasets em um comando (ignora opções entre parênteses)."""
+    names, level = [], 0
+    for kind, value in statement:
+        if value == '(':
+            level += 1
+        elif value == ')':
+            level -= 1
+        elif level == 0 and _is_object_name((kind, value)):
+            names.append(_normalize_name(value))
+    return names
+
+
+def parse_sas(text: str, script_name: str) -> Dict[str, Any]:
+    """
+    Extrai nós e arestas de linhagem de um programa SAS.
+
+    Cada passo DATA/PROC liga seus datasets de entrada (set/merge/data=)
+    às saídas (data <nome>, out=, outstat=, create table, outfile=).
+
+    Args:
+        text: Conteúdo do arquivo
+        script_name: Nome do arquivo (destino de passos sem saída)
+
+    Returns:
+        Dicionário com nodes e edges
+    """
+    # Comentários "* texto;" do SAS não são reconhecidos pelo tokenizador SQL
+    text = re.sub(r'(^|;)\s*\*[^;]*;', r'\1', text, flags=re.MULTILINE)
+    tokens = [t for t in tokenize_script(text) if not t[1].startswith('--')]
+
+    statements, statement = [], []
+    for token in tokens:
+        if token[1] == ';':
+            if statement:
+                statements.append(statement)
+            statement = []
+        else:
+            statement.append(token)
+
+    nodes: Dict[str, str] = {}
+    edges = []
+    step: Optional[Dict[str, Any]] = None
+
+    def _close(current):
+        if current is None:
+            return
+        for source in current['inputs']:
+            nodes.setdefault(source, 'dataset')
+            targets = current['outputs'] or [script_name]
+            if not current['outputs']:
+                nodes.setdefault(script_name, 'script')
+            for target in targets:
+                edges.append({'source': source, 'target': target,
+                              'kind': 'derive', 'via': current['via']})
+        for target in current['outputs']:
+            nodes.setdefault(target, current['output_kinds'].get(target, 'dataset'))
+
+    for statement in statements:
+        first = statement[0][1].lower()
+        if first in ('data', 'proc'):
+            _close(step)
+            if first == 'data':
+                outputs = [n for n in _sas_dataset_names(statement[1:]) if n != '_null_']
+                step = {'via': 'data step', 'inputs': [], 'outputs': outputs,
+                        'output_kinds': {}, 'sql': False}
+            else:
+                proc_name = statement[1][1].lower() if len(statement) > 1 else ''
+                step = {'via': f'proc {proc_name}', 'inputs': [], 'outputs': [],
+                        'output_kinds': {}, 'sql': proc_name == 'sql'}
+        elif first in ('run', 'quit'):
+            _close(step)
+            step = None
+            continue
+
+        if step is None:
+            continue
+
+        if step['sql']:
+            refs = extract_sql_references(statement)
+            words = [t[1].lower() for t in statement]
+            if words[:2] == ['create', 'table'] and len(statement) > 2 and _is_object_name(statement[2]):
+                step['outputs'].append(_normalize_name(statement[2][1]))
+            step['inputs'].extend(refs['reads'])
+            continue
+
+        if first in ('set', 'merge', 'update'):
+            step['inputs'].extend(_sas_dataset_names(statement[1:]))
+            continue
+
+        # Opções nome=valor (data=, out=, outfile=) em qualquer comando do passo
+        for k in range(len(statement) - 2):
+            option = statement[k][1].lower()
+            if statement[k + 1][1] != '=':
+                continue
+            target = statement[k + 2]
+            if option == 'data' and _is_object_name(target):
+                step['inputs'].append(_normalize_name(target[1]))
+            elif option in _SAS_OUTPUT_OPTIONS and _is_object_name(target):
+                step['outputs'].append(_normalize_name(target[1]))
+            elif option == 'outfile' and target[0] == 'string':
+                path = target[1].strip('\'"')
+                if path.startswith('&'):
+                    continue
+                step['outputs'].append(path)
+                step['output_kinds'][path] = 'file'
+
+    _close(step)
+    return {'nodes': nodes, 'edges': _dedupe(edges)}
+
+
+def _dedupe(edges: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Remove arestas repetidas preservando a ordem."""
+    seen, unique = set(), []
+    for edge in edges:
+        key = tuple(sorted(edge.items()))
+        if key not in seen:
+            seen.add(key)
+            unique.append(edge)
+    return unique
+
+
+class LineageCache:
+    """Cache dos resultados de parsing por arquivo (mtime, tamanho e hash)."""
+
+    def __init__(self, cache_path: Optional[str] = None):
+        """
+        Inicializa o cache, carregando-o do disco se existir.
+
+        Args:
+            cache_path: Arquivo JSON para persistir o cache (opcional)
+        """
+        self.cache_path = cache_path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.stats = {'parsed': 0, 'reused': 0}
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def parse_file(self, path: str) -> Dict[str, Any]:
+        """
+        Retorna a linhagem de um arquivo, reprocessando apenas se mudou.
+
+        Args:
+            path: Caminho do script .sql ou .sas
+
+        Returns:
+            Dicionário com nodes e edges do arquivo
+        """
+        key = os.path.abspath(path)
+        stat = os.stat(path)
+        entry = self.entries.get(key)
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            self.stats['reused'] += 1
+            return entry['result']
+
+        with open(path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+
+        if entry and entry['sha256'] == digest:
+            entry.update({'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size})
+            self.stats['reused'] += 1
+            return entry['result']
+
+        text = content.decode('utf-8', errors='replace')
+        script_name = os.path.basename(path)
+        if path.lower().endswith('.sas'):
+            result = parse_sas(text, script_name)
+        else:
+            result = parse_sql(text, script_name)
+
+        self.entries[key] = {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': digest,
+            'result': result
+        }
+        self.stats['parsed'] += 1
+        return result
+
+    def save(self):
+        """Persiste o cache em disco."""
+        if not self.cache_path:
+            return
+        tmp_path = self.cache_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+
+
+class LineageEngine:
+    """Monta o grafo de linhagem de um conjunto de scripts."""
+
+    def __init__(self, script_paths: Iterable[str], cache: Optional[LineageCache] = None):
+        """
+        Inicializa o engine.
+
+        Args:
+            script_paths: Arquivos ou diretórios com scripts .sql/.sas
+            cache: Cache de parsing (um novo em memória se omitido)
+        """
+        self.script_paths = list(script_paths)
+        self.cache = cache or LineageCache()
+
+    def _files(self) -> List[str]:
+        """Expande diretórios para os scripts que contêm."""
+        files = []
+        for path in self.script_paths:
+            if os.path.isdir(path):
+                for pattern in ('*.sql', '*.sas'):
+                    files.extend(glob.glob(os.path.join(path, pattern)))
+            elif os.path.exists(path):
+                files.append(path)
+        return sorted(files)
+
+    def build(self) -> Dict[str, Any]:
+        """
+        Constrói o grafo consolidado.
+
+        Returns:
+            Dicionário com nodes, edges, sources, transformations e destinations
+        """
+        nodes: Dict[str, str] = {}
+        edges = []
+        for path in self._files():
+            result = self.cache.parse_file(path)
+            for name, kind in result['nodes'].items():
+                # Definições concretas (view, procedure...) prevalecem sobre 'table'
+                if nodes.get(name) in (None, 'table', 'dataset') or kind not in ('table', 'dataset'):
+                    nodes[name] = kind
+            for edge in result['edges']:
+                edges.append({**edge, 'file': os.path.basename(path)})
+        self.cache.save()
+
+        storage = ('table', 'dataset', 'file')
+        # Scripts de carga (INSERT soltos, datalines) não tornam a tabela derivada
+        incoming = {e['target'] for e in edges if nodes.get(e['source']) != 'script'}
+        outgoing = {e['source'] for e in edges}
+        fed = {e['target'] for e in edges}
+
+        sources, transformations, destinations = [], [], []
+        for name, kind in nodes.items():
+            if kind == 'script':
+                if name in fed and name not in outgoing:
+                    destinations.append(name)
+            elif kind not in storage:
+                transformations.append(name)
+            elif name not in incoming and name in outgoing:
+                sources.append(name)
+            elif name in incoming and name not in outgoing:
+                destinations.append(name)
+            elif name in incoming:
+                transformations.append(name)
+
+        return {
+            'nodes': nodes,
+            'edges': edges,
+            'sources': sorted(sources),
+            'transformations': sorted(transformations),
+            'destinations': sorted(destinations)
+        }
+
+
+if __name__ == '__main__':
+    repo_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    engine = LineageEngine([os.path.join(repo_root, 'sql'), os.path.join(repo_root, 'sas')])
+    lineage = engine.build()
+
+    print("=== LINHAGEM ===")
+    print("Fontes:", lineage['sources'])
+    print("Destinos:", lineage['destinations'])
+    for edge in lineage['edges'][:15]:
+        print(f"  {edge['source']} -> {edge['target']} ({edge['kind']}, {edge['file']})")
+    print("Cache:", engine.cache.stats)
@@ -0,0 +1,231 @@
+# =========================================
+# PII Scanner - Detecção Automática de Dados Pessoais
+# =========================================
+# Amostra cada coluna de uma fonte de dados (reservoir sampling), aplica
+# detectores compilados de CPF, e-mail, telefone e nome de pessoa e sugere
+# o nível de sensibilidade LGPD, apontando divergências com o dicionário.
+# O custo é limitado pelo tamanho fixo da amostra por coluna.
+
+import re
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+from lgpd_masking import cpf_check_digits
+
+# Mesmo padrão da regra FORMATO de e-mail em validation_framework.sas
+EMAIL_PATTERN = re.compile(r'^[^\s@]+@[^\s@]+\.[^\s@]+$')
+CPF_PATTERN = re.compile(r'^(\d{3})\.?(\d{3})\.?(\d{3})-?(\d{2})$')
+PHONE_PATTERN = re.compile(
+    r'^(?:\+?55\s?)?(?:\(?[1-9]\d\)?\s?)(?:9\d{4}|[2-5]\d{3})[-\s]?\d{4}$'
+)
+NAME_PATTERN = re.compile(
+    r"^[A-ZÀ-Ý][a-zà-ÿ']+(?:\s+(?:(?:da|de|do|das|dos|e)\s+)?[A-ZÀ-Ý][a-zà-ÿ']+)+$"
+)
+
+SENSITIVITY_RANK = {'Baixa': 0, 'Média': 1, 'Alta': 2}
+
+# Nível sugerido quando o detector reconhece a coluna
+DETECTOR_SENSITIVITY = {
+    'cpf': 'Alta',
+    'email': 'Alta',
+    'telefone': 'Alta',
+    'nome_pessoa': 'Alta'
+}
+
+
+def is_valid_cpf(value: str) -> bool:
+    """Verifica formato e dígitos verificadores de um CPF."""
+    match = CPF_PATTERN.match(value)
+    if not match:
+        return False
+    digits = ''.join(match.groups())
+    if digits == digits[0] * 11:
+        return False
+    return cpf_check_digits(digits[:9]) == digits[9:]
+
+
+DETECTORS = {
+    'cpf': is_valid_cpf,
+    'email': lambda v: EMAIL_PATTERN.match(v) is not None,
+    'telefone': lambda v: PHONE_PATTERN.match(v) is not None,
+    'nome_pessoa': lambda v: NAME_PATTERN.match(v) is not None
+}
+
+
+def wilson_lower_bound(successes: int, total: int, z: float = 1.96) -> float:
+    """Limite inferior do intervalo de Wilson para uma proporção."""
+    if total == 0:
+        return 0.0
+    p = successes / total
+    denominator = 1 + z * z / total
+    centre = p + z * z / (2 * total)
+    margin = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total))
+    return (centre - margin) / denominator
+
+
+def reservoir_sample(rows: Iterable[Dict[str, Any]], sample_size: int,
+                     seed: Optional[int] = None) -> Tuple[Dict[str, List[Any]], int]:
+    """
+    Amostra uniformemente os valores não nulos de cada coluna em uma passada.
+
+    Args:
+        rows: Iterável de linhas (dicts)
+        sample_size: Tamanho máximo da amostra por coluna
+        seed: Semente do gerador aleatório
+
+    Returns:
+        Tupla (amostras por coluna, total de linhas lidas)
+    """
+    rng = random.Random(seed)
+    samples: Dict[str, List[Any]] = {}
+    seen: Dict[str, int] = {}
+    total_rows = 0
+
+    for row in rows:
+        total_rows += 1
+        for column, value in row.items():
+            if value is None:
+                continue
+            count = seen.get(column, 0) + 1
+            seen[column] = count
+            reservoir = samples.setdefault(column, [])
+            if count <= sample_size:
+                reservoir.append(value)
+            else:
+                slot = rng.randrange(count)
+                if slot < sample_size:
+                    reservoir[slot] = value
+
+    return samples, total_rows
+
+
+def scan_column(column: str, values: List[Any]) -> Dict[str, Any]:
+    """
+    Aplica todos os detectores à amostra de uma coluna.
+
+    Args:
+        column: Nome da coluna
+        values: Amostra de valores não nulos
+
+    Returns:
+        Dicionário com taxa de acerto por detector e o melhor detector
+    """
+    texts = [str(v).strip() for v in values]
+    total = len(texts)
+    matches = {
+        name: sum(1 for text in texts if detector(text))
+        for name, detector in DETECTORS.items()
+    }
+
+    best = max(matches, key=matches.get) if total else None
+    return {
+        'column': column,
+        'sample_size': total,
+        'match_rates': {
+            name: round(count / total, 4) if total else 0.0
+            for name, count in matches.items()
+        },
+        'best_detector': best if best and matches[best] > 0 else None,
+        'confidence': round(wilson_lower_bound(matches[best], total), 4) if best else 0.0
+    }
+
+
+class PIIScanner:
+    """Sugere sensibilidade LGPD a partir de amostras dos dados."""
+
+    def __init__(self, data_dictionary: List[Dict[str, Any]],
+                 sample_size: int = 1000,
+                 min_confidence: float = 0.8,
+                 workers: int = 1,
+                 seed: Optional[int] = None):
+        """
+        Inicializa o scanner.
+
+        Args:
+            data_dictionary: Dicionário de dados
+            sample_size: Valores amostrados por coluna
+            min_confidence: Confiança mínima para sugerir um nível
+            workers: Processos usados para escanear colunas em paralelo
+            seed: Semente da amostragem
+        """
+        self.data_dictionary = data_dictionary
+        self.sample_size = sample_size
+        self.min_confidence = min_confidence
+        self.workers = workers
+        self.seed = seed
+
+    def scan(self, rows: Iterable[Dict[str, Any]], table_name: str) -> Dict[str, Any]:
+        """
+        Escaneia uma fonte de dados e compara com o dicionário.
+
+        Args:
+            rows: Iterável de linhas da tabela
+            table_name: Nome da tabela no dicionário
+
+        Returns:
+            Relatório com resultados por coluna e divergências
+        """
+        samples, total_rows = reservoir_sample(rows, self.sample_size, self.seed)
+        columns = sorted(samples)
+
+        if self.workers > 1 and len(columns) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(scan_column, columns, [samples[c] for c in columns]))
+        else:
+            results = [scan_column(c, samples[c]) for c in columns]
+
+        declared = {
+            col.get('coluna'): col.get('sensibilidade_lgpd')
+            for col in self.data_dictionary
+            if col.get('tabela') == table_name
+        }
+
+        disagreements = []
+        for result in results:
+            proposed = None
+            if result['best_detector'] and result['confidence'] >= self.min_confidence:
+                proposed = DETECTOR_SENSITIVITY[result['best_detector']]
+            current = declared.get(result['column'])
+            result['declared_sensitivity'] = current
+            result['proposed_sensitivity'] = proposed
+
+            if proposed and SENSITIVITY_RANK.get(current, -1) < SENSITIVITY_RANK[proposed]:
+                disagreements.append({
+                    'column': result['column'],
+                    'declared': current or 'NÃO DOCUMENTADA',
+                    'proposed': proposed,
+                    'detector': result['best_detector'],
+                    'confidence': result['confidence']
+                })
+
+        return {
+            'table': table_name,
+            'rows_scanned': total_rows,
+            'sample_size': self.sample_size,
+            'columns': results,
+            'disagreements': disagreements,
+            'status': 'REQUER ATENÇÃO' if disagreements else 'OK'
+        }
+
+
+if __name__ == '__main__':
+    import json
+    from dictionary_simulator import data_dictionary
+
+    rows = [
+        {'id_cliente': 1, 'nome_cliente': 'Carlos Silva', 'cpf': '52998224725',
+         'email': 'carlos@exemplo.com.br', 'telefone': '(11) 98765-4321',
+         'corretor_responsavel': 'João Santos'},
+        {'id_cliente': 2, 'nome_cliente': 'Maria da Silva', 'cpf': '111.444.777-35',
+         'email': 'maria@exemplo.com', 'telefone': '11 3456-7890',
+         'corretor_responsavel': 'Maria Costa'},
+        {'id_cliente': 3, 'nome_cliente': 'José Pereira', 'cpf': '39053344705',
+         'email': 'jose@exemplo.org', 'telefone': '+55 21 99876-5432',
+         'corretor_responsavel': 'Ana Paula'}
+    ] * 20
+
+    scanner = PIIScanner(data_dictionary, sample_size=50, min_confidence=0.8, seed=1)
+    report = scanner.scan(rows, 'clientes_seguros')
+    print(json.dumps(report['disagreements'], indent=2, ensure_ascii=False))
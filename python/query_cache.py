@@ -0,0 +1,403 @@
+# =========================================
+# Query Result Cache - Relatórios Analíticos
+# =========================================
+# Cache de resultados para as consultas nomeadas de statistical_queries.sql
+# e para as views de monitoramento de data_quality_monitoring.sql.
+# A chave combina identidade da consulta, parâmetros e a versão dos dados
+# das tabelas de origem, de modo que qualquer alteração invalida o resultado.
+# Consultas que dependem da data corrente (GETDATE, CURRENT_DATE) incluem o
+# dia na versão, pois o resultado muda sem que as tabelas mudem.
+#
+# Os arquivos persistidos são JSON (nunca pickle: o diretório pode ser
+# compartilhado) e seguem o mesmo orçamento LRU da memória. Cada arquivo é
+# nomeado por <identidade>-<versão>; ao gravar uma versão nova, os arquivos
+# das versões anteriores da mesma consulta e parâmetros são removidos.
+
+import os
+import re
+import json
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List, Dict, Any, Optional, Callable, Sequence, Tuple
+
+# Tabelas de origem de cada consulta nomeada
+QUERY_TABLES = {
+    'vw_historico_validacoes': ['tb_validacao_execucoes'],
+    'vw_erros_mais_comuns': ['tb_erros_validacao'],
+    'vw_atipicos_nao_investigados': ['tb_valores_atipicos'],
+    'vw_performance_seguros': ['clientes_seguros'],
+    'vw_distribuicao_geografica': ['clientes_seguros'],
+    'vw_tendencias_temporais': ['clientes_seguros']
+}
+
+# Consultas nomeadas cujo resultado depende da data corrente
+TIME_DEPENDENT_QUERIES = {'vw_atipicos_nao_investigados'}
+
+_TIME_FUNCTIONS = re.compile(
+    r"\b(GETDATE|SYSDATETIME|CURRENT_DATE|CURRENT_TIMESTAMP|NOW|TODAY)\b|'now'",
+    re.IGNORECASE
+)
+
+CACHE_FILE_SUFFIX = '.json'
+
+# Expressões que identificam a versão dos dados de cada tabela
+VERSION_EXPRESSIONS = {
+    'clientes_seguros': 'MAX(data_atualizacao), COUNT(*)',
+    'tb_validacao_execucoes': 'MAX(data_execucao), COUNT(*)',
+    'tb_erros_validacao': 'MAX(data_descoberta), COUNT(*)',
+    'tb_valores_atipicos': 'MAX(data_descoberta), COUNT(*), SUM(investigado)'
+}
+
+
+def data_version(conn, tables: Sequence[str]) -> Tuple[Any, ...]:
+    """
+    Calcula a versão dos dados das tabelas informadas.
+
+    Args:
+        conn: Conexão DB-API (ex.: sqlite3)
+        tables: Tabelas de origem da consulta
+
+    Returns:
+        Tupla com (tabela, max_data, contagem, ...) por tabela
+    """
+    version = []
+    cursor = conn.cursor()
+    for table in sorted(tables):
+        expression = VERSION_EXPRESSIONS.get(table, 'COUNT(*)')
+        cursor.execute(f"SELECT {expression} FROM {table}")
+        version.append((table,) + tuple(cursor.fetchone()))
+    return tuple(version)
+
+
+def is_time_dependent(sql: str) -> bool:
+    """Indica se o texto SQL usa a data ou hora corrente."""
+    return bool(_TIME_FUNCTIONS.search(sql))
+
+
+def _encode(value: Any) -> Any:
+    """Converte um resultado para JSON preservando tuplas, datas e decimais."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, tuple):
+        return {'t': [_encode(v) for v in value]}
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        return {'m': [[_encode(k), _encode(v)] for k, v in value.items()]}
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'d': value.isoformat()}
+    if isinstance(value, Decimal):
+        return {'dec': str(value)}
+    if isinstance(value, bytes):
+        return {'b': base64.b64encode(value).decode('ascii')}
+    raise TypeError(f"Tipo não persistível no cache: {type(value).__name__}")
+
+
+def _decode(value: Any) -> Any:
+    """Inverso de _encode."""
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    (tag, payload), = value.items()
+    if tag == 't':
+        return tuple(_decode(v) for v in payload)
+    if tag == 'm':
+        return {_decode(k): _decode(v) for k, v in payload}
+    if tag == 'dt':
+        return datetime.fromisoformat(payload)
+    if tag == 'd':
+        return date.fromisoformat(payload)
+    if tag == 'dec':
+        return Decimal(payload)
+    if tag == 'b':
+        return base64.b64decode(payload)
+    raise ValueError(f"Marcador desconhecido no cache: {tag!r}")
+
+
+class QueryResultCache:
+    """Cache LRU de resultados com orçamento em bytes e persistência opcional."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024,
+                 persist_dir: Optional[str] = None,
+                 max_disk_bytes: Optional[int] = None):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_bytes: Orçamento de memória para resultados serializados
+            persist_dir: Diretório para persistir resultados em disco (opcional)
+            max_disk_bytes: Orçamento do diretório (padrão: max_bytes)
+        """
+        self.max_bytes = max_bytes
+        self.persist_dir = persist_dir
+        self.max_disk_bytes = max_bytes if max_disk_bytes is None else max_disk_bytes
+        self._entries: 'OrderedDict[str, Tuple[Any, int]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0,
+                       'uncacheable': 0}
+
+        if persist_dir and not os.path.exists(persist_dir):
+            os.makedirs(persist_dir)
+
+    @staticmethod
+    def make_key(query_id: str, params: Any, version: Any) -> str:
+        """
+        Gera a chave do cache.
+
+        Args:
+            query_id: Nome da consulta
+            params: Parâmetros da consulta
+            version: Versão dos dados de origem
+
+        Returns:
+            '<hash da consulta e parâmetros>-<hash da identidade completa>'
+        """
+        identity = json.dumps([query_id, params], sort_keys=True, default=str)
+        payload = json.dumps([query_id, params, version], sort_keys=True, default=str)
+        return (hashlib.sha256(identity.encode('utf-8')).hexdigest()[:32] + '-'
+                + hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32])
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Busca um resultado em memória e, se configurado, em disco.
+
+        Returns:
+            Tupla (encontrado, resultado)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return True, entry[0]
+
+        if self.persist_dir:
+            path = self._path(key)
+            try:
+                with open(path, 'rb') as f:
+                    blob = f.read()
+                result = _decode(json.loads(blob))
+            except FileNotFoundError:
+                pass
+            except (ValueError, TypeError, KeyError):
+                # Arquivo corrompido ou adulterado: tratado como miss
+                self._remove_file(path)
+            else:
+                os.utime(path)
+                with self._lock:
+                    self._stats['disk_hits'] += 1
+                    self._store(key, result, len(blob))
+                return True, result
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return False, None
+
+    def put(self, key: str, result: Any):
+        """
+        Armazena um resultado, descartando os menos usados se necessário.
+
+        Versões anteriores da mesma consulta e parâmetros são removidas.
+        Resultados que não cabem em JSON (ex.: linhas sqlite3.Row) não são
+        armazenados: o tamanho não pode ser medido sem serializá-los.
+        """
+        try:
+            blob = json.dumps(_encode(result), separators=(',', ':')).encode('utf-8')
+        except (TypeError, ValueError):
+            blob = None
+
+        identity = key.split('-', 1)[0] + '-'
+        with self._lock:
+            for stale in [k for k in self._entries if k.startswith(identity) and k != key]:
+                self._bytes -= self._entries.pop(stale)[1]
+            if blob is None:
+                self._stats['uncacheable'] += 1
+            else:
+                self._store(key, result, len(blob))
+
+        if self.persist_dir:
+            for name in os.listdir(self.persist_dir):
+                if name.startswith(identity) and name != key + CACHE_FILE_SUFFIX:
+                    self._remove_file(os.path.join(self.persist_dir, name))
+            if blob is not None and len(blob) <= self.max_disk_bytes:
+                tmp_path = self._path(key) + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(blob)
+                os.replace(tmp_path, self._path(key))
+                self._prune_disk()
+
+    def get_or_compute(self, conn, query_id: str, compute: Callable[[], Any],
+                       params: Any = None,
+                       tables: Optional[Sequence[str]] = None,
+                       time_dependent: Optional[bool] = None) -> Any:
+        """
+        Retorna o resultado em cache ou calcula e armazena.
+
+        Args:
+            conn: Conexão usada para obter a versão dos dados
+            query_id: Nome da consulta
+            compute: Função que produz o resultado em caso de miss
+            params: Parâmetros da consulta
+            tables: Tabelas de origem (obrigatório fora de QUERY_TABLES)
+            time_dependent: Resultado depende da data corrente
+                            (padrão: TIME_DEPENDENT_QUERIES)
+
+        Returns:
+            Resultado da consulta
+
+        Raises:
+            KeyError: Consulta sem tabelas de origem conhecidas
+        """
+        if not tables:
+            if query_id not in QUERY_TABLES:
+                raise KeyError(
+                    f"Consulta '{query_id}' sem tabelas de origem mapeadas; "
+                    f"informe 'tables' ou registre-a em QUERY_TABLES"
+                )
+            tables = QUERY_TABLES[query_id]
+        if time_dependent is None:
+            time_dependent = query_id in TIME_DEPENDENT_QUERIES
+
+        version = data_version(conn, tables)
+        if time_dependent:
+            version += (('data_corrente', date.today().isoformat()),)
+        key = self.make_key(query_id, params, version)
+
+        found, result = self.get(key)
+        if found:
+            return result
+
+        result = compute()
+        self.put(key, result)
+        return result
+
+    def execute(self, conn, query_id: str, sql: str, params: Sequence[Any] = (),
+                tables: Optional[Sequence[str]] = None) -> List[Tuple[Any, ...]]:
+        """
+        Executa uma consulta SQL usando o cache.
+
+        Args:
+            conn: Conexão DB-API
+            query_id: Nome da consulta
+            sql: Texto da consulta
+            params: Parâmetros posicionais
+            tables: Tabelas de origem
+
+        Returns:
+            Linhas do resultado
+        """
+        def _run():
+            cursor = conn.cursor()
+            cursor.execute(sql, tuple(params))
+            return cursor.fetchall()
+
+        time_dependent = query_id in TIME_DEPENDENT_QUERIES or is_time_dependent(sql)
+        return self.get_or_compute(conn, query_id, _run, params=list(params), tables=tables,
+                                   time_dependent=time_dependent)
+
+    def clear(self):
+        """Remove todos os resultados em memória e em disco."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.persist_dir:
+            for name in os.listdir(self.persist_dir):
+                if name.endswith(CACHE_FILE_SUFFIX):
+                    self._remove_file(os.path.join(self.persist_dir, name))
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Retorna estatísticas de uso do cache.
+
+        Returns:
+            Dicionário com hits, misses, evictions e ocupação
+        """
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['disk_hits'] + self._stats['misses']
+            hits = self._stats['hits'] + self._stats['disk_hits']
+            return {
+                **self._stats,
+                'entries': len(self._entries),
+                'bytes_used': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hit_rate': round(hits / lookups * 100, 2) if lookups else 0
+            }
+
+    def _store(self, key: str, result: Any, size: int):
+        """Insere em memória e aplica a política LRU (chamar com o lock)."""
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        if size > self.max_bytes:
+            return
+
+        self._entries[key] = (result, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self._stats['evictions'] += 1
+
+    def _prune_disk(self):
+        """Aplica o orçamento LRU ao diretório (mtime é atualizado nos hits)."""
+        files = []
+        for name in os.listdir(self.persist_dir):
+            if name.endswith(CACHE_FILE_SUFFIX):
+                try:
+                    stat = os.stat(os.path.join(self.persist_dir, name))
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, name))
+
+        used = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if used <= self.max_disk_bytes:
+                break
+            self._remove_file(os.path.join(self.persist_dir, name))
+            used -= size
+            with self._lock:
+                self._stats['evictions'] += 1
+
+    @staticmethod
+    def _remove_file(path: str):
+        """Remove um arquivo do cache, ignorando remoções concorrentes."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _path(self, key: str) -> str:
+        """Caminho do arquivo persistido de uma chave."""
+        return os.path.join(self.persist_dir, key + CACHE_FILE_SUFFIX)
+
+
+if __name__ == '__main__':
+    import sqlite3
+
+    conn = sqlite3.connect(':memory:')
+    conn.execute(
+        "CREATE TABLE clientes_seguros (id_cliente INT, tipo_seguro TEXT, "
+        "valor_premio REAL, data_atualizacao TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO clientes_seguros VALUES (?, ?, ?, ?)",
+        [(1, 'Auto', 250.0, '2024-01-10'), (2, 'Auto', 280.0, '2024-02-15'),
+         (3, 'Saúde', 450.0, '2024-01-05')]
+    )
+
+    cache = QueryResultCache(max_bytes=1024 * 1024)
+    sql = "SELECT tipo_seguro, AVG(valor_premio) FROM clientes_seguros GROUP BY tipo_seguro"
+
+    for _ in range(3):
+        cache.execute(conn, 'premio_medio_por_tipo', sql, tables=['clientes_seguros'])
+    conn.execute("INSERT INTO clientes_seguros VALUES (4, 'Auto', 300.0, '2024-03-01')")
+    print(cache.execute(conn, 'premio_medio_por_tipo', sql, tables=['clientes_seguros']))
+
+    print("Estatísticas do cache:", json.dumps(cache.get_statistics(), indent=2))
@@ -0,0 +1,411 @@
+# =========================================
+# Query Service - Servidor Local de Consultas SQLite
+# =========================================
+# Servidor HTTP local que publica query-executor.html e executa as consultas
+# em SQLite, sem acesso à rede.
+#
+# Cada consulta abre um cursor no servidor; a página busca apenas a página
+# visível (offset/limit) e as linhas chegam em blocos JSON, uma mensagem por
+# linha, em uma resposta HTTP chunked. Avançar reaproveita o cursor aberto;
+# voltar reexecuta a consulta e descarta as linhas até o offset pedido.
+#
+# Endpoints:
+#   GET    /api/health                      -> tabelas disponíveis
+#   POST   /api/query   {"sql": "..."}      -> {"cursor_id", "columns"}
+#   GET    /api/cursor/<id>/rows?offset=&limit=
+#          -> {"columns", "offset"} / {"rows": [...]}... / {"done", "next_offset", "total_rows"}
+#   DELETE /api/cursor/<id>
+#
+# Uso: python query_service.py [--db arquivo.sqlite] [--port 8000]
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Scripts usados para montar o banco quando nenhum arquivo SQLite é informado
+DEFAULT_SEED_SCRIPTS = [
+    os.path.join(REPO_ROOT, 'sql', 'create_tables.sql'),
+    os.path.join(REPO_ROOT, 'sql', 'insert_data_dictionary.sql'),
+    os.path.join(REPO_ROOT, 'sql', 'insert_sample_data.sql')
+]
+
+# Únicos arquivos publicados (relativos a static_root) e seus tipos. Relatórios
+# e dados gerados no repositório nunca são servidos.
+STATIC_FILES = {
+    'query-executor.html': 'text/html; charset=utf-8'
+}
+
+
+def load_sql_scripts(conn: sqlite3.Connection, paths: List[str]) -> Dict[str, int]:
+    """
+    Executa scripts SQL comando a comando.
+
+    Comandos que o SQLite não aceita (sintaxe T-SQL, tabelas de outros
+    scripts) são ignorados e contados.
+
+    Args:
+        conn: Conexão sqlite3
+        paths: Caminhos dos scripts
+
+    Returns:
+        Dicionário com comandos executados e ignorados
+    """
+    executed = skipped = 0
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        statement = ''
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                statement += line
+                if not sqlite3.complete_statement(statement):
+                    continue
+                try:
+                    conn.execute(statement)
+                    executed += 1
+                except sqlite3.Error:
+                    skipped += 1
+                statement = ''
+    conn.commit()
+    return {'executed': executed, 'skipped': skipped}
+
+
+def _json_value(value: Any) -> Any:
+    """Valores do SQLite em formato JSON (BLOBs em hexadecimal)."""
+    return value.hex() if isinstance(value, bytes) else value
+
+
+class CursorRegistry:
+    """Cursores de consulta mantidos no servidor entre requisições."""
+
+    def __init__(self, database_uri: str, max_cursors: int = 32,
+                 idle_timeout: float = 300.0, chunk_size: int = 200):
+        """
+        Inicializa o registro.
+
+        Args:
+            database_uri: URI SQLite (file:...) usada pelas conexões de consulta
+            max_cursors: Cursores abertos simultaneamente
+            idle_timeout: Segundos sem uso até o cursor ser fechado
+            chunk_size: Linhas por bloco JSON enviado
+        """
+        self.database_uri = database_uri
+        self.max_cursors = max_cursors
+        self.idle_timeout = idle_timeout
+        self.chunk_size = chunk_size
+        self._cursors: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def open(self, sql: str) -> Dict[str, Any]:
+        """
+        Executa a consulta e registra o cursor.
+
+        Args:
+            sql: Consulta SELECT (um único comando)
+
+        Returns:
+            Dicionário com cursor_id e colunas
+        """
+        conn = sqlite3.connect(self.database_uri, uri=True, check_same_thread=False)
+        try:
+            conn.execute('PRAGMA query_only = ON')
+            cursor = conn.execute(sql)
+            if cursor.description is None:
+                raise ValueError('A consulta não retorna linhas')
+        except (sqlite3.Error, ValueError):
+            conn.close()
+            raise
+
+        cursor_id = uuid.uuid4().hex
+        entry = {
+            'sql': sql,
+            'conn': conn,
+            'cursor': cursor,
+            'columns': [d[0] for d in cursor.description],
+            'lookahead': [],
+            'position': 0,
+            'exhausted': False,
+            'total_rows': None,
+            'last_used': time.monotonic(),
+            'lock': threading.Lock()
+        }
+        with self._lock:
+            self._expire()
+            self._cursors[cursor_id] = entry
+        return {'cursor_id': cursor_id, 'columns': entry['columns']}
+
+    def fetch(self, cursor_id: str, offset: int, limit: int) -> Iterator[Dict[str, Any]]:
+        """
+        Lê uma página do cursor em blocos.
+
+        Args:
+            cursor_id: Identificador devolvido por open
+            offset: Primeira linha da página (0-based)
+            limit: Tamanho da página
+
+        Yields:
+            Mensagens JSON: cabeçalho, blocos de linhas e resumo final
+        """
+        entry = self._get(cursor_id)
+        with entry['lock']:
+            if offset < entry['position']:
+                entry['cursor'] = entry['conn'].execute(entry['sql'])
+                entry['lookahead'] = []
+                entry['position'] = 0
+                entry['exhausted'] = False
+
+            # Descarta as linhas anteriores ao offset
+            while entry['position'] < offset and not entry['exhausted']:
+                self._take(entry, min(self.chunk_size, offset - entry['position']))
+
+            yield {'columns': entry['columns'], 'offset': entry['position']}
+
+            remaining = limit
+            while remaining > 0 and not entry['exhausted']:
+                rows = self._take(entry, min(self.chunk_size, remaining))
+                remaining -= len(rows)
+                if rows:
+                    yield {'rows': [[_json_value(v) for v in row] for row in rows]}
+
+            # Lê uma linha adiante para saber se o resultado terminou
+            if not entry['exhausted'] and not entry['lookahead']:
+                row = entry['cursor'].fetchone()
+                if row is None:
+                    self._finish(entry)
+                else:
+                    entry['lookahead'] = [row]
+
+            entry['last_used'] = time.monotonic()
+            yield {
+                'done': entry['exhausted'],
+                'next_offset': entry['position'],
+                'total_rows': entry['total_rows']
+            }
+
+    def close(self, cursor_id: str) -> bool:
+        """Fecha um cursor (True se existia)."""
+        with self._lock:
+            entry = self._cursors.pop(cursor_id, None)
+        if entry:
+            with entry['lock']:
+                entry['conn'].close()
+        return entry is not None
+
+    def close_all(self):
+        """Fecha todos os cursores."""
+        for cursor_id in list(self._cursors):
+            self.close(cursor_id)
+
+    def _get(self, cursor_id: str) -> Dict[str, Any]:
+        with self._lock:
+            entry = self._cursors.get(cursor_id)
+        if entry is None:
+            raise KeyError(f"Cursor '{cursor_id}' não encontrado ou expirado")
+        return entry
+
+    @staticmethod
+    def _finish(entry: Dict[str, Any]):
+        entry['exhausted'] = True
+        entry['total_rows'] = entry['position']
+
+    def _take(self, entry: Dict[str, Any], count: int) -> List[Tuple[Any, ...]]:
+        """Lê até count linhas (consumindo antes a linha lida adiante)."""
+        rows = entry['lookahead'][:count]
+        entry['lookahead'] = entry['lookahead'][len(rows):]
+        if len(rows) < count:
+            rows.extend(entry['cursor'].fetchmany(count - len(rows)))
+        entry['position'] += len(rows)
+        if len(rows) < count:
+            self._finish(entry)
+        return rows
+
+    def _expire(self):
+        """Fecha cursores ociosos e, se necessário, os menos usados."""
+        now = time.monotonic()
+        idle = [k for k, e in self._cursors.items() if not e['lock'].locked()]
+        idle.sort(key=lambda k: self._cursors[k]['last_used'])
+        for position, cursor_id in enumerate(idle):
+            entry = self._cursors[cursor_id]
+            over_limit = len(self._cursors) >= self.max_cursors
+            if over_limit or now - entry['last_used'] > self.idle_timeout:
+                self._cursors.pop(cursor_id)['conn'].close()
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """Atende a API de consultas e a página query-executor.html."""
+
+    protocol_version = 'HTTP/1.1'
+    registry: CursorRegistry = None
+    static_root: str = REPO_ROOT
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split('/') if p]
+
+        if parts == ['api', 'health']:
+            conn = sqlite3.connect(self.registry.database_uri, uri=True)
+            try:
+                tables = [name for (name,) in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name"
+                )]
+            finally:
+                conn.close()
+            self._send_json(200, {'status': 'ok', 'tables': tables})
+        elif len(parts) == 4 and parts[:2] == ['api', 'cursor'] and parts[3] == 'rows':
+            query = parse_qs(url.query)
+            try:
+                offset = max(0, int(query.get('offset', ['0'])[0]))
+                limit = min(10000, max(1, int(query.get('limit', ['50'])[0])))
+            except ValueError:
+                self._send_json(400, {'error': 'offset e limit devem ser inteiros'})
+                return
+            self._stream_rows(parts[2], offset, limit)
+        else:
+            self._send_static(url.path)
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/api/query':
+            self._send_json(404, {'error': 'Endpoint não encontrado'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            sql = (body.get('sql') or '').strip()
+            if not sql:
+                raise ValueError('Consulta vazia')
+            self._send_json(200, self.registry.open(sql))
+        except (ValueError, sqlite3.Error) as e:
+            self._send_json(400, {'error': str(e)})
+
+    def do_DELETE(self):
+        parts = [p for p in urlparse(self.path).path.split('/') if p]
+        if len(parts) == 3 and parts[:2] == ['api', 'cursor']:
+            closed = self.registry.close(parts[2])
+            self._send_json(200 if closed else 404, {'closed': closed})
+        else:
+            self._send_json(404, {'error': 'Endpoint não encontrado'})
+
+    def _stream_rows(self, cursor_id: str, offset: int, limit: int):
+        """Envia a página como JSON delimitado por linha em resposta chunked."""
+        messages = self.registry.fetch(cursor_id, offset, limit)
+        try:
+            first = next(messages)
+        except KeyError as e:
+            self._send_json(404, {'error': e.args[0]})
+            return
+        except sqlite3.Error as e:
+            self._send_json(400, {'error': str(e)})
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        try:
+            self._write_chunk(first)
+            for message in messages:
+                self._write_chunk(message)
+        except sqlite3.Error as e:
+            self._write_chunk({'error': str(e)})
+        except (BrokenPipeError, ConnectionResetError):
+            messages.close()
+            return
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _write_chunk(self, message: Dict[str, Any]):
+        data = (json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8')
+        self.wfile.write(f'{len(data):X}\r\n'.encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_static(self, path: str):
+        """Publica apenas os arquivos de STATIC_FILES."""
+        relative = path.lstrip('/') or 'query-executor.html'
+        content_type = STATIC_FILES.get(relative)
+        full_path = os.path.join(self.static_root, relative)
+        if content_type is None or not os.path.isfile(full_path):
+            self._send_json(404, {'error': 'Arquivo não encontrado'})
+            return
+        with open(full_path, 'rb') as f:
+            data = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args):
+        pass
+
+
+def create_server(db_path: Optional[str] = None,
+                  host: str = '127.0.0.1',
+                  port: int = 8000,
+                  seed_scripts: Optional[List[str]] = None,
+                  static_root: str = REPO_ROOT) -> Tuple[ThreadingHTTPServer, sqlite3.Connection]:
+    """
+    Cria o servidor de consultas.
+
+    Args:
+        db_path: Banco SQLite existente (aberto somente leitura). Sem ele, um
+            banco em memória é montado com os scripts de seed_scripts.
+        host: Endereço de escuta (local por padrão)
+        port: Porta TCP (0 escolhe uma porta livre)
+        seed_scripts: Scripts SQL do banco em memória
+        static_root: Diretório de query-executor.html
+
+    Returns:
+        Tupla (servidor, conexão que mantém o banco aberto)
+    """
+    if db_path:
+        uri = f"file:{os.path.abspath(db_path)}?mode=ro"
+        keeper = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    else:
+        uri = f"file:query_service_{uuid.uuid4().hex}?mode=memory&cache=shared"
+        keeper = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        load_sql_scripts(keeper, seed_scripts if seed_scripts is not None else DEFAULT_SEED_SCRIPTS)
+
+    handler = type('BoundQueryRequestHandler', (QueryRequestHandler,), {
+        'registry': CursorRegistry(uri),
+        'static_root': static_root
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server, keeper
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Servidor local do Query Executor')
+    parser.add_argument('--db', help='Banco SQLite (padrão: dados de exemplo em memória)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    server, keeper = create_server(args.db, args.host, args.port)
+    print(f"Query Executor disponível em http://{args.host}:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.RequestHandlerClass.registry.close_all()
+        server.server_close()
+        keeper.close()
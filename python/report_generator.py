@@ -2,14 +2,27 @@
 # Data Dictionary Report Generator
 # =========================================
 # Gerador de relatórios e documentação a partir do dicionário
+#
+# Os relatórios básicos (JSON, CSV, HTML, Markdown, DDL) usam apenas a
+# biblioteca padrão. fk_discovery (NumPy), lineage_parser e schema_drift
+# são importados dentro dos métodos que os utilizam.
 
 import json
 import csv
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
 from datetime import datetime
 from collections import defaultdict
 import os
 
+if TYPE_CHECKING:
+    from lineage_parser import LineageCache
+
+DEFAULT_SCRIPT_DIRS = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sql'),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sas')
+]
+
+
 class ReportGenerator:
     """Gera relatórios em múltiplos formatos a partir do dicionário de dados."""
     
@@ -277,21 +290,40 @@ class ReportGenerator:
         
         return filepath
     
-    def generate_sql_ddl(self, filename: str = 'ddl_tables.sql') -> str:
+    def generate_sql_ddl(self, filename: str = 'ddl_tables.sql',
+                         reference_ddl: Optional[List[str]] = None) -> str:
         """
         Gera comandos SQL CREATE TABLE.
         
         Args:
             filename: Nome do arquivo
+            reference_ddl: Arquivos DDL reais para checar divergência (opcional)
             
         Returns:
             Caminho do arquivo gerado
         """
         filepath = os.path.join(self.output_dir, filename)
         sql_content = ""
+        drift = {}
+        if reference_ddl:
+            from schema_drift import SchemaDriftDetector
+            drift = SchemaDriftDetector(self.data_dictionary).compare_ddl_files(reference_ddl)['drift']
         
         for table_name, columns in self.tables.items():
             sql_content += f"\n-- Tabela: {table_name}\n"
+            table_drift = drift.get(table_name)
+            if table_drift:
+                sql_content += "-- ATENÇÃO: dicionário diverge do DDL de referência\n"
+                for key in ('missing', 'extra'):
+                    if table_drift.get(key):
+                        sql_content += f"--   {key}: {', '.join(table_drift[key])}\n"
+                for key in ('type_changed', 'constraint_changed'):
+                    for change in table_drift.get(key, []):
+                        attribute = '' if key == 'type_changed' else f"{change['attribute']} "
+                        sql_content += (
+                            f"--   {key}: {change['column']} {attribute}"
+                            f"{change['documented']} -> {change['actual']}\n"
+                        )
             sql_content += f"CREATE TABLE {table_name} (\n"
             
             column_defs = []
@@ -350,10 +382,14 @@ class DocumentationBuilder:
     def __init__(self, data_dictionary: List[Dict[str, Any]]):
         self.data_dictionary = data_dictionary
     
-    def build_entity_relationship_diagram(self) -> Dict[str, Any]:
+    def build_entity_relationship_diagram(self, table_data: Dict[str, Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Constrói descrição do diagrama entidade-relacionamento.
-        
+
+        Args:
+            table_data: Dados por tabela ({tabela: {coluna: valores}}) usados
+                        para descobrir chaves estrangeiras (opcional)
+
         Returns:
             Dicionário com estrutura do ERD
         """
@@ -377,42 +413,55 @@ class DocumentationBuilder:
             
             if col.get('chave_primaria'):
                 entities[table]['primary_keys'].append(col.get('coluna'))
-        
+
+        if table_data:
+            from fk_discovery import ForeignKeyDiscovery
+            for fk in ForeignKeyDiscovery(self.data_dictionary).discover(table_data):
+                entity = entities.setdefault(fk['table'], {
+                    'attributes': [],
+                    'primary_keys': [],
+                    'foreign_keys': []
+                })
+                entity['foreign_keys'].append({
+                    'column': fk['column'],
+                    'references': f"{fk['references_table']}.{fk['references_column']}",
+                    'estimated_containment': fk['estimated_containment']
+                })
+
         return entities
     
-    def build_data_lineage(self) -> Dict[str, Any]:
+    def build_data_lineage(self, script_paths: List[str] = None,
+                           cache: Optional['LineageCache'] = None) -> Dict[str, Any]:
         """
-        Constrói informações sobre linhagem de dados.
+        Constrói informações sobre linhagem de dados a partir dos scripts SQL/SAS.
         
+        Args:
+            script_paths: Arquivos ou diretórios de scripts (padrão: sql/ e sas/)
+            cache: Cache de parsing reaproveitado entre chamadas
+            
         Returns:
             Dicionário com informações de linhagem
         """
+        from lineage_parser import LineageEngine
+
+        engine = LineageEngine(script_paths or DEFAULT_SCRIPT_DIRS, cache)
+        graph = engine.build()
+        
         return {
-            'sources': self._identify_data_sources(),
-            'transformations': self._identify_transformations(),
-            'destinations': self._identify_destinations()
+            'sources': self._identify_data_sources(graph),
+            'transformations': graph['transformations'],
+            'destinations': graph['destinations'],
+            'edges': graph['edges']
         }
     
-    def _identify_data_sources(self) -> List[str]:
-        """Identifica fontes de dados."""
-        tables = set()
-        for col in self.data_dictionary:
-            tables.add(col.get('tabela', 'unknown'))
-        return list(tables)
-    
-    def _identify_transformations(self) -> List[str]:
-        """Identifica transformações aplicadas."""
-        transformations = []
+    def _identify_data_sources(self, graph: Dict[str, Any]) -> List[str]:
+        """Identifica fontes de dados (inclui tabelas do dicionário sem scripts)."""
+        tables = set(graph['sources'])
         for col in self.data_dictionary:
-            rule = col.get('regra_negocio', '')
-            if 'Gerado' in rule or 'Calculado' in rule:
-                transformations.append(f"{col.get('coluna')} - {rule}")
-        return transformations
-    
-    def _identify_destinations(self) -> List[str]:
-        """Identifica destinos dos dados."""
-        # Placeholder para lógica customizada
-        return ['Data Warehouse', 'Analytics Platform']
+            table = col.get('tabela', 'unknown')
+            if table not in graph['nodes']:
+                tables.add(table)
+        return sorted(tables)
 
 
 if __name__ == '__main__':
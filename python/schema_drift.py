@@ -0,0 +1,263 @@
+# =========================================
+# Schema Drift - Divergência entre DDL e Dicionário
+# =========================================
+# Compara o schema real (arquivos DDL ou um banco SQLite) com o
+# documentado no dicionário de dados. Cada tabela recebe uma impressão
+# digital estrutural; apenas tabelas com impressões diferentes são
+# comparadas coluna a coluna.
+
+import re
+import hashlib
+import sqlite3
+from typing import List, Dict, Any, Iterable
+
+from lineage_parser import tokenize_script
+
+Schema = Dict[str, Dict[str, Dict[str, Any]]]
+
+_TYPE_SYNONYMS = {
+    'INTEGER': 'INT',
+    'NUMERIC': 'DECIMAL',
+    'CHARACTER': 'CHAR',
+    'BOOLEAN': 'BIT'
+}
+_TABLE_CONSTRAINTS = {'PRIMARY', 'CONSTRAINT', 'FOREIGN', 'UNIQUE', 'CHECK', 'INDEX', 'KEY'}
+
+
+def normalize_type(tipo: str) -> str:
+    """Normaliza um tipo SQL (maiúsculas, sem espaços, sinônimos)."""
+    tipo = re.sub(r'\s+', '', (tipo or '').upper())
+    match = re.match(r'^([A-Z]+)(.*)$', tipo)
+    if not match:
+        return tipo
+    return _TYPE_SYNONYMS.get(match.group(1), match.group(1)) + match.group(2)
+
+
+def _column(tipo: str, nullable: bool, primary_key: bool) -> Dict[str, Any]:
+    """Definição canônica de coluna usada nas comparações."""
+    return {
+        'tipo': normalize_type(tipo),
+        'nullable': bool(nullable) and not primary_key,
+        'primary_key': bool(primary_key)
+    }
+
+
+def schema_from_dictionary(data_dictionary: List[Dict[str, Any]]) -> Schema:
+    """
+    Converte o dicionário de dados em schema por tabela.
+
+    Args:
+        data_dictionary: Lista com definições de colunas
+
+    Returns:
+        Dicionário {tabela: {coluna: definição}}
+    """
+    schema: Schema = {}
+    for col in data_dictionary:
+        table = schema.setdefault(col.get('tabela', 'unknown'), {})
+        table[col.get('coluna')] = _column(
+            col.get('tipo', ''), col.get('aceita_nulos', True), col.get('chave_primaria', False)
+        )
+    return schema
+
+
+def schema_from_ddl(text: str) -> Schema:
+    """
+    Extrai as tabelas de comandos CREATE TABLE.
+
+    Args:
+        text: Conteúdo de um script DDL
+
+    Returns:
+        Dicionário {tabela: {coluna: definição}}
+    """
+    tokens = tokenize_script(text)
+    schema: Schema = {}
+    i = 0
+    while i < len(tokens) - 3:
+        if (tokens[i][1].upper() != 'CREATE' or tokens[i + 1][1].upper() != 'TABLE'
+                or tokens[i + 3][1] != '('):
+            i += 1
+            continue
+
+        table_name = tokens[i + 2][1].replace('[', '').replace(']', '').split('.')[-1].lower()
+        i += 4
+        definitions, current, depth = [], [], 1
+        while i < len(tokens) and depth > 0:
+            value = tokens[i][1]
+            if value == '(':
+                depth += 1
+            elif value == ')':
+                depth -= 1
+            if depth == 1 and value == ',' or depth == 0:
+                definitions.append(current)
+                current = []
+            else:
+                current.append(value)
+            i += 1
+
+        table = schema.setdefault(table_name, {})
+        table_pks = []
+        for definition in definitions:
+            if not definition:
+                continue
+            words = [w.upper() for w in definition]
+            if words[0] in _TABLE_CONSTRAINTS:
+                if 'PRIMARY' in words and '(' in definition:
+                    start = definition.index('(') + 1
+                    table_pks.extend(
+                        w.lower() for w in definition[start:] if w not in (',', ')')
+                    )
+                continue
+
+            name = definition[0].replace('[', '').replace(']', '').lower()
+            tipo = definition[1] if len(definition) > 1 else ''
+            rest = definition[2:]
+            if rest[:1] == ['(']:
+                close = rest.index(')')
+                tipo += '(' + ''.join(rest[1:close]) + ')'
+                rest = rest[close + 1:]
+            rest_upper = [w.upper() for w in rest]
+            not_null = any(
+                rest_upper[k] == 'NOT' and rest_upper[k + 1] == 'NULL'
+                for k in range(len(rest_upper) - 1)
+            )
+            table[name] = _column(tipo, not not_null, 'PRIMARY' in rest_upper)
+
+        for pk in table_pks:
+            if pk in table:
+                table[pk].update({'primary_key': True, 'nullable': False})
+    return schema
+
+
+def schema_from_ddl_files(paths: Iterable[str]) -> Schema:
+    """Extrai e combina as tabelas de vários arquivos DDL."""
+    schema: Schema = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            schema.update(schema_from_ddl(f.read()))
+    return schema
+
+
+def schema_from_sqlite(conn: sqlite3.Connection) -> Schema:
+    """
+    Lê o schema de um banco SQLite em uso.
+
+    Args:
+        conn: Conexão sqlite3
+
+    Returns:
+        Dicionário {tabela: {coluna: definição}}
+    """
+    schema: Schema = {}
+    tables = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    ).fetchall()
+    for (table_name,) in tables:
+        columns = conn.execute(f'PRAGMA table_info("{table_name}")').fetchall()
+        schema[table_name.lower()] = {
+            name.lower(): _column(tipo, not notnull, pk > 0)
+            for _, name, tipo, notnull, _, pk in columns
+        }
+    return schema
+
+
+def table_fingerprint(columns: Dict[str, Dict[str, Any]]) -> str:
+    """Impressão digital estrutural de uma tabela (independe da ordem das colunas)."""
+    canonical = '\n'.join(
+        f"{name}:{col['tipo']}:{int(col['nullable'])}:{int(col['primary_key'])}"
+        for name, col in sorted(columns.items())
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class SchemaDriftDetector:
+    """Detecta divergências entre o schema documentado e o real."""
+
+    def __init__(self, data_dictionary: List[Dict[str, Any]]):
+        """
+        Inicializa o detector com o schema documentado.
+
+        Args:
+            data_dictionary: Dicionário de dados
+        """
+        self.expected = schema_from_dictionary(data_dictionary)
+        self.expected_fingerprints = {
+            table: table_fingerprint(columns) for table, columns in self.expected.items()
+        }
+
+    def compare(self, actual: Schema) -> Dict[str, Any]:
+        """
+        Compara o schema real com o dicionário.
+
+        'missing' são colunas documentadas ausentes no schema real e
+        'extra' são colunas do schema real não documentadas.
+
+        Args:
+            actual: Schema real ({tabela: {coluna: definição}})
+
+        Returns:
+            Relatório de divergências por tabela
+        """
+        drift = {}
+        unchanged = 0
+        for table, expected_columns in self.expected.items():
+            actual_columns = actual.get(table)
+            if actual_columns is None:
+                drift[table] = {'status': 'TABELA_AUSENTE'}
+                continue
+            if table_fingerprint(actual_columns) == self.expected_fingerprints[table]:
+                unchanged += 1
+                continue
+            drift[table] = self._diff_columns(expected_columns, actual_columns)
+
+        undocumented = sorted(set(actual) - set(self.expected))
+        return {
+            'tables_checked': len(self.expected),
+            'tables_unchanged': unchanged,
+            'tables_with_drift': len(drift),
+            'undocumented_tables': undocumented,
+            'drift': drift,
+            'status': 'DIVERGENTE' if drift else 'OK'
+        }
+
+    def compare_ddl_files(self, paths: Iterable[str]) -> Dict[str, Any]:
+        """Compara o dicionário com arquivos DDL."""
+        return self.compare(schema_from_ddl_files(paths))
+
+    def compare_sqlite(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        """Compara o dicionário com um banco SQLite."""
+        return self.compare(schema_from_sqlite(conn))
+
+    @staticmethod
+    def _diff_columns(expected: Dict[str, Dict[str, Any]],
+                      actual: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Diferença coluna a coluna de uma tabela."""
+        changed = []
+        for name in sorted(set(expected) & set(actual)):
+            for attribute in ('tipo', 'nullable', 'primary_key'):
+                if expected[name][attribute] != actual[name][attribute]:
+                    changed.append({
+                        'column': name,
+                        'attribute': attribute,
+                        'documented': expected[name][attribute],
+                        'actual': actual[name][attribute]
+                    })
+        return {
+            'status': 'DIVERGENTE',
+            'missing': sorted(set(expected) - set(actual)),
+            'extra': sorted(set(actual) - set(expected)),
+            'type_changed': [c for c in changed if c['attribute'] == 'tipo'],
+            'constraint_changed': [c for c in changed if c['attribute'] != 'tipo']
+        }
+
+
+if __name__ == '__main__':
+    import os
+    import json
+    from dictionary_simulator import data_dictionary
+
+    repo_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    detector = SchemaDriftDetector(data_dictionary)
+    report = detector.compare_ddl_files([os.path.join(repo_root, 'sql', 'create_tables.sql')])
+    print(json.dumps(report, indent=2, ensure_ascii=False))
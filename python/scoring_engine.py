@@ -0,0 +1,340 @@
+# =========================================
+# Scoring Engine - Funções Analíticas Vetorizadas
+# =========================================
+# Implementações em lote (NumPy) das funções escalares T-SQL de
+# sql/advanced_analytics.sql: fn_calcular_ltv, fn_classificar_risco_cliente
+# e fn_calcular_churn_probability.
+#
+# Convenção de nulos: valores NULL do SQL são representados como NaN
+# (numéricos) ou NaT (datas). As comparações com NaN são sempre falsas,
+# o que reproduz o comportamento das cláusulas CASE com NULL.
+
+from typing import Dict, Any, Optional, Sequence, Tuple
+from datetime import date, datetime
+
+import numpy as np
+
+from column_utils import as_float, as_dates, round_half_away
+
+RISCO_CLASSES = np.array(['BAIXO', 'MEDIO', 'ALTO', 'MUITO_ALTO'])
+STATUS_LTV = ('ATIVO', 'SUSPENSO')
+
+
+def _year_of(dates: np.ndarray) -> np.ndarray:
+    """Ano civil de cada data (NaN para NaT)."""
+    years = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+    return np.where(np.isnat(dates), np.nan, years.astype(np.float64))
+
+
+class VectorizedScoring:
+    """Avalia as funções de score sobre colunas inteiras de uma vez."""
+
+    @staticmethod
+    def calcular_ltv(id_cliente: Sequence[int],
+                     valor_premio: Sequence[float],
+                     data_contratacao: Sequence[Any],
+                     status_contrato: Sequence[str],
+                     taxa_desconto: float = 0.10,
+                     data_referencia: Optional[date] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Equivalente em lote de fn_calcular_ltv para todos os clientes.
+
+        Args:
+            id_cliente: Coluna de identificadores (um contrato por linha)
+            valor_premio: Coluna de prêmios mensais
+            data_contratacao: Coluna de datas de contratação
+            status_contrato: Coluna de status do contrato
+            taxa_desconto: Taxa anual de desconto
+            data_referencia: Data usada no lugar de GETDATE()
+
+        Returns:
+            Tupla (ids_unicos, ltv) com o LTV de cada cliente
+        """
+        ids = np.asarray(id_cliente)
+        premio = as_float(valor_premio)
+        contratacao = as_dates(data_contratacao)
+        status = np.asarray(status_contrato, dtype=object)
+        referencia = data_referencia or date.today()
+
+        # DATEDIFF(YEAR, ...) conta fronteiras de ano civil
+        anos = referencia.year - _year_of(contratacao)
+        parcela = premio * 12 / np.power(1 + taxa_desconto, anos)
+
+        # SUM ignora NULLs; linhas fora do filtro de status não contribuem
+        elegivel = np.isin(status, STATUS_LTV) & ~np.isnan(parcela)
+        pesos = np.where(elegivel, parcela, 0.0)
+
+        ids_unicos, inverso = np.unique(ids, return_inverse=True)
+        ltv = np.bincount(inverso, weights=pesos, minlength=len(ids_unicos))
+        return ids_unicos, round_half_away(ltv)
+
+    @staticmethod
+    def classificar_risco_cliente(idade: Sequence[float],
+                                  meses_cliente: Sequence[float],
+                                  numero_sinistros: Sequence[float]) -> np.ndarray:
+        """
+        Equivalente em lote de fn_classificar_risco_cliente.
+
+        Args:
+            idade: Coluna de idades
+            meses_cliente: Coluna de meses como cliente
+            numero_sinistros: Coluna de número de sinistros
+
+        Returns:
+            Array com a classe de risco de cada linha
+        """
+        idade = as_float(idade)
+        meses = as_float(meses_cliente)
+        sinistros = as_float(numero_sinistros)
+
+        fator_idade = np.select(
+            [idade < 25,
+             (idade >= 25) & (idade <= 35),
+             (idade >= 36) & (idade <= 50),
+             idade > 70],
+            [30, 20, 10, 25],
+            default=0
+        )
+        fator_tempo = np.select([meses > 60, meses > 36], [20, 10], default=0)
+
+        # NULL em numero_sinistros propaga para o score e cai no ELSE 'BAIXO'
+        score = fator_idade + sinistros * 15 - fator_tempo
+
+        indice = np.select(
+            [score >= 60, score >= 40, score >= 20],
+            [3, 2, 1],
+            default=0
+        )
+        return RISCO_CLASSES[indice]
+
+    @staticmethod
+    def calcular_churn_probability(dias_sem_atividade: Sequence[float],
+                                   meses_cliente: Sequence[float],
+                                   valor_premio_medio_mercado: Sequence[float],
+                                   valor_premio_cliente: Sequence[float]) -> np.ndarray:
+        """
+        Equivalente em lote de fn_calcular_churn_probability.
+
+        Args:
+            dias_sem_atividade: Coluna de dias sem atividade
+            meses_cliente: Coluna de meses como cliente
+            valor_premio_medio_mercado: Prêmio médio de mercado (coluna ou escalar)
+            valor_premio_cliente: Coluna de prêmios do cliente
+
+        Returns:
+            Array com a probabilidade de churn (0 a 100)
+        """
+        dias = as_float(dias_sem_atividade)
+        meses = as_float(meses_cliente)
+        cliente = as_float(valor_premio_cliente)
+        mercado = np.broadcast_to(
+            as_float(np.atleast_1d(valor_premio_medio_mercado)), cliente.shape
+        )
+
+        # NULLIF(@valor_premio_medio_mercado, 1) anula o divisor quando vale 1
+        divisor = np.where(mercado == 1, np.nan, mercado)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            desvio_preco = round_half_away(np.abs(cliente - mercado) / divisor * 100)
+
+        probabilidade = (
+            np.select([dias > 180, dias > 90, dias > 30], [45, 25, 10], default=0)
+            + np.select([meses < 6, meses < 12], [30, 15], default=0)
+            + np.select([desvio_preco > 30, desvio_preco > 15], [20, 10], default=0)
+        )
+        return np.minimum(probabilidade, 100).astype(np.float64)
+
+    @staticmethod
+    def score_portfolio(columns: Dict[str, Sequence[Any]],
+                        valor_premio_medio_mercado: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        Calcula risco e churn para uma carteira inteira em formato colunar.
+
+        Args:
+            columns: Colunas da carteira (idade, meses_cliente, numero_sinistros,
+                     dias_sem_atividade, valor_premio)
+            valor_premio_medio_mercado: Prêmio de referência (padrão: média da carteira)
+
+        Returns:
+            Dicionário com as colunas calculadas
+        """
+        premio = as_float(columns['valor_premio'])
+        if valor_premio_medio_mercado is None:
+            valor_premio_medio_mercado = float(np.nanmean(premio))
+
+        return {
+            'classe_risco': VectorizedScoring.classificar_risco_cliente(
+                columns['idade'], columns['meses_cliente'], columns['numero_sinistros']
+            ),
+            'prob_churn': VectorizedScoring.calcular_churn_probability(
+                columns['dias_sem_atividade'], columns['meses_cliente'],
+                valor_premio_medio_mercado, premio
+            )
+        }
+
+
+class ScalarScoring:
+    """Portes linha a linha das UDFs T-SQL, usados como referência."""
+
+    @staticmethod
+    def calcular_ltv(rows: Sequence[Dict[str, Any]], id_cliente: int,
+                     taxa_desconto: float = 0.10,
+                     data_referencia: Optional[date] = None) -> float:
+        """Reproduz fn_calcular_ltv para um único cliente."""
+        referencia = data_referencia or date.today()
+        ltv = None
+        for row in rows:
+            if row['id_cliente'] != id_cliente or row['status_contrato'] not in STATUS_LTV:
+                continue
+            if row['valor_premio'] is None or row['data_contratacao'] is None:
+                continue
+            anos = referencia.year - datetime.fromisoformat(str(row['data_contratacao'])[:10]).year
+            parcela = row['valor_premio'] * 12 / (1 + taxa_desconto) ** anos
+            ltv = parcela if ltv is None else ltv + parcela
+        return float(round_half_away(np.float64(ltv or 0)))
+
+    @staticmethod
+    def classificar_risco_cliente(idade: Optional[int], meses_cliente: Optional[int],
+                                  numero_sinistros: Optional[int]) -> str:
+        """Reproduz fn_classificar_risco_cliente para uma linha."""
+        score = 0
+        if idade is not None:
+            if idade < 25:
+                score += 30
+            elif 25 <= idade <= 35:
+                score += 20
+            elif 36 <= idade <= 50:
+                score += 10
+            elif idade > 70:
+                score += 25
+
+        if numero_sinistros is None:
+            return 'BAIXO'
+        score += numero_sinistros * 15
+
+        if meses_cliente is not None:
+            if meses_cliente > 60:
+                score -= 20
+            elif meses_cliente > 36:
+                score -= 10
+
+        if score >= 60:
+            return 'MUITO_ALTO'
+        if score >= 40:
+            return 'ALTO'
+        if score >= 20:
+            return 'MEDIO'
+        return 'BAIXO'
+
+    @staticmethod
+    def calcular_churn_probability(dias_sem_atividade: Optional[int],
+                                   meses_cliente: Optional[int],
+                                   valor_premio_medio_mercado: Optional[float],
+                                   valor_premio_cliente: Optional[float]) -> float:
+        """Reproduz fn_calcular_churn_probability para uma linha."""
+        desvio_preco = None
+        if (valor_premio_cliente is not None and valor_premio_medio_mercado is not None
+                and valor_premio_medio_mercado != 1):
+            desvio_preco = float(round_half_away(np.float64(
+                abs(valor_premio_cliente - valor_premio_medio_mercado)
+                / valor_premio_medio_mercado * 100
+            )))
+
+        probabilidade = 0
+        if dias_sem_atividade is not None:
+            if dias_sem_atividade > 180:
+                probabilidade += 45
+            elif dias_sem_atividade > 90:
+                probabilidade += 25
+            elif dias_sem_atividade > 30:
+                probabilidade += 10
+
+        if meses_cliente is not None:
+            if meses_cliente < 6:
+                probabilidade += 30
+            elif meses_cliente < 12:
+                probabilidade += 15
+
+        if desvio_preco is not None:
+            if desvio_preco > 30:
+                probabilidade += 20
+            elif desvio_preco > 15:
+                probabilidade += 10
+
+        return float(min(probabilidade, 100))
+
+
+def verificar_equivalencia(n_linhas: int = 10000, seed: int = 42) -> Dict[str, Any]:
+    """
+    Compara as versões vetorizadas com os portes escalares linha a linha.
+
+    Args:
+        n_linhas: Quantidade de linhas sintéticas
+        seed: Semente do gerador aleatório
+
+    Returns:
+        Dicionário com a quantidade de divergências por função
+    """
+    rng = np.random.default_rng(seed)
+    referencia = date(2025, 6, 30)
+
+    idade = rng.integers(18, 90, n_linhas).astype(np.float64)
+    meses = rng.integers(0, 120, n_linhas).astype(np.float64)
+    sinistros = rng.integers(0, 5, n_linhas).astype(np.float64)
+    dias = rng.integers(0, 400, n_linhas).astype(np.float64)
+    premio = np.round(rng.uniform(50, 900, n_linhas), 2)
+    for coluna in (idade, meses, sinistros, dias, premio):
+        coluna[rng.random(n_linhas) < 0.02] = np.nan
+
+    def _py(value):
+        return None if np.isnan(value) else value
+
+    risco_vet = VectorizedScoring.classificar_risco_cliente(idade, meses, sinistros)
+    risco_div = sum(
+        risco_vet[i] != ScalarScoring.classificar_risco_cliente(
+            _py(idade[i]), _py(meses[i]), _py(sinistros[i]))
+        for i in range(n_linhas)
+    )
+
+    mercado = 300.0
+    churn_vet = VectorizedScoring.calcular_churn_probability(dias, meses, mercado, premio)
+    churn_div = sum(
+        churn_vet[i] != ScalarScoring.calcular_churn_probability(
+            _py(dias[i]), _py(meses[i]), mercado, _py(premio[i]))
+        for i in range(n_linhas)
+    )
+
+    ids = rng.integers(1, n_linhas // 3 + 2, n_linhas)
+    datas = np.datetime64('2015-01-01') + rng.integers(0, 3650, n_linhas).astype('timedelta64[D]')
+    status = rng.choice(['ATIVO', 'SUSPENSO', 'CANCELADO'], n_linhas)
+    rows = [
+        {'id_cliente': int(ids[i]), 'valor_premio': _py(premio[i]),
+         'data_contratacao': str(datas[i]), 'status_contrato': str(status[i])}
+        for i in range(n_linhas)
+    ]
+    por_cliente: Dict[int, list] = {}
+    for row in rows:
+        por_cliente.setdefault(row['id_cliente'], []).append(row)
+
+    ids_unicos, ltv_vet = VectorizedScoring.calcular_ltv(
+        ids, premio, datas, status, data_referencia=referencia)
+    ltv_div = sum(
+        abs(ltv_vet[i] - ScalarScoring.calcular_ltv(
+            por_cliente[int(cid)], int(cid), data_referencia=referencia)) > 0.005
+        for i, cid in enumerate(ids_unicos)
+    )
+
+    return {
+        'linhas': n_linhas,
+        'fn_classificar_risco_cliente': int(risco_div),
+        'fn_calcular_churn_probability': int(churn_div),
+        'fn_calcular_ltv': int(ltv_div),
+        'equivalente': bool(risco_div == churn_div == ltv_div == 0)
+    }
+
+
+if __name__ == '__main__':
+    import json
+
+    resultado = verificar_equivalencia()
+    print("=== EQUIVALÊNCIA VETORIZADO x ESCALAR ===")
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
@@ -0,0 +1,258 @@
+# =========================================
+# Segmentation Engine - Tiers e RFM Vetorizados
+# =========================================
+# Porta para NumPy a segmentação por percentil de sp_segmentar_clientes
+# (sql/advanced_analytics.sql) e os quintis RFM de proc summary/proc rank
+# (sas/advanced_analytics.sas). Os ranks por grupo são obtidos com um único
+# argsort agrupado sobre as colunas, sem janelas linha a linha; a agregação
+# RFM por cliente é feita na mesma passada, indexando diretamente pelo
+# id_cliente, sem uma segunda ordenação das linhas.
+
+from typing import Dict, Any, Optional, Sequence, Tuple
+from datetime import date
+
+import numpy as np
+
+from column_utils import as_float, as_dates, group_starts
+
+SEGMENTOS = np.array(['VIP', 'PREMIUM', 'STANDARD', 'ECONOMICO'])
+
+RFM_SEGMENTOS = {
+    '11': 'Champions',
+    '12': 'Loyal_Customers',
+    '21': 'Potential_Loyalists',
+    '22': 'At_Risk',
+    '23': 'At_Risk'
+}
+
+# Tabelas de consulta indexadas por recency_score * 6 + monetary_score
+_RFM_LABELS = np.array(
+    [f"{r or ''}{m or ''}" for r in range(6) for m in range(6)], dtype=object
+)
+_RFM_SEGMENTO_LOOKUP = np.array(
+    [RFM_SEGMENTOS.get(label, 'Lost') for label in _RFM_LABELS], dtype=object
+)
+
+
+def _client_codes(ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Códigos densos de cliente para agregação com bincount.
+
+    Ids inteiros compactos (o caso das chaves substitutas) são usados
+    diretamente como índice, sem ordenar as linhas; os demais caem em
+    np.unique.
+    """
+    if ids.dtype.kind in 'iu' and len(ids):
+        menor, maior = int(ids.min()), int(ids.max())
+        if maior - menor < 4 * len(ids) + 1024:
+            offset = ids - menor
+            presentes = np.bincount(offset, minlength=maior - menor + 1) > 0
+            remap = np.cumsum(presentes) - 1
+            return np.flatnonzero(presentes).astype(ids.dtype) + menor, remap[offset]
+    ids_cliente, codes = np.unique(ids, return_inverse=True)
+    return ids_cliente, codes.reshape(-1)
+
+
+def _mean_rank_desc(values: np.ndarray) -> np.ndarray:
+    """
+    Ranks decrescentes com empates pela média (TIES=MEAN do proc rank).
+
+    Valores ausentes (NaN) recebem rank ausente.
+    """
+    ranks = np.full(len(values), np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) == 0:
+        return ranks
+
+    order = valid[np.argsort(-values[valid], kind='stable')]
+    sorted_values = values[order]
+    starts = group_starts(sorted_values)
+    ends = np.r_[starts[1:], len(sorted_values)]
+    # Rank médio de cada bloco de empates: média de (início+1 .. fim)
+    mean_ranks = (starts + 1 + ends) / 2.0
+    ranks[order] = np.repeat(mean_ranks, ends - starts)
+    return ranks
+
+
+class SegmentationEngine:
+    """Calcula tiers por percentil e scores RFM sobre colunas inteiras."""
+
+    def __init__(self, percentil_tier1: float = 0.75,
+                 percentil_tier2: float = 0.50,
+                 percentil_tier3: float = 0.25,
+                 data_referencia: Optional[date] = None):
+        """
+        Inicializa o engine com os mesmos parâmetros de sp_segmentar_clientes.
+
+        Args:
+            percentil_tier1: Fração do grupo classificada como VIP
+            percentil_tier2: Fração acumulada até PREMIUM
+            percentil_tier3: Fração acumulada até STANDARD
+            data_referencia: Data usada no lugar de GETDATE()/today()
+        """
+        for nome, valor in (('percentil_tier1', percentil_tier1),
+                            ('percentil_tier2', percentil_tier2),
+                            ('percentil_tier3', percentil_tier3)):
+            if not 0 <= valor <= 1:
+                raise ValueError(f"{nome} deve estar entre 0 e 1, recebido {valor}")
+
+        self.percentis = (percentil_tier1, percentil_tier2, percentil_tier3)
+        self.data_referencia = data_referencia or date.today()
+
+    def segmentar_clientes(self, columns: Dict[str, Sequence[Any]]) -> Dict[str, np.ndarray]:
+        """
+        Equivalente vetorizado de sp_segmentar_clientes.
+
+        Args:
+            columns: Colunas id_cliente, tipo_seguro, valor_premio,
+                     data_contratacao e status_contrato
+
+        Returns:
+            Colunas de saída ordenadas por tipo_seguro e rank_premium
+        """
+        return self._segmentar(columns, rfm=False)['tiers']
+
+    def calcular_rfm(self, columns: Dict[str, Sequence[Any]]) -> Dict[str, np.ndarray]:
+        """
+        Equivalente vetorizado das etapas 5.1 a 5.3 de advanced_analytics.sas.
+
+        Args:
+            columns: Colunas id_cliente, valor_premio e data_contratacao
+
+        Returns:
+            Colunas por cliente com recency, monetary, scores e segmento
+        """
+        return self._segmentar(columns, tiers=False)['rfm']
+
+    def run(self, columns: Dict[str, Sequence[Any]]) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Executa segmentação por tier e RFM em uma única passada pelas colunas.
+
+        Args:
+            columns: Colunas da carteira de contratos
+
+        Returns:
+            Dicionário com os resultados 'tiers' e 'rfm'
+        """
+        return self._segmentar(columns)
+
+    def _segmentar(self, columns: Dict[str, Sequence[Any]],
+                   tiers: bool = True, rfm: bool = True) -> Dict[str, Dict[str, np.ndarray]]:
+        """Converte as colunas uma vez e calcula tiers e/ou RFM sobre elas."""
+        ids = np.asarray(columns['id_cliente'])
+        premio = as_float(columns['valor_premio'])
+        contratacao = as_dates(columns['data_contratacao'])
+
+        resultado = {}
+        if tiers:
+            ativo = np.asarray(columns['status_contrato'], dtype=object) == 'ATIVO'
+            tipos = np.asarray(columns['tipo_seguro'], dtype=object)[ativo]
+            resultado['tiers'] = self._tiers(ids[ativo], tipos, premio[ativo], contratacao[ativo])
+        if rfm:
+            resultado['rfm'] = self._rfm(ids, premio, contratacao)
+        return resultado
+
+    def _tiers(self, ids: np.ndarray, tipos: np.ndarray, premio: np.ndarray,
+               contratacao: np.ndarray) -> Dict[str, np.ndarray]:
+        """Ranks e tiers por tipo_seguro sobre os contratos ativos."""
+        grupos, codes = np.unique(tipos.astype(str), return_inverse=True)
+
+        # Um único sort: grupo ascendente, prêmio descendente (NULLs por último)
+        order = np.lexsort((np.arange(len(premio)), -premio, codes))
+        sorted_codes = codes[order]
+        starts = group_starts(sorted_codes)
+        counts = np.diff(np.r_[starts, len(order)])
+
+        rank_premium = np.arange(len(order)) - np.repeat(starts, counts) + 1
+        total_grupo = np.repeat(counts, counts)
+
+        limites = [np.ceil(total_grupo * p) for p in self.percentis]
+        indice = np.select(
+            [rank_premium <= limites[0],
+             rank_premium <= limites[1],
+             rank_premium <= limites[2]],
+            [0, 1, 2],
+            default=3
+        )
+
+        referencia = np.datetime64(self.data_referencia, 'M')
+        contratacao = contratacao[order]
+        meses_cliente = np.where(
+            np.isnat(contratacao), np.nan,
+            (referencia - contratacao.astype('datetime64[M]')).astype(np.float64)
+        )
+
+        return {
+            'id_cliente': ids[order],
+            'tipo_seguro': grupos[sorted_codes],
+            'valor_premio': premio[order],
+            'meses_cliente': meses_cliente,
+            'rank_premium': rank_premium,
+            'segmento': SEGMENTOS[indice]
+        }
+
+    def _rfm(self, ids: np.ndarray, premio: np.ndarray,
+             contratacao: np.ndarray) -> Dict[str, np.ndarray]:
+        """Métricas, quintis e segmentos RFM por cliente, sem ordenar as linhas."""
+        ids_cliente, codes = _client_codes(ids)
+        nobs = len(ids_cliente)
+
+        # proc summary nway: min(recency) por cliente é a contratação mais
+        # recente; NaT é o menor int64 e nunca vence o máximo
+        nat = np.iinfo(np.int64).min
+        ultima = np.full(nobs, nat, dtype=np.int64)
+        np.maximum.at(ultima, codes, contratacao.astype(np.int64))
+        referencia = np.datetime64(self.data_referencia, 'D').astype(np.int64)
+        recency_agg = np.where(ultima == nat, np.nan, referencia - ultima.astype(np.float64))
+
+        # sum(monetary) ignora ausentes; cliente sem nenhum valor fica ausente
+        monetary = premio * 12
+        presentes = np.bincount(codes, weights=~np.isnan(monetary), minlength=nobs)
+        monetary_agg = np.bincount(codes, weights=np.nan_to_num(monetary), minlength=nobs)
+        monetary_agg = np.where(presentes > 0, monetary_agg, np.nan)
+
+        recency_rank = _mean_rank_desc(recency_agg)
+        monetary_rank = _mean_rank_desc(monetary_agg)
+
+        with np.errstate(invalid='ignore'):
+            recency_score = np.ceil(recency_rank / (nobs / 5)) if nobs else recency_rank
+            monetary_score = np.ceil(monetary_rank / (nobs / 5)) if nobs else monetary_rank
+
+        # Scores vão de 1 a 5; 0 representa score ausente
+        r = np.nan_to_num(recency_score, nan=0).astype(np.int64)
+        m = np.nan_to_num(monetary_score, nan=0).astype(np.int64)
+        codigo = r * 6 + m
+        rfm_segment = _RFM_LABELS[codigo]
+        segmento = _RFM_SEGMENTO_LOOKUP[codigo]
+
+        return {
+            'id_cliente': ids_cliente,
+            'recency': recency_agg,
+            'monetary': monetary_agg,
+            'recency_score': recency_score,
+            'monetary_score': monetary_score,
+            'rfm_segment': rfm_segment,
+            'segmento': segmento
+        }
+
+
+if __name__ == '__main__':
+    from collections import Counter
+
+    rng = np.random.default_rng(7)
+    n = 1000
+    carteira = {
+        'id_cliente': rng.integers(1, 400, n),
+        'tipo_seguro': rng.choice(['Auto', 'Residencial', 'Saúde', 'Vida'], n),
+        'valor_premio': np.round(rng.uniform(80, 900, n), 2),
+        'data_contratacao': np.datetime64('2019-01-01') + rng.integers(0, 2000, n).astype('timedelta64[D]'),
+        'status_contrato': rng.choice(['ATIVO', 'CANCELADO', 'SUSPENSO'], n, p=[0.8, 0.15, 0.05])
+    }
+
+    engine = SegmentationEngine(data_referencia=date(2025, 1, 1))
+    resultado = engine.run(carteira)
+
+    print("=== SEGMENTOS POR TIER ===")
+    print(dict(Counter(resultado['tiers']['segmento'].tolist())))
+    print("\n=== SEGMENTOS RFM ===")
+    print(dict(Counter(resultado['rfm']['segmento'].tolist())))
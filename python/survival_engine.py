@@ -0,0 +1,301 @@
+# =========================================
+# Survival Engine - Kaplan-Meier Vetorizado
+# =========================================
+# Porta para NumPy a análise de sobrevivência de sas/advanced_analytics.sas
+# (data step survival_data + proc lifetest method=km, strata tipo_seguro).
+#
+# A análise é feita em duas etapas:
+#   1. tabela de eventos: para cada (estrato, tempo), quantidade de eventos
+#      e de saídas do risco (eventos + censuras), obtida com uma única
+#      ordenação agrupada. Tabelas parciais de partições diferentes são
+#      combinadas somando as contagens, sem reler os dados;
+#   2. curvas: número em risco, sobrevivência, erro padrão de Greenwood e
+#      bandas de confiança (log-log, padrão do proc lifetest) calculados
+#      para todos os estratos de uma vez com somas cumulativas por grupo.
+
+from typing import List, Dict, Any, Optional, Sequence, Union
+from datetime import date
+
+import numpy as np
+from statistics import NormalDist
+
+from column_utils import as_dates, group_starts, round_half_away
+
+DIAS_POR_MES = 30.44
+
+EventTable = Dict[str, np.ndarray]
+
+
+def _aggregate(labels: np.ndarray, codes: np.ndarray, tempos: np.ndarray,
+               eventos: np.ndarray, saidas: np.ndarray) -> EventTable:
+    """Soma eventos e saídas por (estrato, tempo) com uma ordenação agrupada."""
+    order = np.lexsort((tempos, codes))
+    codes, tempos = codes[order], tempos[order]
+    if len(order) == 0:
+        starts = np.array([], dtype=np.int64)
+    else:
+        starts = np.flatnonzero(np.r_[True, (codes[1:] != codes[:-1]) | (tempos[1:] != tempos[:-1])])
+    return {
+        'strata': labels,
+        'stratum': codes[starts],
+        'time': tempos[starts],
+        'events': np.add.reduceat(eventos[order], starts) if len(starts) else np.array([], dtype=np.int64),
+        'removed': np.add.reduceat(saidas[order], starts) if len(starts) else np.array([], dtype=np.int64)
+    }
+
+
+def _grouped_cumsum(values: np.ndarray, codes: np.ndarray, starts: np.ndarray,
+                    n_groups: int) -> np.ndarray:
+    """Soma cumulativa reiniciada no início de cada grupo (códigos ordenados)."""
+    total = np.cumsum(values)
+    offset = np.zeros(n_groups)
+    offset[codes[starts]] = total[starts] - values[starts]
+    return total - offset[codes]
+
+
+class SurvivalEngine:
+    """Curvas de Kaplan-Meier por estrato a partir da carteira de contratos."""
+
+    def __init__(self, data_referencia: Optional[date] = None,
+                 confidence: float = 0.95,
+                 conf_type: str = 'loglog'):
+        """
+        Inicializa o engine.
+
+        Args:
+            data_referencia: Data usada no lugar de today() para contratos censurados
+            confidence: Nível de confiança das bandas
+            conf_type: Transformação das bandas ('loglog' ou 'linear')
+        """
+        if conf_type not in ('loglog', 'linear'):
+            raise ValueError(f"conf_type inválido: {conf_type!r}")
+        self.data_referencia = data_referencia or date.today()
+        self.confidence = confidence
+        self.conf_type = conf_type
+
+    def preparar_dados(self, columns: Dict[str, Sequence[Any]]) -> Dict[str, np.ndarray]:
+        """
+        Equivalente ao data step survival_data.
+
+        evento = status 'CANCELADO'; tempo_dias vai da contratação ao
+        cancelamento (eventos) ou à data de referência (censuras);
+        tempo_meses = round(tempo_dias / 30.44). Datas ausentes geram
+        tempo ausente (NaN), excluído das curvas como no proc lifetest.
+
+        Args:
+            columns: Colunas data_contratacao, data_cancelamento e status_contrato
+
+        Returns:
+            Dicionário com evento, tempo_dias e tempo_meses
+        """
+        contratacao = as_dates(columns['data_contratacao'])
+        cancelamento = as_dates(columns['data_cancelamento'])
+        status = np.asarray(columns['status_contrato'], dtype=object)
+
+        evento = (status == 'CANCELADO')
+        fim = np.where(evento, cancelamento, np.datetime64(self.data_referencia, 'D'))
+        dias = (fim - contratacao).astype('timedelta64[D]')
+        tempo_dias = np.where(np.isnat(dias), np.nan, dias.astype(np.int64).astype(np.float64))
+
+        return {
+            'evento': evento.astype(np.int64),
+            'tempo_dias': tempo_dias,
+            # round() do SAS arredonda o meio para longe do zero
+            'tempo_meses': round_half_away(tempo_dias / DIAS_POR_MES, 0)
+        }
+
+    def tabela_eventos(self, columns: Dict[str, Sequence[Any]],
+                       strata_column: Optional[str] = 'tipo_seguro',
+                       unidade: str = 'tempo_meses') -> EventTable:
+        """
+        Calcula a tabela parcial de eventos de uma partição dos dados.
+
+        Args:
+            columns: Colunas da partição
+            strata_column: Coluna de estratos (None = curva única)
+            unidade: 'tempo_meses' ou 'tempo_dias'
+
+        Returns:
+            Tabela com strata, stratum, time, events e removed
+        """
+        dados = self.preparar_dados(columns)
+        tempos = dados[unidade]
+
+        if strata_column:
+            estratos = np.asarray(columns[strata_column], dtype=object)
+            # Estrato ausente é excluído, como no proc lifetest sem MISSING
+            presente = np.array([v is not None for v in estratos], dtype=bool)
+        else:
+            estratos = np.full(len(tempos), 'TODOS', dtype=object)
+            presente = np.ones(len(tempos), dtype=bool)
+
+        validos = presente & ~np.isnan(tempos)
+        labels, codes = np.unique(estratos[validos].astype(str), return_inverse=True)
+        return _aggregate(
+            labels.astype(object), codes.reshape(-1), tempos[validos],
+            dados['evento'][validos], np.ones(int(validos.sum()), dtype=np.int64)
+        )
+
+    @staticmethod
+    def combinar_tabelas(*tabelas: EventTable) -> EventTable:
+        """
+        Combina tabelas parciais de eventos de partições diferentes.
+
+        O número em risco é derivado das saídas acumuladas, por isso a
+        combinação é exata e independe da ordem das partições.
+        """
+        labels = np.unique(np.concatenate(
+            [np.asarray(t['strata'], dtype=object) for t in tabelas] or [np.array([], dtype=object)]
+        ).astype(str)).astype(object)
+        codes, tempos, eventos, saidas = [], [], [], []
+        for t in tabelas:
+            remap = np.searchsorted(labels, np.asarray(t['strata'], dtype=object).astype(str))
+            codes.append(remap[t['stratum']].astype(np.int64))
+            tempos.append(t['time'])
+            eventos.append(t['events'])
+            saidas.append(t['removed'])
+        return _aggregate(
+            labels,
+            np.concatenate(codes) if codes else np.array([], dtype=np.int64),
+            np.concatenate(tempos) if tempos else np.array([]),
+            np.concatenate(eventos) if eventos else np.array([], dtype=np.int64),
+            np.concatenate(saidas) if saidas else np.array([], dtype=np.int64)
+        )
+
+    def kaplan_meier(self, tabela: EventTable) -> Dict[str, Dict[str, Any]]:
+        """
+        Estima as curvas de Kaplan-Meier de todos os estratos.
+
+        Args:
+            tabela: Tabela de eventos (parcial combinada ou completa)
+
+        Returns:
+            Dicionário {estrato: curva e resumo}
+        """
+        labels = tabela['strata']
+        codes = tabela['stratum']
+        tempos = tabela['time']
+        d = tabela['events'].astype(np.float64)
+        saidas = tabela['removed'].astype(np.float64)
+        n_groups = len(labels)
+        if len(codes) == 0:
+            return {}
+
+        starts = group_starts(codes)
+        ends = np.r_[starts[1:], len(codes)]
+
+        totais = np.bincount(codes, weights=saidas, minlength=n_groups)
+        em_risco = totais[codes] - (_grouped_cumsum(saidas, codes, starts, n_groups) - saidas)
+
+        # Produto limite via soma de logs; d == n zera a curva daí em diante
+        zera = (d > 0) & (d == em_risco)
+        with np.errstate(divide='ignore'):
+            log_termos = np.where(zera, 0.0, np.log1p(-d / em_risco))
+        zerada = _grouped_cumsum(zera.astype(np.float64), codes, starts, n_groups) > 0
+        sobrevivencia = np.where(zerada, 0.0, np.exp(_grouped_cumsum(log_termos, codes, starts, n_groups)))
+
+        # Greenwood: Var(S) = S^2 * soma d / (n (n - d))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            termos = np.where(zera | (d == 0), 0.0, d / (em_risco * (em_risco - d)))
+        greenwood = _grouped_cumsum(termos, codes, starts, n_groups)
+        erro_padrao = sobrevivencia * np.sqrt(greenwood)
+
+        z = NormalDist().inv_cdf((1 + self.confidence) / 2)
+        if self.conf_type == 'linear':
+            inferior = np.clip(sobrevivencia - z * erro_padrao, 0.0, 1.0)
+            superior = np.clip(sobrevivencia + z * erro_padrao, 0.0, 1.0)
+        else:
+            interior = (sobrevivencia > 0) & (sobrevivencia < 1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                se_theta = np.where(interior, np.sqrt(greenwood) / np.abs(np.log(sobrevivencia)), 0.0)
+            inferior = np.where(interior, sobrevivencia ** np.exp(z * se_theta), sobrevivencia)
+            superior = np.where(interior, sobrevivencia ** np.exp(-z * se_theta), sobrevivencia)
+
+        curvas = {}
+        for grupo, (inicio, fim) in enumerate(zip(starts, ends)):
+            fatia = slice(inicio, fim)
+            s = sobrevivencia[fatia]
+            t = tempos[fatia]
+            curvas[str(labels[codes[inicio]])] = {
+                'time': t,
+                'at_risk': em_risco[fatia].astype(np.int64),
+                'events': tabela['events'][fatia],
+                'censored': (tabela['removed'][fatia] - tabela['events'][fatia]),
+                'survival': s,
+                'std_error': erro_padrao[fatia],
+                'lower': inferior[fatia],
+                'upper': superior[fatia],
+                'total': int(totais[codes[inicio]]),
+                'total_events': int(tabela['events'][fatia].sum()),
+                'median': self._percentil_50(t, s),
+                'median_lower': self._primeiro_abaixo(t, inferior[fatia]),
+                'median_upper': self._primeiro_abaixo(t, superior[fatia])
+            }
+        return curvas
+
+    def run(self, particoes: Union[Dict[str, Sequence[Any]], List[Dict[str, Sequence[Any]]]],
+            strata_column: Optional[str] = 'tipo_seguro',
+            unidade: str = 'tempo_meses') -> Dict[str, Dict[str, Any]]:
+        """
+        Executa a análise completa (equivalente ao proc lifetest com strata).
+
+        Args:
+            particoes: Colunas da carteira ou lista de partições
+            strata_column: Coluna de estratos (None = curva única)
+            unidade: 'tempo_meses' ou 'tempo_dias'
+
+        Returns:
+            Curvas de Kaplan-Meier por estrato
+        """
+        if isinstance(particoes, dict):
+            particoes = [particoes]
+        tabelas = [self.tabela_eventos(p, strata_column, unidade) for p in particoes]
+        return self.kaplan_meier(self.combinar_tabelas(*tabelas))
+
+    @staticmethod
+    def _primeiro_abaixo(tempos: np.ndarray, curva: np.ndarray) -> Optional[float]:
+        """Primeiro tempo em que a curva fica em 0.5 ou abaixo (None se não ocorre)."""
+        abaixo = np.flatnonzero(curva <= 0.5)
+        return float(tempos[abaixo[0]]) if len(abaixo) else None
+
+    @staticmethod
+    def _percentil_50(tempos: np.ndarray, sobrevivencia: np.ndarray) -> Optional[float]:
+        """
+        Mediana de sobrevivência como no proc lifetest.
+
+        Se a curva fica exatamente em 0.5 em um patamar, a mediana é o ponto
+        médio entre o início do patamar e o próximo tempo em que ela cai.
+        """
+        # Tolerância: a curva vem de exp(soma de logs)
+        abaixo = np.flatnonzero(sobrevivencia <= 0.5 + 1e-12)
+        if not len(abaixo):
+            return None
+        primeiro = abaixo[0]
+        if sobrevivencia[primeiro] >= 0.5 - 1e-12:
+            seguinte = np.flatnonzero(sobrevivencia < 0.5 - 1e-12)
+            if len(seguinte):
+                return float((tempos[primeiro] + tempos[seguinte[0]]) / 2)
+        return float(tempos[primeiro])
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(11)
+    n = 5000
+    contratacao = np.datetime64('2020-01-01') + rng.integers(0, 1500, n).astype('timedelta64[D]')
+    duracao = rng.exponential(900, n).astype(np.int64).astype('timedelta64[D]')
+    cancelado = contratacao + duracao < np.datetime64('2025-01-01')
+    carteira = {
+        'tipo_seguro': rng.choice(['Auto', 'Residencial', 'Saúde'], n),
+        'data_contratacao': contratacao,
+        'data_cancelamento': np.where(cancelado, contratacao + duracao, np.datetime64('NaT')),
+        'status_contrato': np.where(cancelado, 'CANCELADO', 'ATIVO')
+    }
+
+    engine = SurvivalEngine(data_referencia=date(2025, 1, 1))
+    particoes = [{k: v[i::4] for k, v in carteira.items()} for i in range(4)]
+    curvas = engine.run(particoes)
+
+    print("=== MEDIANA DE SOBREVIVÊNCIA (MESES) POR TIPO DE SEGURO ===")
+    for estrato, curva in curvas.items():
+        print(f"{estrato}: n={curva['total']} eventos={curva['total_events']} "
+              f"mediana={curva['median']} IC=[{curva['median_lower']}, {curva['median_upper']}]")
@@ -0,0 +1,57 @@
+# =========================================
+# Testes - Foreign Key Discovery
+# =========================================
+# Executar a partir de python/:  python -m unittest test_fk_discovery
+
+import unittest
+
+from dictionary_simulator import data_dictionary
+from fk_discovery import ForeignKeyDiscovery
+
+
+def _edges(foreign_keys):
+    return {(fk['table'], fk['column'], fk['references_table'], fk['references_column'])
+            for fk in foreign_keys}
+
+
+class TestForeignKeyDiscovery(unittest.TestCase):
+
+    def setUp(self):
+        # Mesmos dados do __main__ de fk_discovery
+        self.tables = {
+            'clientes_seguros': {
+                'id_cliente': list(range(1, 501)),
+                'cpf': [f"{i:011d}" for i in range(1, 501)]
+            },
+            'tb_erros_validacao': {
+                'id_erro': list(range(1, 201)),
+                'id_cliente': [(i * 7) % 500 + 1 for i in range(200)]
+            }
+        }
+
+    def test_demo_sem_chave_substituta_como_fk(self):
+        edges = _edges(ForeignKeyDiscovery(data_dictionary).discover(self.tables))
+        self.assertIn(('tb_erros_validacao', 'id_cliente', 'clientes_seguros', 'id_cliente'), edges)
+        self.assertFalse([e for e in edges if e[1] == 'id_erro'])
+
+    def test_pk_referencia_pk_de_mesmo_nome(self):
+        self.tables['clientes_detalhe'] = {'id_cliente': list(range(1, 301))}
+        edges = _edges(ForeignKeyDiscovery(data_dictionary).discover(self.tables))
+        self.assertIn(('clientes_detalhe', 'id_cliente', 'clientes_seguros', 'id_cliente'), edges)
+
+    def test_coluna_com_poucos_distintos(self):
+        self.tables['tb_erros_validacao']['severidade'] = [1, 2, 3] * 60 + [1] * 20
+        edges = _edges(ForeignKeyDiscovery(data_dictionary).discover(self.tables))
+        self.assertFalse([e for e in edges if e[1] == 'severidade'])
+
+    def test_tipo_desconhecido_incompativel(self):
+        dictionary = data_dictionary + [
+            {'tabela': 'tb_flags', 'coluna': 'codigo', 'tipo': 'BIT', 'chave_primaria': False}
+        ]
+        self.tables['tb_flags'] = {'codigo': [(i * 3) % 500 + 1 for i in range(100)]}
+        edges = _edges(ForeignKeyDiscovery(dictionary).discover(self.tables))
+        self.assertFalse([e for e in edges if e[0] == 'tb_flags'])
+
+
+if __name__ == '__main__':
+    unittest.main()
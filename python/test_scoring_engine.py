@@ -0,0 +1,192 @@
+# =========================================
+# Testes - Scoring Engine
+# =========================================
+# Valores esperados calculados à mão a partir das UDFs de
+# sql/advanced_analytics.sql, seguindo a semântica do T-SQL: CASE com
+# NULL cai no ELSE, aritmética com NULL resulta em NULL, SUM ignora NULLs,
+# DATEDIFF(YEAR) conta fronteiras de ano civil e DECIMAL(p,2) arredonda
+# o meio para longe do zero.
+#
+# Executar a partir de python/:  python -m unittest test_scoring_engine
+
+import unittest
+from datetime import date
+
+import numpy as np
+
+from scoring_engine import VectorizedScoring
+from column_utils import as_float, round_half_away
+
+NULL = None
+
+
+def _risco(idade, meses, sinistros):
+    return str(VectorizedScoring.classificar_risco_cliente(
+        np.array([idade], dtype=object), np.array([meses], dtype=object),
+        np.array([sinistros], dtype=object))[0])
+
+
+def _churn(dias, meses, mercado, cliente):
+    return float(VectorizedScoring.calcular_churn_probability(
+        [dias], [meses], mercado, [cliente])[0])
+
+
+class TestClassificarRisco(unittest.TestCase):
+    """fn_classificar_risco_cliente"""
+
+    def test_faixas_de_idade(self):
+        casos = [
+            # (idade, meses, sinistros) -> score -> classe
+            ((24, 0, 0), 'MEDIO'),       # 30
+            ((25, 0, 0), 'MEDIO'),       # 20 (BETWEEN inclui 25)
+            ((35, 0, 0), 'MEDIO'),       # 20 (BETWEEN inclui 35)
+            ((36, 0, 0), 'BAIXO'),       # 10
+            ((50, 0, 0), 'BAIXO'),       # 10
+            ((51, 0, 1), 'BAIXO'),       # 0 + 15 (51 a 70 cai no ELSE)
+            ((70, 0, 2), 'MEDIO'),       # 0 + 30
+            ((71, 0, 2), 'ALTO'),        # 25 + 30
+        ]
+        for args, esperado in casos:
+            with self.subTest(args=args):
+                self.assertEqual(_risco(*args), esperado)
+
+    def test_limites_de_score(self):
+        casos = [
+            ((20, 0, 2), 'MUITO_ALTO'),  # 30 + 30 = 60
+            ((20, 37, 2), 'ALTO'),       # 30 + 30 - 10 = 50
+            ((24, 61, 2), 'ALTO'),       # 30 + 30 - 20 = 40
+            ((24, 37, 0), 'MEDIO'),      # 30 - 10 = 20
+            ((24, 61, 0), 'BAIXO'),      # 30 - 20 = 10
+            ((36, 61, 0), 'BAIXO'),      # 10 - 20 = -10
+        ]
+        for args, esperado in casos:
+            with self.subTest(args=args):
+                self.assertEqual(_risco(*args), esperado)
+
+    def test_tempo_de_cliente(self):
+        # > 60 desconta 20, > 36 desconta 10; 36 e 60 caem na faixa de baixo
+        self.assertEqual(_risco(20, 36, 2), 'MUITO_ALTO')  # 60
+        self.assertEqual(_risco(20, 60, 2), 'ALTO')        # 50
+
+    def test_nulos(self):
+        # idade NULL: CASE cai no ELSE 0
+        self.assertEqual(_risco(NULL, 0, 4), 'MUITO_ALTO')  # 60
+        # meses NULL: CASE cai no ELSE 0, sem desconto
+        self.assertEqual(_risco(20, NULL, 2), 'MUITO_ALTO')
+        # sinistros NULL: o score vira NULL e o CASE final cai no ELSE
+        self.assertEqual(_risco(20, 0, NULL), 'BAIXO')
+        self.assertEqual(_risco(NULL, NULL, NULL), 'BAIXO')
+
+
+class TestChurnProbability(unittest.TestCase):
+    """fn_calcular_churn_probability"""
+
+    def test_dias_sem_atividade(self):
+        casos = [(NULL, 0), (30, 0), (31, 10), (90, 10), (91, 25), (180, 25), (181, 45)]
+        for dias, esperado in casos:
+            with self.subTest(dias=dias):
+                self.assertEqual(_churn(dias, 24, 100.0, 100.0), esperado)
+
+    def test_meses_cliente(self):
+        casos = [(NULL, 0), (0, 30), (5, 30), (6, 15), (11, 15), (12, 0)]
+        for meses, esperado in casos:
+            with self.subTest(meses=meses):
+                self.assertEqual(_churn(0, meses, 100.0, 100.0), esperado)
+
+    def test_desvio_de_preco(self):
+        casos = [
+            (115.00, 0),    # desvio 15.00
+            (115.01, 10),   # desvio 15.01
+            (130.00, 10),   # desvio 30.00
+            (130.01, 20),   # desvio 30.01
+            (69.99, 20),    # desvio 30.01 abaixo do mercado
+        ]
+        for cliente, esperado in casos:
+            with self.subTest(cliente=cliente):
+                self.assertEqual(_churn(0, 24, 100.0, cliente), esperado)
+
+    def test_desvio_arredondado_para_decimal(self):
+        # 45.01 / 300 * 100 = 15.0033... vira 15.00 em DECIMAL(5,2): não passa de 15
+        self.assertEqual(_churn(0, 24, 300.0, 345.01), 0)
+        # 15.005 arredonda para 15.01 (meio para longe do zero)
+        self.assertEqual(_churn(0, 24, 200.0, 230.01), 10)
+
+    def test_nulos_no_desvio(self):
+        # Prêmio do cliente NULL: desvio NULL, CASE cai no ELSE
+        self.assertEqual(_churn(0, 24, 100.0, NULL), 0)
+        # NULLIF(mercado, 1) anula o divisor
+        self.assertEqual(_churn(0, 24, 1.0, 500.0), 0)
+
+    def test_soma_dos_fatores(self):
+        self.assertEqual(_churn(181, 5, 100.0, 200.0), 95)   # 45 + 30 + 20
+        self.assertEqual(_churn(91, 11, 100.0, 120.0), 50)   # 25 + 15 + 10
+
+
+class TestCalcularLtv(unittest.TestCase):
+    """fn_calcular_ltv"""
+
+    referencia = date(2025, 6, 30)
+
+    def _ltv(self, linhas):
+        ids, premio, datas, status = zip(*linhas)
+        ids_unicos, ltv = VectorizedScoring.calcular_ltv(
+            list(ids), list(premio), list(datas), list(status),
+            data_referencia=self.referencia)
+        return {int(i): float(v) for i, v in zip(ids_unicos, ltv)}
+
+    def test_desconto_por_fronteira_de_ano(self):
+        resultado = self._ltv([
+            # 2025: DATEDIFF = 0 -> 100 * 12 = 1200
+            (1, 100.0, '2025-01-01', 'ATIVO'),
+            # 2024-12-31: DATEDIFF(YEAR) = 1 apesar de ser só meio ano -> 1200 / 1.1
+            (1, 100.0, '2024-12-31', 'SUSPENSO'),
+        ])
+        # 1200 + 1090.9090... = 2290.909... -> DECIMAL(10,2)
+        self.assertEqual(resultado[1], 2290.91)
+
+    def test_status_fora_do_filtro(self):
+        resultado = self._ltv([
+            (1, 100.0, '2025-01-01', 'ATIVO'),
+            (1, 999.0, '2025-01-01', 'CANCELADO'),
+            (2, 500.0, '2025-01-01', 'CANCELADO'),
+        ])
+        self.assertEqual(resultado[1], 1200.0)
+        # Nenhuma linha no filtro: SUM é NULL e ISNULL devolve 0
+        self.assertEqual(resultado[2], 0.0)
+
+    def test_premio_nulo(self):
+        resultado = self._ltv([
+            (1, NULL, '2025-01-01', 'ATIVO'),
+            (1, 50.0, '2023-03-15', 'ATIVO'),   # 600 / 1.1^2 = 495.867...
+            (2, NULL, '2025-01-01', 'ATIVO'),
+        ])
+        # SUM ignora o NULL
+        self.assertEqual(resultado[1], 495.87)
+        # Só NULLs: SUM é NULL e ISNULL devolve 0
+        self.assertEqual(resultado[2], 0.0)
+
+    def test_data_nula(self):
+        resultado = self._ltv([
+            (1, 100.0, NULL, 'ATIVO'),
+            (1, 100.0, '2025-02-01', 'ATIVO'),
+        ])
+        self.assertEqual(resultado[1], 1200.0)
+
+
+class TestConversoes(unittest.TestCase):
+
+    def test_array_object_com_none(self):
+        valores = as_float(np.array([1, None, 2.5], dtype=object))
+        self.assertEqual(valores[0], 1.0)
+        self.assertTrue(np.isnan(valores[1]))
+        self.assertEqual(valores[2], 2.5)
+
+    def test_arredondamento_decimal(self):
+        # CAST(x AS DECIMAL(10,2)): meio para longe do zero, inclusive em 15.005
+        valores = round_half_away(np.array([15.005, -2.345, 0.004, 7.5]))
+        np.testing.assert_array_equal(valores, [15.01, -2.35, 0.0, 7.5])
+        self.assertEqual(round_half_away(np.array([2.5, -0.5]), 0).tolist(), [3.0, -1.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
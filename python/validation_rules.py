@@ -0,0 +1,421 @@
+# =========================================
+# Validation Rules - Motor de Regras Declarativas
+# =========================================
+# Carrega a mesma tabela de regras de sas/validation_framework.sas
+# (tabela, coluna, tipo_regra, descricao, parametro1, parametro2) a partir
+# de um CSV ou de um banco SQLite, compila cada regra uma única vez
+# (regex pré-compilada, domínio como conjunto) e avalia as regras como
+# passadas vetorizadas sobre lotes de linhas.
+#
+# Tipos de regra de coluna: TAMANHO, INTERVALO, MINIMO, DOMINIO, FORMATO, NULO.
+# Tipos de regra entre campos (seção 3.3 do framework SAS):
+#   REQUER      - se coluna = parametro1, a coluna parametro2 é obrigatória
+#   PROIBE      - se coluna = parametro1, a coluna parametro2 deve estar vazia
+#   MAIOR_IGUAL - coluna deve ser >= a coluna parametro1
+#
+# Valores ausentes (None, NaN ou texto em branco, como missing() no SAS)
+# só disparam as regras NULO e REQUER; nas demais a comparação com nulo
+# é falsa, como nas consultas do relatório consolidado de erros.
+
+import re
+import csv
+import sqlite3
+from itertools import islice
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterable, Sequence, Callable
+
+import numpy as np
+
+RULE_FIELDS = ('tabela', 'coluna', 'tipo_regra', 'descricao', 'parametro1', 'parametro2')
+COLUMN_RULE_TYPES = ('TAMANHO', 'INTERVALO', 'MINIMO', 'DOMINIO', 'FORMATO', 'NULO')
+CROSS_FIELD_RULE_TYPES = ('REQUER', 'PROIBE', 'MAIOR_IGUAL')
+
+# Regras de validation_framework.sas (seções 2.1 e 3.3)
+DEFAULT_RULES = [
+    {'tabela': 'clientes_seguros', 'coluna': 'cpf', 'tipo_regra': 'TAMANHO',
+     'descricao': 'CPF deve ter exatamente 11 dígitos', 'parametro1': '11', 'parametro2': None},
+    {'tabela': 'clientes_seguros', 'coluna': 'idade', 'tipo_regra': 'INTERVALO',
+     'descricao': 'Idade deve estar entre 18 e 120', 'parametro1': '18', 'parametro2': '120'},
+    {'tabela': 'clientes_seguros', 'coluna': 'valor_premio', 'tipo_regra': 'MINIMO',
+     'descricao': 'Premio deve ser positivo', 'parametro1': '0.01', 'parametro2': None},
+    {'tabela': 'clientes_seguros', 'coluna': 'status_contrato', 'tipo_regra': 'DOMINIO',
+     'descricao': 'Status deve ser ATIVO ou CANCELADO', 'parametro1': 'ATIVO',
+     'parametro2': 'CANCELADO'},
+    {'tabela': 'clientes_seguros', 'coluna': 'email', 'tipo_regra': 'FORMATO',
+     'descricao': 'Email deve ser válido', 'parametro1': r'^[^\s@]+@[^\s@]+\.[^\s@]+$',
+     'parametro2': None},
+    {'tabela': 'clientes_seguros', 'coluna': 'data_contratacao', 'tipo_regra': 'NULO',
+     'descricao': 'Campo não pode ser nulo', 'parametro1': None, 'parametro2': None},
+    {'tabela': 'clientes_seguros', 'coluna': 'valor_cobertura', 'tipo_regra': 'MAIOR_IGUAL',
+     'descricao': 'Cobertura menor que premio', 'parametro1': 'valor_premio', 'parametro2': None},
+    {'tabela': 'clientes_seguros', 'coluna': 'status_contrato', 'tipo_regra': 'REQUER',
+     'descricao': 'Cliente ativo sem data de contratação', 'parametro1': 'ATIVO',
+     'parametro2': 'data_contratacao'},
+    {'tabela': 'clientes_seguros', 'coluna': 'status_contrato', 'tipo_regra': 'REQUER',
+     'descricao': 'Cliente cancelado sem data de cancelamento', 'parametro1': 'CANCELADO',
+     'parametro2': 'data_cancelamento'},
+    {'tabela': 'clientes_seguros', 'coluna': 'status_contrato', 'tipo_regra': 'PROIBE',
+     'descricao': 'Cliente ativo com data de cancelamento', 'parametro1': 'ATIVO',
+     'parametro2': 'data_cancelamento'}
+]
+
+
+def _clean(value: Any) -> Optional[str]:
+    """Parâmetro como texto (None para vazio)."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def load_rules_csv(path: str, delimiter: str = ',') -> List[Dict[str, Any]]:
+    """
+    Lê a tabela de regras de um arquivo CSV com cabeçalho.
+
+    Args:
+        path: Caminho do CSV (colunas de RULE_FIELDS)
+        delimiter: Separador de campos
+
+    Returns:
+        Lista de regras
+    """
+    with open(path, encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f, delimiter=delimiter)
+        return [{field: _clean(row.get(field)) for field in RULE_FIELDS} for row in reader]
+
+
+def load_rules_sqlite(conn: sqlite3.Connection,
+                      table: str = 'regras_validacao') -> List[Dict[str, Any]]:
+    """
+    Lê a tabela de regras de um banco SQLite.
+
+    Args:
+        conn: Conexão sqlite3
+        table: Nome da tabela de regras
+
+    Returns:
+        Lista de regras
+    """
+    cursor = conn.execute(f'SELECT {", ".join(RULE_FIELDS)} FROM "{table}"')
+    return [
+        {field: _clean(value) for field, value in zip(RULE_FIELDS, row)}
+        for row in cursor.fetchall()
+    ]
+
+
+class _Batch:
+    """Visões de um lote de colunas, convertidas sob demanda e reaproveitadas entre regras."""
+
+    def __init__(self, columns: Dict[str, Sequence[Any]], size: int):
+        self.columns = columns
+        self.size = size
+        self._cache: Dict[Any, np.ndarray] = {}
+
+    def _raw(self, name: str) -> np.ndarray:
+        values = self.columns.get(name)
+        if values is None:
+            return np.full(self.size, None, dtype=object)
+        return np.asarray(values, dtype=object)
+
+    def missing(self, name: str) -> np.ndarray:
+        """Máscara de valores ausentes (None, NaN ou texto em branco)."""
+        key = ('missing', name)
+        if key not in self._cache:
+            self._cache[key] = np.fromiter(
+                (v is None or (isinstance(v, float) and v != v)
+                 or (isinstance(v, str) and not v.strip())
+                 for v in self._raw(name)),
+                dtype=bool, count=self.size
+            )
+        return self._cache[key]
+
+    def text(self, name: str) -> np.ndarray:
+        """Coluna como array de texto sem espaços nas pontas ('' para ausentes)."""
+        key = ('text', name)
+        if key not in self._cache:
+            missing = self.missing(name)
+            self._cache[key] = np.array(
+                ['' if m else str(v).strip() for v, m in zip(self._raw(name), missing)],
+                dtype=str
+            ).reshape(self.size)
+        return self._cache[key]
+
+    def numeric(self, name: str) -> np.ndarray:
+        """Coluna como float64 (NaN para ausentes e valores não numéricos)."""
+        key = ('numeric', name)
+        if key not in self._cache:
+            raw = self._raw(name)
+            present = ~self.missing(name)
+            values = np.full(self.size, np.nan)
+            try:
+                values[present] = raw[present].astype(np.float64)
+            except (TypeError, ValueError):
+                # Lote com texto não numérico: converte valor a valor
+                for i in np.flatnonzero(present):
+                    try:
+                        values[i] = float(raw[i])
+                    except (TypeError, ValueError):
+                        pass
+            self._cache[key] = values
+        return self._cache[key]
+
+
+def _domain(rule: Dict[str, Any]) -> List[str]:
+    """Valores do domínio: parametro1 e parametro2, separados por '|' ou ','."""
+    values = []
+    for param in (rule.get('parametro1'), rule.get('parametro2')):
+        if param:
+            values.extend(v.strip() for v in re.split(r'[|,]', param) if v.strip())
+    return values
+
+
+def compile_rule(rule: Dict[str, Any]) -> Callable[[_Batch], np.ndarray]:
+    """
+    Compila uma regra em uma função vetorizada.
+
+    Args:
+        rule: Regra no formato de RULE_FIELDS
+
+    Returns:
+        Função que recebe um lote e devolve a máscara das linhas que violam a regra
+    """
+    tipo = (rule.get('tipo_regra') or '').upper()
+    coluna = rule.get('coluna')
+    param1 = _clean(rule.get('parametro1'))
+    param2 = _clean(rule.get('parametro2'))
+
+    if tipo == 'NULO':
+        return lambda batch: batch.missing(coluna)
+
+    if tipo == 'TAMANHO':
+        size = int(float(param1))
+        return lambda batch: ~batch.missing(coluna) & (np.char.str_len(batch.text(coluna)) != size)
+
+    if tipo == 'INTERVALO':
+        low, high = float(param1), float(param2)
+
+        def check_interval(batch: _Batch) -> np.ndarray:
+            values = batch.numeric(coluna)
+            return (values < low) | (values > high)
+        return check_interval
+
+    if tipo == 'MINIMO':
+        minimum = float(param1)
+
+        # Mesmo critério do framework SAS: falha quando valor <= parametro1
+        def check_minimum(batch: _Batch) -> np.ndarray:
+            return batch.numeric(coluna) <= minimum
+        return check_minimum
+
+    if tipo == 'DOMINIO':
+        allowed = np.array(sorted(set(_domain(rule))), dtype=str)
+        if not len(allowed):
+            raise ValueError(f"Regra DOMINIO sem valores para '{coluna}'")
+        return lambda batch: ~batch.missing(coluna) & ~np.isin(batch.text(coluna), allowed)
+
+    if tipo == 'FORMATO':
+        pattern = re.compile(param1)
+
+        def check_format(batch: _Batch) -> np.ndarray:
+            # O regex roda uma vez por valor distinto do lote
+            unique, inverse = np.unique(batch.text(coluna), return_inverse=True)
+            matched = np.fromiter((pattern.search(v) is not None for v in unique),
+                                  dtype=bool, count=len(unique))
+            return ~batch.missing(coluna) & ~matched[inverse.reshape(-1)]
+        return check_format
+
+    if tipo in ('REQUER', 'PROIBE'):
+        if not param2:
+            raise ValueError(f"Regra {tipo} exige a coluna dependente em parametro2")
+        condition = np.array(sorted(set(_domain({'parametro1': param1}))), dtype=str)
+
+        def check_dependency(batch: _Batch) -> np.ndarray:
+            applies = ~batch.missing(coluna) & np.isin(batch.text(coluna), condition)
+            dependent_missing = batch.missing(param2)
+            return applies & (dependent_missing if tipo == 'REQUER' else ~dependent_missing)
+        return check_dependency
+
+    if tipo == 'MAIOR_IGUAL':
+        if not param1:
+            raise ValueError("Regra MAIOR_IGUAL exige a coluna de comparação em parametro1")
+        return lambda batch: batch.numeric(coluna) < batch.numeric(param1)
+
+    raise ValueError(f"Tipo de regra não suportado: {rule.get('tipo_regra')!r}")
+
+
+class RuleEngine:
+    """Avalia uma tabela de regras declarativas sobre lotes de linhas."""
+
+    def __init__(self, rules: Optional[List[Dict[str, Any]]] = None):
+        """
+        Compila as regras uma única vez.
+
+        Args:
+            rules: Tabela de regras (padrão: DEFAULT_RULES)
+        """
+        self.rules = []
+        for rule_id, rule in enumerate(rules if rules is not None else DEFAULT_RULES, 1):
+            tipo = (rule.get('tipo_regra') or '').upper()
+            columns = [rule.get('coluna')]
+            if tipo in ('REQUER', 'PROIBE'):
+                columns.append(_clean(rule.get('parametro2')))
+            elif tipo == 'MAIOR_IGUAL':
+                columns.append(_clean(rule.get('parametro1')))
+            self.rules.append({
+                'rule_id': rule_id,
+                'tabela': rule.get('tabela'),
+                'coluna': rule.get('coluna'),
+                'tipo_regra': tipo,
+                'descricao': rule.get('descricao'),
+                'columns': columns,
+                'check': compile_rule(rule)
+            })
+
+    @classmethod
+    def from_csv(cls, path: str, delimiter: str = ',') -> 'RuleEngine':
+        """Cria o motor a partir de um CSV de regras."""
+        return cls(load_rules_csv(path, delimiter))
+
+    @classmethod
+    def from_sqlite(cls, conn: sqlite3.Connection,
+                    table: str = 'regras_validacao') -> 'RuleEngine':
+        """Cria o motor a partir de uma tabela de regras no SQLite."""
+        return cls(load_rules_sqlite(conn, table))
+
+    def rules_for(self, table_name: str) -> List[Dict[str, Any]]:
+        """Regras aplicáveis a uma tabela."""
+        return [rule for rule in self.rules if rule['tabela'] == table_name]
+
+    def evaluate_batch(self, columns: Dict[str, Sequence[Any]], table_name: str,
+                       first_row: int = 1) -> Dict[str, Any]:
+        """
+        Avalia todas as regras da tabela sobre um lote em formato colunar.
+
+        Args:
+            columns: Dados do lote no formato {coluna: valores}
+            table_name: Nome da tabela
+            first_row: Número (1-based) da primeira linha do lote
+
+        Returns:
+            Dicionário com total de linhas, máscara de linhas inválidas e falhas
+        """
+        size = len(next(iter(columns.values()))) if columns else 0
+        batch = _Batch(columns, size)
+        rules = self.rules_for(table_name)
+        invalid = np.zeros(size, dtype=bool)
+        failed_rows, failed_rules = [], []
+
+        for position, rule in enumerate(rules):
+            mask = rule['check'](batch)
+            invalid |= mask
+            rows = np.flatnonzero(mask)
+            failed_rows.append(rows)
+            failed_rules.append(np.full(len(rows), position))
+
+        failures = []
+        if failed_rows:
+            rows = np.concatenate(failed_rows)
+            positions = np.concatenate(failed_rules)
+            order = np.lexsort((positions, rows))
+            for row, position in zip(rows[order], positions[order]):
+                rule = rules[position]
+                failures.append({
+                    'row_number': int(row) + first_row,
+                    'rule_id': rule['rule_id'],
+                    'tipo_regra': rule['tipo_regra'],
+                    'coluna': rule['coluna'],
+                    'error': rule['descricao']
+                })
+
+        return {'rows': size, 'invalid_mask': invalid, 'failures': failures}
+
+    def validate(self, rows: Iterable[Dict[str, Any]], table_name: str,
+                 batch_size: int = 10000) -> Dict[str, Any]:
+        """
+        Valida uma fonte de linhas em lotes e consolida o relatório.
+
+        Args:
+            rows: Iterável de linhas (dicts)
+            table_name: Nome da tabela
+            batch_size: Linhas por lote
+
+        Returns:
+            Relatório com falhas por linha e contagem por regra
+        """
+        rules = self.rules_for(table_name)
+        names = sorted({name for rule in rules for name in rule['columns']})
+        iterator = iter(rows)
+        total_rows = invalid_rows = 0
+        failures = []
+
+        while True:
+            chunk = list(islice(iterator, batch_size))
+            if not chunk:
+                break
+            columns = {name: [row.get(name) for row in chunk] for name in names}
+            result = self.evaluate_batch(columns, table_name, first_row=total_rows + 1)
+            total_rows += result['rows']
+            invalid_rows += int(result['invalid_mask'].sum())
+            failures.extend(result['failures'])
+
+        counts: Dict[int, int] = {}
+        for failure in failures:
+            counts[failure['rule_id']] = counts.get(failure['rule_id'], 0) + 1
+
+        valid_rows = total_rows - invalid_rows
+        return {
+            'table': table_name,
+            'total_rows': total_rows,
+            'valid_rows': valid_rows,
+            'invalid_rows': invalid_rows,
+            'success_rate': f"{(valid_rows / total_rows * 100):.2f}%" if total_rows > 0 else "0%",
+            'rule_summary': [
+                {
+                    'rule_id': rule['rule_id'],
+                    'tipo_regra': rule['tipo_regra'],
+                    'coluna': rule['coluna'],
+                    'descricao': rule['descricao'],
+                    'quantidade_registros': counts.get(rule['rule_id'], 0),
+                    'percentual_dataset': round(
+                        100 * counts.get(rule['rule_id'], 0) / total_rows, 2
+                    ) if total_rows else 0.0
+                }
+                for rule in rules
+            ],
+            'errors': failures,
+            'generated_at': datetime.now().isoformat()
+        }
+
+
+if __name__ == '__main__':
+    import os
+    import json
+    import tempfile
+
+    rows = [
+        {'id_cliente': 1, 'cpf': '12345678901', 'idade': 35, 'valor_premio': 250.75,
+         'valor_cobertura': 50000.0, 'status_contrato': 'ATIVO', 'email': 'maria@exemplo.com',
+         'data_contratacao': '2023-01-15', 'data_cancelamento': None},
+        {'id_cliente': 2, 'cpf': '1234', 'idade': 15, 'valor_premio': 0,
+         'valor_cobertura': 100.0, 'status_contrato': 'ATIVO', 'email': 'invalido',
+         'data_contratacao': None, 'data_cancelamento': '2024-02-01'},
+        {'id_cliente': 3, 'cpf': '98765432100', 'idade': None, 'valor_premio': 300.0,
+         'valor_cobertura': 200.0, 'status_contrato': 'CANCELADO', 'email': 'joao@exemplo.org',
+         'data_contratacao': '2022-05-10', 'data_cancelamento': None},
+        {'id_cliente': 4, 'cpf': '11122233344', 'idade': 44, 'valor_premio': 180.0,
+         'valor_cobertura': 30000.0, 'status_contrato': 'SUSPENSO', 'email': ' ',
+         'data_contratacao': '2021-09-01', 'data_cancelamento': None}
+    ]
+
+    # Mesma tabela de regras, lida de um CSV
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'regras_validacao.csv')
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=RULE_FIELDS)
+            writer.writeheader()
+            writer.writerows(DEFAULT_RULES)
+        engine = RuleEngine.from_csv(path)
+
+    report = engine.validate(rows * 2500, 'clientes_seguros', batch_size=4000)
+    report['errors'] = report['errors'][:10]
+    print(json.dumps(report, indent=2, ensure_ascii=False))